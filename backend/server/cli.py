@@ -0,0 +1,147 @@
+"""
+Maintenance commands, run from the backend directory:
+
+    python -m server.cli export -o backup.ndjson.gz
+    python -m server.cli import backup.ndjson.gz --mode insert
+    python -m server.cli pregenerate words.txt --concurrency 8
+"""
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import AsyncIterator
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from server.config import settings
+from server.services import transfer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _database():
+    mongodb_url = os.environ.get("MONGODB_URL", settings.MONGODB_URL)
+    return AsyncIOMotorClient(mongodb_url)[settings.MONGODB_DB_NAME]
+
+
+def _open(path: str, mode: str, compress: bool):
+    if path == "-":
+        return sys.stdout.buffer if "w" in mode else sys.stdin.buffer
+    if compress:
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+async def export(args) -> None:
+    kinds = args.only or list(transfer.COLLECTIONS)
+    compress = args.gzip or args.output.endswith(".gz")
+    count = 0
+    out = _open(args.output, "wb", compress)
+    try:
+        async for line in transfer.export_lines(_database(), kinds):
+            out.write(line)
+            count += 1
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    logger.info(f"Exported {count} documents")
+
+
+async def _read_chunks(path: str) -> AsyncIterator[bytes]:
+    # transfer.iter_lines detects and unpacks gzip itself
+    source = _open(path, "rb", compress=False)
+    try:
+        while chunk := source.read(1 << 20):
+            yield chunk
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+
+
+async def import_(args) -> None:
+    lines = transfer.iter_lines(_read_chunks(args.input))
+    stats = await transfer.import_lines(_database(), lines, mode=args.mode)
+    print(stats)
+
+
+async def pregenerate(args) -> None:
+    # Imported here: the pipeline pulls in the LLM and search clients
+    from server.services.synonym_service.backends import parse_api_bases
+    from server.services.synonym_service.pregenerate import (
+        Checkpoint,
+        Pregenerator,
+        read_words,
+    )
+
+    with open(args.words, encoding="utf-8") as f:
+        words = read_words(f)
+    checkpoint = Checkpoint(Path(args.checkpoint or f"{args.words}.checkpoint"))
+    concurrency = args.concurrency or len(
+        parse_api_bases(settings.OPENAI_API_BASE)
+    ) * settings.LLM_CONCURRENCY_INITIAL
+
+    pregenerator = Pregenerator(_database(), checkpoint, concurrency, args.batch_size)
+    skip = checkpoint.done | (set() if args.retry_failed else checkpoint.failed)
+    todo = [w for w in words if w not in skip]
+    existing = await pregenerator.existing_words(todo)
+    todo = [w for w in todo if w not in existing]
+    logger.info(
+        f"{len(words)} words: {len(words) - len(todo)} already done or present, "
+        f"{len(todo)} to generate with {concurrency} at a time"
+    )
+    await pregenerator.run(todo, report_every=args.report_every)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m server.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write all data as NDJSON")
+    export_parser.add_argument("-o", "--output", default="-", help="File, or - for stdout")
+    export_parser.add_argument("--gzip", action="store_true", help="Compress (implied by .gz)")
+    export_parser.add_argument(
+        "--only", action="append", choices=list(transfer.COLLECTIONS), help="Limit to a kind"
+    )
+    export_parser.set_defaults(run=export)
+
+    import_parser = commands.add_parser("import", help="Load an NDJSON export")
+    import_parser.add_argument("input", help="File (plain or gzip), or - for stdin")
+    import_parser.add_argument(
+        "--mode",
+        choices=["upsert", "insert"],
+        default="upsert",
+        help="Replace existing documents, or keep them",
+    )
+    import_parser.set_defaults(run=import_)
+
+    pregenerate_parser = commands.add_parser(
+        "pregenerate", help="Generate explanations for a word list, resumably"
+    )
+    pregenerate_parser.add_argument("words", help="One word per line; extra columns are ignored")
+    pregenerate_parser.add_argument(
+        "--checkpoint", help="Progress file (default: <words>.checkpoint)"
+    )
+    pregenerate_parser.add_argument(
+        "--concurrency", type=int, help="Words in flight (default: backends x initial LLM limit)"
+    )
+    pregenerate_parser.add_argument(
+        "--batch-size", type=int, default=50, help="Results per bulk write and checkpoint"
+    )
+    pregenerate_parser.add_argument(
+        "--retry-failed", action="store_true", help="Try words that failed last time again"
+    )
+    pregenerate_parser.add_argument(
+        "--report-every", type=float, default=30, help="Seconds between progress reports"
+    )
+    pregenerate_parser.set_defaults(run=pregenerate)
+
+    args = parser.parse_args()
+    asyncio.run(args.run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Literal
 from pydantic_settings import BaseSettings
 
 
@@ -15,8 +16,132 @@ class Settings(BaseSettings):
     MONGODB_DB_NAME: str = "worddb"
 
     # OpenAI
-    OPENAI_API_BASE: str = "http://localhost:11434/v1/"
+    OPENAI_API_BASE: str = "http://localhost:11434/v1/"  # Comma-separated for several backends
+    OPENAI_BACKEND_MODELS: dict[str, dict[str, str]] = {}  # Per-backend model names, keyed by base URL
+    OPENAI_TIMEOUT_SECONDS: float = 300
     OPENAI_MODEL: str = "gemma2"
+    OPENAI_SMALL_MODEL: str = ""  # Fast model for cheap calls and drafts; empty disables the cascade
+    CASCADE_ESCALATION_SCORE: float = 0.5  # Local score below which drafts go to OPENAI_MODEL
+    LLM_JSON_REPROMPTS: int = 1  # Re-prompts after local JSON repair fails
+
+    # LLM backend pool
+    BACKEND_STRATEGY: Literal["least_outstanding", "latency"] = "least_outstanding"
+    BACKEND_EJECT_AFTER_FAILURES: int = 3
+    BACKEND_EJECT_SECONDS: float = 30
+    BACKEND_HEALTH_INTERVAL_SECONDS: float = 15  # 0 disables active health checks
+    BACKEND_HEALTH_TIMEOUT_SECONDS: float = 5
+
+    # LLM concurrency limit and circuit breaker
+    LLM_CONCURRENCY_INITIAL: int = 4
+    LLM_CONCURRENCY_MIN: int = 1
+    LLM_CONCURRENCY_MAX: int = 32
+    LLM_LATENCY_TOLERANCE: float = 2.0  # Latency over no-load latency that counts as overload
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 60  # Max wait for a free slot before failing
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 30
+    CIRCUIT_HALF_OPEN_PROBES: int = 1
+
+    # Candidate generation
+    SYNONYM_CANDIDATES: int = 1  # Candidates per word, ranked locally; each costs a generation
+    CANDIDATE_TEMPERATURE: float = 0.7
+    CANDIDATE_TIMEOUT_SECONDS: float = 120  # Stop waiting for slow extra candidates
+    RANKING_MARGIN: float = 0.1  # Score gap below which the AI ranker decides
+    DRAFT_FIRST_ENABLED: bool = True  # Publish an ungrounded draft while searching
+    STREAM_PARTIALS_ENABLED: bool = True  # Push explanation_partial events while generating
+    STREAM_PARTIAL_INTERVAL_SECONDS: float = 0.3  # Min time between partial events per generation
+
+    # Pipeline scheduling (per worker)
+    PIPELINE_CONCURRENCY: int = 4  # Synonym pipeline jobs running at once
+    SEARCH_POOL_SIZE: int = 8  # Threads for web searches
+    LLM_POOL_SIZE: int = 16  # Threads for blocking LLM calls, incl. ones waiting for a slot
+    CPU_POOL_SIZE: int = 4  # Threads running pipeline steps (search, generate, rank)
+    SCHEDULER_WEIGHTS: dict[str, int] = {
+        "interactive": 8,
+        "retry": 3,
+        "prefetch": 1,
+        "refresh": 1,
+    }
+    SCHEDULER_CLASS_LIMITS: dict[str, int] = {"retry": 2, "prefetch": 1, "refresh": 1}
+
+    # Speculative prefetch of synonyms (per worker)
+    PREFETCH_ENABLED: bool = True
+    PREFETCH_TOP_K: int = 3  # Synonyms prefetched per fresh explanation
+    PREFETCH_NUANCES: bool = False  # Also analyze nuances between word and synonym
+    PREFETCH_MAX_UTILIZATION: float = 0.5  # Only prefetch while the LLM is this idle
+    PREFETCH_DAILY_BUDGET: int = 200  # Prefetch jobs per day in each worker
+
+    # Stale entry refresh
+    REFRESH_ENABLED: bool = True
+    REFRESH_MAX_AGE_DAYS: int = 90  # Entries older than this are regenerated
+    REFRESH_ON_MODEL_CHANGE: bool = True  # Regenerate entries made by another model
+    REFRESH_WINDOWS: str = "01:00-06:00"  # Off-peak windows, local time, comma-separated
+    REFRESH_IDLE_UTILIZATION: float = 0.25  # Also refresh outside windows below this load
+    REFRESH_BATCH_SIZE: int = 5
+    REFRESH_CHECK_INTERVAL_SECONDS: float = 60
+    REFRESH_CLAIM_SECONDS: int = 1800  # Lease so other workers skip claimed entries
+
+    # Admission control for LLM-backed endpoints (per worker)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_PENDING: int = 50  # Jobs queued or running before new work is refused
+    ADMISSION_MAX_PENDING_PER_CLIENT: int = 10  # Share of the queue one client may hold
+    ADMISSION_RATE_PER_MINUTE: float = 30  # Sustained jobs per client
+    ADMISSION_BURST: int = 10  # Jobs a client may submit at once
+    ADMISSION_QUEUE_RETRY_AFTER_SECONDS: int = 30
+    ADMISSION_TRUST_FORWARDED: bool = False  # Use X-Forwarded-For behind a proxy
+
+    # Semantic search
+    EMBEDDING_MODEL: str = ""  # Embedding model on the OpenAI backends; empty disables semantic search
+    EMBEDDING_STORE_DTYPE: Literal["float16", "float32"] = "float16"
+    EMBEDDING_BATCH_SIZE: int = 64  # Explanations per embeddings request when backfilling
+    SEMANTIC_MIN_SCORE: float = 0.3  # Cosine similarity below which matches are dropped
+    SEMANTIC_QUERY_CACHE_SIZE: int = 1024  # Query embeddings kept per worker
+    EMBEDDING_SWEEP_INTERVAL_SECONDS: float = 600  # How often one worker embeds what is missing
+
+    # How often per-worker in-memory indexes pick up other workers' writes
+    INDEX_SYNC_INTERVAL_SECONDS: float = 30
+
+    # Memory-mapped read snapshot, shared by the workers on one host
+    SNAPSHOT_ENABLED: bool = False
+    SNAPSHOT_PATH: Path = Path("./data/explanations.snap")
+    SNAPSHOT_INTERVAL_SECONDS: float = 600  # How often the leading worker rebuilds it
+    SNAPSHOT_CHECK_SECONDS: float = 10  # How often workers look for a newer file
+
+    # Autocomplete
+    SUGGEST_MAX_LIMIT: int = 20
+    SUGGEST_CACHE_SIZE: int = 4096  # Prefixes whose top words are cached per worker
+
+    # Nuance analyses
+    NUANCE_CACHE_SIZE: int = 2048  # Recent nuance documents kept in memory per worker
+    NUANCE_BATCH_SIZE: int = 5  # Word pairs analyzed per LLM call in a matrix
+    NUANCE_MATRIX_CONCURRENCY: int = 2  # LLM calls running at once per matrix request
+    NUANCE_MATRIX_MAX_WORDS: int = 8
+
+    # Search
+    SEARCH_CONTEXT_TOKENS: int = 600  # Token budget for search snippets in prompts
+    SEARCH_DUPLICATE_THRESHOLD: float = 0.8  # MinHash similarity to treat as duplicate
+    SEARCH_PROVIDERS: list[str] = ["duckduckgo", "bing"]  # Primary first, then hedges
+    SEARCH_HEDGE_ENABLED: bool = True  # Ask the next provider when the primary is slow
+    SEARCH_HEDGE_PERCENTILE: float = 0.9  # Primary latency percentile to wait before hedging
+    SEARCH_HEDGE_DEFAULT_SECONDS: float = 2.0  # Hedge delay until enough latencies are known
+    SEARCH_TIMEOUT_SECONDS: float = 10
+    BING_SEARCH_URL: str = "https://www.bing.com/search"
+
+    # Export/import
+    TRANSFER_BATCH_SIZE: int = 1000  # Documents per cursor batch and per bulk write
+
+    # Synonym graph
+    RELATED_MAX_HOPS: int = 3
+    RELATED_PREVIEW_ENABLED: bool = True  # Push neighbours' synonyms for new words right away
+    RELATED_PREVIEW_SIZE: int = 8
+
+    # Pre-serialized responses for explanation reads (per worker, 0 disables)
+    RESPONSE_CACHE_SIZE: int = 1024
+
+    # Event-loop lag watchdog (per worker)
+    LOOP_WATCHDOG_ENABLED: bool = False
+    LOOP_WATCHDOG_INTERVAL_SECONDS: float = 0.1  # Heartbeat period
+    LOOP_WATCHDOG_THRESHOLD_SECONDS: float = 0.25  # Lag at which the blocking stack is logged
+    LOOP_WATCHDOG_LOG_INTERVAL_SECONDS: float = 60  # At most one stack log per period
 
     # Static files
     STATIC_PATH: Path = Path("./static")
@@ -1,12 +1,15 @@
 from datetime import datetime
 from typing import Optional, TypeVar, Generic, Literal, Union
-from beanie import Document
+from beanie import Document, PydanticObjectId
 from pydantic import BaseModel, Field
+from pymongo import IndexModel
 
 
 class ExplanationEntry(BaseModel):
     explanation: str
     synonyms: Optional[list[str]]
+    prompt_version: Optional[int] = None
+    model: Optional[str] = None
 
 
 class Explanation(Document):
@@ -14,12 +17,52 @@ class Explanation(Document):
     entries: list[ExplanationEntry]
     created_at: datetime = datetime.now()
     updated_at: Optional[datetime] = None
+    refresh_claimed_until: Optional[datetime] = None
+    lookup_count: int = 0
+    synonym_keys: list[str] = []  # Normalized synonyms of the latest entry
 
     class Settings:
         name = "synonyms"
+        indexes = [
+            # Multikey: finds the words listing a given synonym
+            [("synonym_keys", 1)],
+            # Lets workers sync their in-memory indexes incrementally
+            [("updated_at", 1)],
+        ]
+
+
+class Revision(Document):
+    """A counter bumped on every change to a collection; caches key on it."""
+
+    id: str
+    value: int = 0
+
+    class Settings:
+        name = "revisions"
+
+
+class ExplanationEmbedding(Document):
+    explanation_id: PydanticObjectId
+    model: str
+    dtype: str  # numpy dtype the vector bytes are stored as
+    vector: bytes
+    updated_at: Optional[datetime] = None
+
+    class Settings:
+        name = "embeddings"
+        indexes = [
+            IndexModel([("explanation_id", 1)], unique=True),
+            [("model", 1)],
+        ]
+
+
+class SemanticMatch(BaseModel):
+    explanation: Explanation
+    score: float
 
 
 class SynonymNuance(Document):
+    pair_key: Optional[str] = None  # Sorted, lower-cased "word1|word2"
     word1: str
     word2: str
     nuance_explanation: str
@@ -33,6 +76,11 @@ class SynonymNuance(Document):
         name = "nuances"
         indexes = [
             [("word1", 1), ("word2", 1)],  # Compound index for word pairs
+            IndexModel(
+                [("pair_key", 1)],
+                unique=True,
+                partialFilterExpression={"pair_key": {"$type": "string"}},
+            ),
         ]
 
 
@@ -55,6 +103,17 @@ class NuanceRequest(BaseModel):
     word2: str
 
 
+class NuanceMatrixRequest(BaseModel):
+    words: list[str]
+
+
+class NuanceMatrixItem(BaseModel):
+    word1: str
+    word2: str
+    nuance: Optional[SynonymNuance] = None
+    error: Optional[str] = None
+
+
 class ExplanationJobModel(BaseModel):
     word: str
     type: Literal["explanation"]
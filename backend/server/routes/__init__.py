@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request
 from .explanations import router as explanations_router
 from .ws import router as ws_router
+from .metrics import router as metrics_router
 from .auth import router as auth_router
 
 
@@ -13,6 +14,8 @@ protected_router.include_router(
 
 protected_router.include_router(ws_router, prefix="/ws", tags=["WebSocket"])
 
+protected_router.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
+
 # Create the main router
 router = APIRouter()
 
@@ -1,24 +1,42 @@
 import logging
 from beanie import PydanticObjectId
-from fastapi import HTTPException, BackgroundTasks
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 
-from server.services.synonym_service.ai import (
-    create_and_validate_synonym,
-    analyze_synonym_nuances,
-)
 from server.services.synonym_service.worker import process_explanation
+from server.services.synonym_service.scheduler import scheduler
+from server.services.synonym_service.limiter import (
+    CircuitOpenError,
+    LimiterTimeoutError,
+)
+from ..config import settings
+from ..services import admission, events, response_cache, transfer
+from server.services.synonym_service import graph, prefetch, semantic, snapshot, suggest
+from server.services.synonym_service.graph import Direction, RelatedWord
+from server.services.synonym_service.suggest import Suggestion
+from server.services.synonym_service.nuance import (
+    analyze_matrix,
+    find_nuance,
+    find_nuances,
+    get_or_create_nuance,
+    matrix_pairs,
+    pair_key,
+)
 from ..models import (
     CreateSynonymDTO,
     Explanation,
     ExplanationEntry,
     PaginatedResponse,
+    SemanticMatch,
+    NuanceMatrixItem,
+    NuanceMatrixRequest,
     NuanceRequest,
     SynonymNuance,
 )
 from fastapi import APIRouter
 from pydantic import BaseModel
-from typing import Annotated
+from typing import Annotated, Literal
 from fastapi import Query
 
 # Configure logging
@@ -29,31 +47,56 @@ router = APIRouter()
 
 
 @router.post("")
-async def create_synonym(
-    synonym: CreateSynonymDTO, background_tasks: BackgroundTasks
-) -> Explanation:
+async def create_synonym(synonym: CreateSynonymDTO, request: Request) -> Explanation:
     logger.info(f"Creating synonym for word: {synonym.word}")
+    client = admission.client_key(request)
 
-    existing = await Explanation.find_one(Explanation.word == synonym.word)
+    existing = snapshot.find_word(synonym.word) if snapshot.enabled() else None
+    if existing is None:
+        existing = await Explanation.find_one(Explanation.word == synonym.word)
     if existing:
         logger.info(f"Word already exists: {synonym.word}")
+        await Explanation.find_one(Explanation.id == existing.id).update(
+            {"$inc": {"lookup_count": 1}}
+        )
+        suggest.index.bump(existing.id)
+        await prefetch.record_lookup(existing)
         if not existing.entries:
             # If it exists but has no entries, process it in background
-            background_tasks.add_task(process_explanation, existing.id)
-            logger.info(
-                f"Added existing explanation to background tasks: {existing.word}"
+            admission.admit(client)
+            scheduler.submit(
+                "interactive",
+                admission.run_admitted,
+                client,
+                process_explanation,
+                existing.id,
             )
+            logger.info(f"Scheduled existing explanation: {existing.word}")
         return existing
 
+    # Reject before creating anything if this client can't add more work
+    admission.admit(client)
+
     # Create new explanation without entries
     new_explanation = Explanation(word=synonym.word, entries=[])
     new_explanation.created_at = datetime.now()
-    await new_explanation.save()
+    try:
+        await new_explanation.save()
+    except Exception:
+        admission.release(client)
+        raise
     logger.info(f"Created new explanation for word: {synonym.word}")
-
-    # Add to background tasks with lower priority
-    background_tasks.add_task(process_explanation, new_explanation.id)
-    logger.info(f"Added explanation to background tasks: {synonym.word}")
+    await events.publish("created", new_explanation)
+
+    # A user is waiting on this one, so it goes ahead of retries and background work
+    scheduler.submit(
+        "interactive",
+        admission.run_admitted,
+        client,
+        process_explanation,
+        new_explanation.id,
+    )
+    logger.info(f"Scheduled explanation: {synonym.word}")
 
     return new_explanation
 
@@ -66,6 +109,7 @@ class GetSynonymsQuery(BaseModel):
 
 @router.get("")
 async def get_synonyms(
+    request: Request,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=10, ge=1),
     query: str = Query(default="", min_length=0),
@@ -77,6 +121,19 @@ async def get_synonyms(
         f"[GET /explanations] Query type: {type(query)}, Query value: {query!r}"
     )
 
+    key = response_cache.list_key(skip, limit, query)
+    cached = response_cache.lookup(key)
+    if cached is not None:
+        logger.info("[GET /explanations] Served from response cache")
+        return response_cache.respond(request, cached)
+
+    # Unfiltered pages come straight from the snapshot while it is current
+    if not query.strip() and snapshot.enabled():
+        page = snapshot.read_page(skip, limit)
+        if page is not None:
+            logger.info("[GET /explanations] Served from snapshot")
+            return response_cache.respond(request, response_cache.store(key, page))
+
     # Start with a base query using Beanie's query builder
     base_query = Explanation.find()
 
@@ -103,26 +160,130 @@ async def get_synonyms(
     items = await base_query.skip(skip).limit(limit).to_list()
     logger.info(f"[GET /explanations] Returning {len(items)} items")
 
-    return PaginatedResponse[Explanation](
+    page = PaginatedResponse[Explanation](
         items=items, total=total, skip=skip, limit=limit
     )
+    body = page.model_dump_json(
+        by_alias=True, exclude={"items": {"__all__": response_cache.VOLATILE_FIELDS}}
+    ).encode()
+    return response_cache.respond(request, response_cache.store(key, body))
+
+
+@router.get("/export")
+async def export_data(
+    request: Request,
+    gzip: bool = False,
+    only: list[Literal["explanations", "nuances"]] = Query(default=None),
+) -> StreamingResponse:
+    """
+    Stream all explanations and nuances as NDJSON, optionally gzipped.
+    """
+    logger.info(f"[GET /explanations/export] gzip={gzip}, only={only}")
+    lines = transfer.export_lines(request.app.state.db, only or list(transfer.COLLECTIONS))
+    if gzip:
+        return StreamingResponse(
+            transfer.gzip_chunks(lines),
+            media_type="application/gzip",
+            headers={"Content-Disposition": 'attachment; filename="explanations.ndjson.gz"'},
+        )
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="explanations.ndjson"'},
+    )
+
+
+@router.post("/import")
+async def import_data(
+    request: Request, mode: Literal["upsert", "insert"] = "upsert"
+) -> dict[str, int]:
+    """
+    Load an NDJSON export (plain or gzipped) from the request body.
+    """
+    logger.info(f"[POST /explanations/import] mode={mode}")
+    lines = transfer.iter_lines(request.stream())
+    stats = await transfer.import_lines(request.app.state.db, lines, mode=mode)
+    # Imported words should show up in autocomplete and the graph right away
+    await suggest.build_index()
+    await graph.backfill_synonym_keys()
+    await graph.build_graph()
+    return stats
+
+
+@router.get("/suggest")
+async def suggest_words(
+    prefix: str = Query(min_length=1),
+    limit: int = Query(default=10, ge=1, le=settings.SUGGEST_MAX_LIMIT),
+) -> list[Suggestion]:
+    """
+    Autocomplete stored words from this worker's in-memory prefix index.
+    """
+    return suggest.index.suggest(prefix, limit)
+
+
+@router.get("/related")
+async def related_words(
+    word: str = Query(min_length=1),
+    hops: int = Query(default=1, ge=1, le=settings.RELATED_MAX_HOPS),
+    direction: Direction = "both",
+    limit: int = Query(default=20, ge=1, le=100),
+) -> list[RelatedWord]:
+    """
+    Words within `hops` synonym links of `word` in this worker's graph.
+    direction="in" with hops=1 lists the stored words that give it as a synonym.
+    """
+    return graph.graph.related(word, hops, direction, limit)
+
+
+@router.get("/semantic")
+async def semantic_search(
+    q: str = Query(min_length=1),
+    limit: int = Query(default=10, ge=1, le=100),
+) -> list[SemanticMatch]:
+    """
+    Find explanations by meaning rather than by spelling.
+    """
+    if not semantic.enabled():
+        raise HTTPException(status_code=503, detail="Semantic search is not configured")
+    logger.info(f"[GET /explanations/semantic] q={q!r}, limit={limit}")
+
+    try:
+        matches = await semantic.semantic_search(q, limit)
+    except Exception as e:
+        logger.error(f"Semantic search failed: {e}")
+        raise HTTPException(status_code=503, detail="Semantic search is unavailable")
+    return [SemanticMatch(explanation=e, score=score) for e, score in matches]
 
 
 @router.get("/{id}")
-async def get_synonym(id: PydanticObjectId) -> Explanation:
+async def get_synonym(id: PydanticObjectId, request: Request) -> Explanation:
     logger.info(f"Fetching synonym with id: {id}")
+    if snapshot.enabled():
+        document = snapshot.read_explanation(id)
+        if document is not None:
+            return response_cache.respond(request, response_cache.prepare(document))
+
+    key = response_cache.item_key(id)
+    cached = response_cache.lookup(key)
+    if cached is not None:
+        return response_cache.respond(request, cached)
+
     try:
         synonym = await Explanation.get(id)
-        return synonym
     except Exception:
         logger.error(f"Synonym with id {id} not found")
         raise HTTPException(status_code=404, detail="Synonym not found")
+    if synonym is None:
+        return synonym
+    body = synonym.model_dump_json(by_alias=True, exclude=response_cache.VOLATILE_FIELDS).encode()
+    if not synonym.entries:
+        # Still being generated, so not worth keeping
+        return response_cache.respond(request, response_cache.prepare(body))
+    return response_cache.respond(request, response_cache.store(key, body))
 
 
 @router.put("/{id}")
-async def update_synonym(
-    id: PydanticObjectId, background_tasks: BackgroundTasks
-) -> Explanation:
+async def update_synonym(id: PydanticObjectId, request: Request) -> Explanation:
     logger.info(f"Updating synonym with id: {id}")
     try:
         explanation = await Explanation.get(id)
@@ -130,14 +291,22 @@ async def update_synonym(
         logger.error(f"Synonym with id {id} not found")
         raise HTTPException(status_code=404, detail="Synonym not found")
 
+    client = admission.client_key(request)
+    admission.admit(client)
     try:
-        # Add to background tasks with retry flag
-        background_tasks.add_task(process_explanation, explanation.id, True)
-        logger.info(
-            f"Added explanation to background tasks for retry: {explanation.word}"
+        # Schedule with retry flag, behind interactive lookups
+        scheduler.submit(
+            "retry",
+            admission.run_admitted,
+            client,
+            process_explanation,
+            explanation.id,
+            True,
         )
+        logger.info(f"Scheduled explanation for retry: {explanation.word}")
         return explanation
     except Exception as e:
+        admission.release(client)
         logger.error(f"Failed to update synonym: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -149,60 +318,84 @@ async def delete_synonym(id: PydanticObjectId):
         synonym = await Explanation.get(id)
         await synonym.delete()
         logger.info(f"Deleted synonym with id: {id}")
+        await events.publish("deleted", synonym)
     except Exception:
         logger.error(f"Synonym with id {id} not found")
         raise HTTPException(status_code=404, detail="Synonym not found")
 
 
 @router.post("/nuances")
-async def analyze_nuances(request: NuanceRequest) -> SynonymNuance:
+async def analyze_nuances(request: NuanceRequest, http_request: Request) -> SynonymNuance:
     """
     Analyze the nuanced differences between two synonyms and save to database.
     """
     logger.info(f"Analyzing nuances between {request.word1} and {request.word2}")
 
-    # Check if nuance already exists
-    existing = await SynonymNuance.find_one(
-        {
-            "$or": [
-                {"word1": request.word1, "word2": request.word2},
-                {
-                    "word1": request.word2,
-                    "word2": request.word1,
-                },  # Check reverse order too
-            ]
-        }
-    )
-
+    # Check if nuance already exists (in either order)
+    existing = await find_nuance(request.word1, request.word2)
     if existing:
         logger.info(
             f"Found existing nuance analysis for {request.word1} and {request.word2}"
         )
         return existing
 
+    client = admission.client_key(http_request)
+    admission.admit(client)
     try:
-        # Get new analysis from AI
-        nuance = await analyze_synonym_nuances(request.word1, request.word2)
-
-        # Create document
-        nuance_doc = SynonymNuance(
-            word1=nuance.word1,
-            word2=nuance.word2,
-            nuance_explanation=nuance.nuance_explanation,
-            usage_examples=nuance.usage_examples,
-            context_differences=nuance.context_differences,
-            formality_level=nuance.formality_level,
-            emotional_weight=nuance.emotional_weight,
-        )
-
-        # Save to database
-        await nuance_doc.save()
-        logger.info(f"Saved nuance analysis for {request.word1} and {request.word2}")
-
-        return nuance_doc
+        return await get_or_create_nuance(request.word1, request.word2)
+    except (CircuitOpenError, LimiterTimeoutError) as e:
+        logger.warning(f"LLM unavailable for nuance analysis: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to analyze nuances: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        admission.release(client)
+
+
+@router.post("/nuances/matrix")
+async def analyze_nuance_matrix(
+    request: NuanceMatrixRequest, http_request: Request
+) -> StreamingResponse:
+    """
+    Analyze every pair in a set of words. Streams one NDJSON line per pair:
+    stored analyses first, then the rest as their batches finish.
+    """
+    pairs = matrix_pairs(request.words)
+    if len({word for pair in pairs for word in pair}) > settings.NUANCE_MATRIX_MAX_WORDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.NUANCE_MATRIX_MAX_WORDS} words can be compared",
+        )
+    logger.info(f"Analyzing nuance matrix for {len(pairs)} pairs")
+
+    stored = await find_nuances(pairs)
+    missing = [pair for pair in pairs if pair_key(*pair) not in stored]
+
+    client = admission.client_key(http_request)
+    if missing:
+        admission.admit(client)
+
+    def line(word1: str, word2: str, result) -> str:
+        if isinstance(result, Exception):
+            item = NuanceMatrixItem(word1=word1, word2=word2, error=str(result))
+        else:
+            item = NuanceMatrixItem(word1=word1, word2=word2, nuance=result)
+        return item.model_dump_json(by_alias=True) + "\n"
+
+    async def stream():
+        try:
+            for pair in pairs:
+                if pair_key(*pair) in stored:
+                    yield line(*pair, stored[pair_key(*pair)])
+            if missing:
+                async for pair, result in analyze_matrix(missing):
+                    yield line(*pair, result)
+        finally:
+            if missing:
+                admission.release(client)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @router.get("/nuances/{word1}/{word2}")
@@ -212,14 +405,7 @@ async def get_nuance(word1: str, word2: str) -> SynonymNuance:
     """
     logger.info(f"Fetching nuance analysis for {word1} and {word2}")
 
-    nuance = await SynonymNuance.find_one(
-        {
-            "$or": [
-                {"word1": word1, "word2": word2},
-                {"word1": word2, "word2": word1},  # Check reverse order too
-            ]
-        }
-    )
-
+    nuance = await find_nuance(word1, word2)
     if not nuance:
         raise HTTPException(status_code=404, detail="Nuance analysis not found")
+    return nuance
@@ -0,0 +1,14 @@
+from typing import Any, Dict
+from fastapi import APIRouter
+
+from ..services import metrics
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Get runtime stats for the services in this worker.
+    """
+    return metrics.snapshot()
@@ -11,8 +11,17 @@ from fastapi.responses import FileResponse, RedirectResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from server.services.static_service import STATIC_PATH
-from server.models import Explanation, SynonymNuance
+from server.config import settings
+from server.services import bing_search, migrations, response_cache
+from server.services.loop_watchdog import watchdog
+from server.services.static_service import STATIC_PATH, ensure_static_dir
+from server.services.synonym_service.backends import run_health_checks
+from server.services.synonym_service.scheduler import scheduler
+from server.services.synonym_service import pools
+from server.services.synonym_service.refresh import parse_windows, run_refresh_scheduler
+from server.services.synonym_service.nuance import backfill_pair_keys
+from server.services.synonym_service import graph, semantic, snapshot, suggest
+from server.models import Explanation, ExplanationEmbedding, Revision, SynonymNuance
 from server.routes import router, auth
 from .middleware.auth import require_auth_dependency
 from fastapi import Request
@@ -20,15 +29,56 @@ from fastapi import Request
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    ensure_static_dir()
+
     # Get MongoDB URL from environment variable or use default
     mongodb_url = os.environ.get("MONGODB_URL", "mongodb://localhost:27017")
 
     # Initialize MongoDB connection on startup
     client = AsyncIOMotorClient(mongodb_url)
     await init_beanie(
-        database=client.worddb, document_models=[Explanation, SynonymNuance]
+        database=client.worddb,
+        document_models=[Explanation, ExplanationEmbedding, Revision, SynonymNuance],
     )
+    app.state.db = client.worddb
+    await migrations.run_once(client.worddb, "nuance_pair_keys", backfill_pair_keys)
+    await suggest.build_index()
+    await migrations.run_once(client.worddb, "synonym_keys", graph.backfill_synonym_keys)
+    await graph.build_graph()
+    await response_cache.sync_revision()
+
+    # Start background services
+    if settings.LOOP_WATCHDOG_ENABLED:
+        watchdog.start()
+    background_tasks = []
+    if settings.BACKEND_HEALTH_INTERVAL_SECONDS > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_health_checks(settings.BACKEND_HEALTH_INTERVAL_SECONDS)
+            )
+        )
+    if settings.REFRESH_ENABLED:
+        # Fail at startup on a malformed REFRESH_WINDOWS rather than in the loop
+        parse_windows(settings.REFRESH_WINDOWS)
+        background_tasks.append(asyncio.create_task(run_refresh_scheduler()))
+    background_tasks.append(asyncio.create_task(suggest.run_suggest_sync()))
+    background_tasks.append(asyncio.create_task(graph.run_graph_sync()))
+    background_tasks.append(asyncio.create_task(response_cache.run_revision_sync()))
+    if snapshot.enabled():
+        background_tasks.append(asyncio.create_task(snapshot.run_snapshots()))
+    if semantic.enabled():
+        background_tasks.append(asyncio.create_task(semantic.run_semantic_index(client.worddb)))
+
     yield
+
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await scheduler.shutdown()
+    await watchdog.stop()
+    pools.shutdown()
+    await bing_search.close()
+
     # Clean up the MongoDB connection on shutdown
     client.close()
 
@@ -45,7 +95,7 @@ app.add_middleware(
 )
 
 # Serve static files from the "static" directory
-app.mount("/static", StaticFiles(directory=str(STATIC_PATH)), name="static")
+app.mount("/static", StaticFiles(directory=str(STATIC_PATH), check_dir=False), name="static")
 
 # Include the router in the app
 app.include_router(
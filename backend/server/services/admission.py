@@ -0,0 +1,140 @@
+import logging
+import math
+import time
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException, Request
+
+from ..config import settings
+from .metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Idle client buckets kept before the least recently used are dropped
+MAX_TRACKED_CLIENTS = 10_000
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now: float) -> float:
+        """Take a token; returns 0 on success or seconds until one is available."""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (1 - self.tokens) / self.rate
+
+
+# Per-worker admission state
+_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+_pending: Counter = Counter()
+_rejections: Counter = Counter()
+
+
+def client_key(request: Request) -> str:
+    """Identify the client a request's work is charged to."""
+    if settings.ADMISSION_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def pending_total() -> int:
+    return sum(_pending.values())
+
+
+def _reject(reason: str, retry_after: float, detail: str) -> HTTPException:
+    _rejections[reason] += 1
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _bucket(client: str) -> TokenBucket:
+    bucket = _buckets.get(client)
+    if bucket is None:
+        bucket = TokenBucket(
+            settings.ADMISSION_RATE_PER_MINUTE / 60, settings.ADMISSION_BURST
+        )
+        _buckets[client] = bucket
+        if len(_buckets) > MAX_TRACKED_CLIENTS:
+            _buckets.popitem(last=False)
+    else:
+        _buckets.move_to_end(client)
+    return bucket
+
+
+def admit(client: str) -> None:
+    """
+    Admit one unit of expensive work for a client or raise 429.
+
+    Checks the global pending depth, the client's share of it, and the
+    client's token bucket. Admitted work must be paired with `release`.
+    """
+    if not settings.ADMISSION_ENABLED:
+        _pending[client] += 1
+        return
+
+    if pending_total() >= settings.ADMISSION_MAX_PENDING:
+        logger.warning(f"Rejecting work from {client}: queue full ({pending_total()})")
+        raise _reject(
+            "queue_full",
+            settings.ADMISSION_QUEUE_RETRY_AFTER_SECONDS,
+            "Server is busy, try again later",
+        )
+
+    if _pending[client] >= settings.ADMISSION_MAX_PENDING_PER_CLIENT:
+        logger.warning(f"Rejecting work from {client}: too many pending jobs")
+        raise _reject(
+            "client_pending",
+            settings.ADMISSION_QUEUE_RETRY_AFTER_SECONDS,
+            "Too many requests in progress, try again later",
+        )
+
+    wait = _bucket(client).try_take(time.monotonic())
+    if wait > 0:
+        logger.warning(f"Rejecting work from {client}: rate limited")
+        raise _reject("rate_limited", wait, "Rate limit exceeded")
+
+    _pending[client] += 1
+
+
+def release(client: str) -> None:
+    _pending[client] -= 1
+    if _pending[client] <= 0:
+        del _pending[client]
+
+
+async def run_admitted(client: str, fn: Callable[..., Awaitable], *args) -> None:
+    """Run admitted background work and release its slot when done."""
+    try:
+        await fn(*args)
+    finally:
+        release(client)
+
+
+def get_stats() -> dict:
+    return {
+        "enabled": settings.ADMISSION_ENABLED,
+        "pending": pending_total(),
+        "clients_pending": len(_pending),
+        "rejections": dict(_rejections),
+    }
+
+
+register_collector("admission", get_stats)
@@ -1,26 +1,86 @@
-import requests
+import html
 import logging
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    import httpx
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_RESULT_SPLIT_RE = re.compile(r'<li class="b_algo\b[^>]*>')
+_LINK_RE = re.compile(r'<h2[^>]*>\s*<a[^>]*href="([^"]+)"[^>]*>(.*?)</a>', re.DOTALL)
+_SNIPPET_RE = re.compile(r"<p[^>]*>(.*?)</p>", re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+# Looks like a regular browser; Bing serves a stripped page to unknown agents
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0",
+    "Accept-Language": "sv-SE,sv;q=0.9,en;q=0.5",
+}
+
+_client: Optional["httpx.AsyncClient"] = None
+
+
+def _text(fragment: str) -> str:
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub("", fragment))).strip()
+
 
-def search_bing(query: str) -> str:
+def extract_results(page: str, max_results: int) -> List[Dict[str, Any]]:
     """
-    Searches Bing and returns the HTML response.
+    Pull title, link and snippet out of a Bing result page, in the same
+    shape as DDGS text results.
+    """
+    results = []
+    # Each organic result starts a new chunk; the first chunk is page chrome
+    for chunk in _RESULT_SPLIT_RE.split(page)[1:]:
+        link = _LINK_RE.search(chunk)
+        snippet = _SNIPPET_RE.search(chunk)
+        if not link or not snippet:
+            continue
+        body = _text(snippet.group(1))
+        if not body:
+            continue
+        results.append(
+            {"title": _text(link.group(2)), "href": html.unescape(link.group(1)), "body": body}
+        )
+        if len(results) >= max_results:
+            break
+    return results
+
+
+def _get_client() -> "httpx.AsyncClient":
+    global _client
+    if _client is None:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=settings.SEARCH_TIMEOUT_SECONDS,
+            follow_redirects=True,
+        )
+    return _client
 
-    Args:
-        query (str): The search query
 
-    Returns:
-        str: The HTML response from Bing
+async def search_bing(query: str, max_results: int = 3) -> List[Dict[str, Any]]:
     """
-    try:
-        logger.info(f"Searching Bing for query: {query}")
-        response = requests.get(f"https://www.bing.com/search?q={query}")
-        logger.info(f"Bing search successful - Status code: {response.status_code}")
-        return response.text
-    except Exception as e:
-        logger.error(f"Bing search error: {e}")
-        return ""
+    Search Bing over a shared connection pool and return parsed results.
+    """
+    logger.info(f"Searching Bing for query: {query}")
+    response = await _get_client().get(
+        settings.BING_SEARCH_URL, params={"q": query, "setlang": "sv"}
+    )
+    response.raise_for_status()
+    return extract_results(response.text, max_results)
+
+
+async def close() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
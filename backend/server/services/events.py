@@ -0,0 +1,30 @@
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Union
+
+logger = logging.getLogger(__name__)
+
+# "created": a new explanation document was inserted
+# "saved": an explanation got new entries from the pipeline
+# "generated": an explanation got its first entry; follows "saved"
+# "deleted": an explanation was removed
+Event = Literal["created", "saved", "generated", "deleted"]
+Listener = Callable[[Any], Union[None, Awaitable[None]]]
+
+_listeners: Dict[str, List[Listener]] = {"created": [], "saved": [], "generated": [], "deleted": []}
+
+
+def subscribe(event: Event, listener: Listener) -> None:
+    """Call `listener` with the explanation whenever `event` happens in this worker."""
+    _listeners[event].append(listener)
+
+
+async def publish(event: Event, explanation: Any) -> None:
+    """Notify listeners; a failing listener never breaks the caller."""
+    for listener in _listeners[event]:
+        try:
+            result = listener(explanation)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"{event} listener {listener.__name__} failed: {e}")
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from ..config import settings
+from .metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the lag histogram buckets
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class LagHistogram:
+    def __init__(self, buckets=LAG_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, lag: float) -> None:
+        index = next((i for i, bound in enumerate(self.buckets) if lag <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.total += lag
+        self.max = max(self.max, lag)
+
+    def stats(self) -> Dict:
+        # Cumulative, Prometheus style: each bucket counts samples <= its bound
+        cumulative, running = {}, 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            running += count
+            cumulative[bound] = running
+        return {
+            "buckets": cumulative,
+            "count": running,
+            "sum": round(self.total, 3),
+            "max": round(self.max, 3),
+        }
+
+
+class LoopWatchdog:
+    """
+    Measures how late the event loop wakes up from a short sleep. A thread
+    watches the heartbeat, and when the loop has been stuck longer than the
+    threshold it logs the loop thread's current stack: the blocking call.
+    """
+
+    def __init__(self, interval: float, threshold: float, log_interval: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.log_interval = log_interval
+        self.histogram = LagHistogram()
+        self.stalls = 0
+        self.suppressed = 0
+        self._last_beat = time.monotonic()
+        self._beat = 0
+        self._reported_beat = -1
+        self._last_log = 0.0
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.histogram.observe(max(0.0, now - before - self.interval))
+            self._last_beat = now
+            self._beat += 1
+
+    def _loop_stack(self) -> List[str]:
+        frame = sys._current_frames().get(self._loop_thread)
+        return traceback.format_stack(frame) if frame else []
+
+    def check(self, now: float) -> None:
+        """Called from the watchdog thread: report a stall once per stuck heartbeat."""
+        stuck = now - self._last_beat - self.interval
+        if stuck < self.threshold or self._reported_beat == self._beat:
+            return
+        self._reported_beat = self._beat
+        self.stalls += 1
+        if now - self._last_log < self.log_interval:
+            self.suppressed += 1
+            return
+        self._last_log = now
+        suppressed, self.suppressed = self.suppressed, 0
+        logger.warning(
+            f"Event loop blocked for {stuck:.3f}s ({suppressed} similar stalls not logged). "
+            f"Loop thread stack:\n{''.join(self._loop_stack())}"
+        )
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check(time.monotonic())
+
+    def start(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": True,
+            "lag": self.histogram.stats(),
+            "stalls": self.stalls,
+            "threshold": self.threshold,
+        }
+
+
+watchdog = LoopWatchdog(
+    interval=settings.LOOP_WATCHDOG_INTERVAL_SECONDS,
+    threshold=settings.LOOP_WATCHDOG_THRESHOLD_SECONDS,
+    log_interval=settings.LOOP_WATCHDOG_LOG_INTERVAL_SECONDS,
+)
+
+register_collector(
+    "event_loop",
+    lambda: watchdog.stats() if settings.LOOP_WATCHDOG_ENABLED else {"enabled": False},
+)
@@ -0,0 +1,14 @@
+from typing import Any, Callable, Dict
+
+# Registered stat collectors, keyed by component name
+_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_collector(name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+    """Register a callable that returns a component's current stats."""
+    _collectors[name] = collector
+
+
+def snapshot() -> Dict[str, Any]:
+    """Collect the stats of every registered component."""
+    return {name: collector() for name, collector in _collectors.items()}
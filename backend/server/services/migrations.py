@@ -0,0 +1,65 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# A migration claimed longer ago than this without finishing is taken over
+CLAIM_TIMEOUT = timedelta(hours=1)
+
+
+async def _claim(db, name: str, now: datetime) -> bool:
+    try:
+        await db.migrations.insert_one({"_id": name, "started_at": now, "done": False})
+        return True
+    except DuplicateKeyError:
+        pass
+    # The worker that claimed it may have died halfway
+    taken_over = await db.migrations.find_one_and_update(
+        {"_id": name, "done": False, "started_at": {"$lt": now - CLAIM_TIMEOUT}},
+        {"$set": {"started_at": now}},
+    )
+    return taken_over is not None
+
+
+async def run_once(db, name: str, migration: Callable[[], Awaitable[None]]) -> bool:
+    """
+    Run a data migration once per database. Every worker calls this at
+    startup; the first to claim `name` runs it and the others skip it.
+    Returns whether this worker ran it.
+    """
+    now = datetime.now()
+    if not await _claim(db, name, now):
+        return False
+    logger.info(f"Running migration {name}")
+    try:
+        await migration()
+    except Exception:
+        # Let the next startup try again
+        await db.migrations.delete_one({"_id": name})
+        raise
+    await db.migrations.update_one(
+        {"_id": name}, {"$set": {"done": True, "finished_at": datetime.now()}}
+    )
+    logger.info(f"Migration {name} finished")
+    return True
+
+
+async def claim_lease(db, name: str, seconds: float) -> bool:
+    """
+    Claim a recurring job for `seconds` across workers. Returns False while
+    another worker's claim on `name` hasn't run out.
+    """
+    now = datetime.now()
+    try:
+        # Only an expired lease matches; a live one makes the upsert collide
+        await db.leases.update_one(
+            {"_id": name, "until": {"$lt": now}},
+            {"$set": {"until": now + timedelta(seconds=seconds)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return False
+    return True
@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import logging
+from typing import Hashable, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from ..config import settings
+from . import events, revisions
+from .lru import LRUCache
+from .metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+# Bookkeeping fields that change without a new revision; left out of cached bodies
+VOLATILE_FIELDS = {"lookup_count", "refresh_claimed_until"}
+
+# Keys include the revision they were built at. Changes made through this
+# worker move it at once; other workers' changes once the shared counter is
+# next read, within INDEX_SYNC_INTERVAL_SECONDS.
+_cache: LRUCache[CachedResponse] = LRUCache(settings.RESPONSE_CACHE_SIZE)
+_shared_revision = 0
+_local_revision = 0
+_not_modified = 0
+
+
+def revision() -> Tuple[int, int]:
+    return (_shared_revision, _local_revision)
+
+
+def item_key(explanation_id) -> Hashable:
+    return ("explanation", str(explanation_id), revision())
+
+
+def list_key(skip: int, limit: int, query: str) -> Hashable:
+    return ("list", revision(), skip, limit, query)
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag: identical bytes, identical tag."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def lookup(key: Hashable) -> Optional[CachedResponse]:
+    return _cache.get(key)
+
+
+def prepare(body: bytes) -> CachedResponse:
+    return CachedResponse(body, etag_for(body))
+
+
+def store(key: Hashable, body: bytes) -> CachedResponse:
+    cached = prepare(body)
+    _cache.put(key, cached)
+    return cached
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def respond(request: Request, cached: CachedResponse) -> Response:
+    """The cached body, or 304 Not Modified if the client already has it."""
+    global _not_modified
+    # no-cache lets browsers keep the body but revalidate it on every read
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, cached.etag):
+        _not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+async def _bump_revision(explanation) -> None:
+    global _local_revision
+    _local_revision += 1
+    await revisions.bump()
+
+
+async def sync_revision() -> None:
+    """Pick up the shared revision, moved by every worker's and the CLI's writes."""
+    global _shared_revision
+    _shared_revision = await revisions.current()
+
+
+async def run_revision_sync() -> None:
+    """Keep this worker's revision in step with the others; meant to run as a background task."""
+    while True:
+        await asyncio.sleep(settings.INDEX_SYNC_INTERVAL_SECONDS)
+        try:
+            await sync_revision()
+        except Exception as e:
+            logger.error(f"Response cache revision sync failed: {e}")
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+def get_stats() -> dict:
+    return {**_cache.stats(), "not_modified": _not_modified}
+
+
+for _event in ("created", "saved", "deleted"):
+    events.subscribe(_event, _bump_revision)
+register_collector("response_cache", get_stats)
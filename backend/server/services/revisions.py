@@ -0,0 +1,26 @@
+from ..models import Revision
+
+# Counter for every change to the explanations collection
+EXPLANATIONS = "explanations"
+# Counter for bulk imports, which in-memory indexes can't pick up incrementally
+IMPORTS = "imports"
+
+
+async def bump(database=None, name: str = EXPLANATIONS) -> None:
+    """
+    Count a change so every worker's caches keyed on `name` go stale. Pass
+    the Motor database when Beanie isn't initialized (CLI).
+    """
+    if database is None:
+        await Revision.find_one(Revision.id == name).update(
+            {"$inc": {"value": 1}}, upsert=True
+        )
+    else:
+        await database[Revision.Settings.name].update_one(
+            {"_id": name}, {"$inc": {"value": 1}}, upsert=True
+        )
+
+
+async def current(name: str = EXPLANATIONS) -> int:
+    revision = await Revision.get(name)
+    return revision.value if revision else 0
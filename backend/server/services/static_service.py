@@ -2,4 +2,8 @@ from pathlib import Path
 
 
 STATIC_PATH = Path("./static")
-STATIC_PATH.mkdir(exist_ok=True)
+
+
+def ensure_static_dir() -> None:
+    """Create the static directory; called from the app lifespan, not at import."""
+    STATIC_PATH.mkdir(exist_ok=True)
@@ -1,27 +1,27 @@
-import os
-import openai
 from pydantic import BaseModel
-import requests
 import logging
-from duckduckgo_search import DDGS
+import threading
 from server.models import ExplanationEntry
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Any
-import httpx
+from concurrent.futures import as_completed, TimeoutError
+from typing import Any, Callable, Dict, List
 from ...config import settings
+from .condense import condense_snippets
+from .json_repair import parse_model_output
+from .ranking import dedupe_candidates, rank_candidates, score_candidate
+from .routing import Tier, model_for_tier, record, cascade_enabled
+from .backends import get_pool, is_backend_failure
+from .limiter import llm_slot
+from .pools import pool
+from .search import ddgs_session as _ddgs_session
+from .search import reset_ddgs_session, search_all
+from .streaming import GenerationCancelled, PartialCallback, collect_stream, partial_parser
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Number of worker threads
-MAX_WORKERS = 5
-
-# Configure OpenAI
-openai.base_url = settings.OPENAI_API_BASE  # Local server URL
-openai.api_key = "sk-no-key-needed"  # Dummy key for local models
-openai.api_type = "open_ai"  # For local models
-openai.base_url = settings.OPENAI_API_BASE  # New OpenAI client needs this
+# Bump when the explanation prompts change; older entries get refreshed
+PROMPT_VERSION = 2
 
 
 class RankingEntry(BaseModel):
@@ -54,6 +54,151 @@ class SynonymNuance(BaseModel):
     emotional_weight: str
 
 
+class NuanceBatchSchema(BaseModel):
+    nuances: list[SynonymNuance]
+
+
+def _response_format(schema: type[BaseModel]) -> Dict[str, Any]:
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "schema": schema.model_json_schema()},
+    }
+
+
+def create_completion(
+    tier: Tier, consume: Callable[[Any], Any] | None = None, kind: str | None = None, **kwargs
+):
+    """
+    Send a chat completion to the least loaded healthy backend, retrying once
+    on another backend if the first one fails. Runs under the adaptive
+    concurrency limit and circuit breaker; `kind` groups calls of similar
+    length for the limit's latency baseline and defaults to the tier.
+
+    A streamed response is read by `consume` while the backend and the
+    concurrency slot are still held; its return value is returned instead.
+    """
+    pool = get_pool()
+    tried = set()
+    attempts = min(2, len(pool.backends))
+    with llm_slot(is_backend_failure, kind or tier):
+        for attempt in range(attempts):
+            try:
+                with pool.acquire(exclude=tried) as backend:
+                    tried.add(backend)
+                    response = backend.client.chat.completions.create(
+                        model=backend.model_name(model_for_tier(tier)), **kwargs
+                    )
+                    return consume(response) if consume else response
+            except Exception as e:
+                if attempt + 1 == attempts or not is_backend_failure(e):
+                    raise
+                logger.warning(f"LLM backend {backend.base_url} failed, retrying: {e}")
+
+
+def _complete(
+    tier: Tier,
+    on_partial: PartialCallback | None,
+    schema: type[BaseModel],
+    cancelled: threading.Event | None = None,
+    **kwargs,
+) -> List[str | None]:
+    """Run a completion and return the content of each choice, streaming if asked to."""
+    # Calls for the same schema take about as long as each other
+    kind = f"{tier}:{schema.__name__}"
+    if on_partial is None:
+        response = create_completion(tier, kind=kind, **kwargs)
+        return [choice.message.content for choice in response.choices]
+
+    feed = partial_parser(schema, on_partial, settings.STREAM_PARTIAL_INTERVAL_SECONDS)
+    contents = create_completion(
+        tier,
+        consume=lambda response: collect_stream(response, feed, cancelled),
+        kind=kind,
+        stream=True,
+        **kwargs,
+    )
+    return contents or [None]
+
+
+def chat_json(
+    schema: type[BaseModel],
+    messages: List[Dict[str, str]],
+    temperature: float,
+    defaults: Dict[str, Any] | None = None,
+    tier: Tier = "large",
+    on_partial: PartialCallback | None = None,
+    cancelled: threading.Event | None = None,
+):
+    """
+    Run a chat completion constrained to the schema and parse the output,
+    repairing malformed JSON locally before falling back to a re-prompt.
+    With `on_partial`, the response is streamed and the fields parsed so far
+    are reported while it is generated. Setting `cancelled` stops a streamed
+    response and any re-prompt with GenerationCancelled.
+    """
+    for attempt in range(settings.LLM_JSON_REPROMPTS + 1):
+        if cancelled is not None and cancelled.is_set():
+            raise GenerationCancelled()
+        record(f"{tier}_calls")
+        content = _complete(
+            tier,
+            on_partial,
+            schema,
+            cancelled,
+            messages=messages,
+            response_format=_response_format(schema),
+            temperature=temperature,
+        )[0]
+        result = parse_model_output(schema, content, defaults)
+        if result is not None:
+            return result
+
+        logger.warning(
+            f"Unparseable {schema.__name__} output (attempt {attempt + 1}): {content!r:.200}"
+        )
+        messages = messages + [
+            {"role": "assistant", "content": content or ""},
+            {
+                "role": "user",
+                "content": "Svaret var inte giltig JSON. Svara ENDAST med giltig JSON i det angivna formatet.",
+            },
+        ]
+
+    raise ValueError(f"Could not parse {schema.__name__} from model output")
+
+
+def chat_json_choices(
+    schema: type[BaseModel],
+    messages: List[Dict[str, str]],
+    temperature: float,
+    n: int,
+    defaults: Dict[str, Any] | None = None,
+    tier: Tier = "large",
+    on_partial: PartialCallback | None = None,
+) -> list:
+    """
+    Ask for n completions in a single request and return every choice that
+    parses. Backends that ignore `n` simply return fewer choices.
+    With `on_partial`, the first choice is reported while it is generated.
+    """
+    record(f"{tier}_calls")
+    contents = _complete(
+        tier,
+        on_partial,
+        schema,
+        messages=messages,
+        response_format=_response_format(schema),
+        temperature=temperature,
+        n=n,
+    )
+    results = []
+    for content in contents:
+        result = parse_model_output(schema, content, defaults)
+        if result is not None:
+            results.append(result)
+    return results
+
+
 def search_parallel(queries: List[str], max_results: int = 3) -> List[Dict[str, Any]]:
     """
     Run multiple searches in parallel
@@ -61,46 +206,59 @@ def search_parallel(queries: List[str], max_results: int = 3) -> List[Dict[str,
 
     def search_one(query: str) -> List[Dict[str, Any]]:
         try:
-            with DDGS() as ddgs:
-                return list(ddgs.text(query, max_results=max_results))
+            return list(_ddgs_session().text(query, max_results=max_results))
         except Exception as e:
             logger.error(f"Search failed for query '{query}': {e}")
+            reset_ddgs_session()
             return []
 
     all_results = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_query = {
-            executor.submit(search_one, query): query for query in queries
-        }
-        for future in as_completed(future_to_query):
-            query = future_to_query[future]
-            try:
-                results = future.result()
-                all_results.extend(results)
-                logger.info(f"Search completed for query: {query}")
-            except Exception as e:
-                logger.error(f"Search failed for query '{query}': {e}")
+    future_to_query = {
+        pool("search").submit(search_one, query): query for query in queries
+    }
+    for future in as_completed(future_to_query):
+        query = future_to_query[future]
+        try:
+            results = future.result()
+            all_results.extend(results)
+            logger.info(f"Search completed for query: {query}")
+        except Exception as e:
+            logger.error(f"Search failed for query '{query}': {e}")
 
     return all_results
 
 
 def generate_results_parallel(
-    synonym: str, search_info: str, num_results: int = 5
+    synonym: str,
+    search_info: str,
+    num_results: int = 5,
+    timeout: float | None = None,
+    temperature: float = 0,
+    tier: Tier = "large",
+    on_partial: PartialCallback | None = None,
 ) -> List[CreateSynonymSchema]:
     """
-    Generate multiple results in parallel
+    Generate multiple results in parallel.
+    With a timeout, returns whatever finished in time instead of waiting for stragglers.
     """
 
     def generate_one(i: int) -> CreateSynonymSchema:
         logger.info(f"Generating result {i + 1}/{num_results}...")
-        return create_synonym_ai(synonym, search_info=search_info)
+        return create_synonym_ai(
+            synonym,
+            search_info=search_info,
+            temperature=temperature,
+            tier=tier,
+            # Only one result is shown while it streams
+            on_partial=on_partial if i == 0 else None,
+        )
 
     results = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_index = {
-            executor.submit(generate_one, i): i for i in range(num_results)
-        }
-        for future in as_completed(future_to_index):
+    future_to_index = {
+        pool("llm").submit(generate_one, i): i for i in range(num_results)
+    }
+    try:
+        for future in as_completed(future_to_index, timeout=timeout):
             index = future_to_index[future]
             try:
                 result = future.result()
@@ -109,10 +267,64 @@ def generate_results_parallel(
                     logger.info(f"Generated result {index + 1}")
             except Exception as e:
                 logger.error(f"Failed to generate result {index + 1}: {e}")
+    except TimeoutError:
+        logger.warning(
+            f"Stopped waiting for results after {timeout}s with {len(results)}/{num_results} done"
+        )
+    finally:
+        # Drop stragglers that haven't started; running ones finish in the background
+        for future in future_to_index:
+            future.cancel()
 
     return results
 
 
+def generate_candidates(
+    synonym: str,
+    search_info: str,
+    num_candidates: int,
+    tier: Tier = "small",
+    on_partial: PartialCallback | None = None,
+) -> List[CreateSynonymSchema]:
+    """
+    Generate several candidate explanations as cheaply as possible: one
+    request with `n` completions, topped up with parallel requests (bounded by
+    a timeout) when the backend returns fewer choices.
+    """
+    if num_candidates <= 1:
+        return generate_results_parallel(
+            synonym, search_info, 1, tier=tier, on_partial=on_partial
+        )
+
+    candidates: List[CreateSynonymSchema] = []
+    try:
+        candidates = chat_json_choices(
+            CreateSynonymSchema,
+            _synonym_messages(synonym, search_info=search_info),
+            temperature=settings.CANDIDATE_TEMPERATURE,
+            n=num_candidates,
+            defaults={"word": synonym},
+            tier=tier,
+            on_partial=on_partial,
+        )
+        logger.info(f"Got {len(candidates)} candidates from a single request")
+    except Exception as e:
+        logger.error(f"Multi-choice generation failed: {e}")
+
+    missing = num_candidates - len(candidates)
+    if missing > 0:
+        candidates += generate_results_parallel(
+            synonym,
+            search_info,
+            missing,
+            timeout=settings.CANDIDATE_TIMEOUT_SECONDS,
+            temperature=settings.CANDIDATE_TEMPERATURE,
+            tier=tier,
+            on_partial=on_partial if not candidates else None,
+        )
+    return candidates
+
+
 def get_search_queries(synonym: str) -> list[str]:
     """
     Ask AI for good search queries for this word.
@@ -148,15 +360,7 @@ def get_search_queries(synonym: str) -> list[str]:
     ]
 
     try:
-        response = openai.beta.chat.completions.parse(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-            response_format=SearchQueriesSchema,
-            temperature=0.7,
-        )
-        result = SearchQueriesSchema.model_validate_json(
-            response.choices[0].message.content
-        )
+        result = chat_json(SearchQueriesSchema, messages, temperature=0.7, tier="small")
         return result.queries
     except Exception as e:
         logger.error(f"Failed to get search queries from AI: {e}")
@@ -181,37 +385,67 @@ def get_search_results(synonym: str) -> str:
 
     # Get all search results in parallel
     all_results = search_parallel(queries)
+    return format_search_results(synonym, all_results)
+
+
+async def get_search_results_async(synonym: str) -> str:
+    """
+    Like get_search_results, but searches every query on all configured
+    providers with hedged requests instead of DuckDuckGo alone.
+    """
+    logger.info(f"Searching for information about: {synonym}")
+
+    queries = await pool("llm").run(get_search_queries, synonym)
+    logger.info(f"Using search queries: {queries}")
+
+    all_results = await search_all(queries)
+    return await pool("cpu").run(format_search_results, synonym, all_results)
+
+
+def format_search_results(synonym: str, all_results: List[Dict[str, Any]]) -> str:
+    # Drop near-duplicates and fit the most relevant snippets into the budget
+    snippets, stats = condense_snippets(
+        (r.get("body") for r in all_results),
+        synonym,
+        token_budget=settings.SEARCH_CONTEXT_TOKENS,
+        duplicate_threshold=settings.SEARCH_DUPLICATE_THRESHOLD,
+    )
+    logger.info(
+        f"Condensed search results for {synonym}: kept {stats.snippets_kept}/{stats.snippets_in} snippets, "
+        f"{stats.near_duplicates} near-duplicates, saved {stats.tokens_saved} tokens"
+    )
 
     # Format search results for prompt
     search_info = "Sökresultat:\n"
-    seen_snippets = set()  # Avoid duplicates
-
-    for r in all_results:
-        if r.get("body"):
-            snippet = r.get("body").strip()
-            if snippet and snippet not in seen_snippets:
-                search_info += f"- {snippet}\n"
-                seen_snippets.add(snippet)
+    for snippet in snippets:
+        search_info += f"- {snippet}\n"
 
     return search_info
 
 
-def create_synonym_ai(
+def _synonym_messages(
     synonym: str,
     previous_entries: list[ExplanationEntry] = None,
     is_validation: bool = False,
-    search_info: str = None,
-):
-    # Only search if no search_info provided
-    if search_info is None:
-        search_info = get_search_results(synonym)
-
+    search_info: str = "",
+) -> List[Dict[str, str]]:
     if is_validation:
-        base_prompt = """Du är en språkexpert som validerar synonymer och förklaringar. 
+        base_prompt = f"""Du är en språkexpert som validerar synonymer och förklaringar. 
             Din uppgift är att granska det tidigare resultatet och bekräfta om det är korrekt och användbart.
             Om du hittar fel eller möjliga förbättringar, ge en förbättrad version.
             Ditt svar MÅSTE vara på SVENSKA, inget annat språk är tillåtet.
-            HALLUCINERA INTE. Om det inte finns några synonymer, ange tydligt att det inte finns några."""
+            HALLUCINERA INTE. Om det inte finns några synonymer, ange tydligt att det inte finns några.
+            
+            Här är information från sökningar om ordet '{synonym}':
+            
+            {search_info}
+            
+            Svaret MÅSTE vara i detta format:
+            {{
+                "word": "ordet som söktes",
+                "synonyms": ["synonym1", "synonym2", "etc"],
+                "explanation": "En tydlig förklaring av ordets betydelse"
+            }}"""
     else:
         base_prompt = f"""Du är en AI som spelar rollen som språklärare. Din uppgift är att ge synonymer och förklara ord och meningar för användaren.
             Ditt svar MÅSTE vara på SVENSKA, inget annat språk är tillåtet.
@@ -270,99 +504,231 @@ def create_synonym_ai(
                 }
             )
 
+    return messages
+
+
+def create_synonym_ai(
+    synonym: str,
+    previous_entries: list[ExplanationEntry] = None,
+    is_validation: bool = False,
+    search_info: str = None,
+    temperature: float = 0,
+    tier: Tier = "large",
+    on_partial: PartialCallback | None = None,
+):
+    # Only search if no search_info provided
+    if search_info is None:
+        search_info = get_search_results(synonym)
+
+    messages = _synonym_messages(synonym, previous_entries, is_validation, search_info)
+
     try:
-        response = openai.beta.chat.completions.parse(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-            response_format=CreateSynonymSchema,
-            temperature=0,
-        )
-        logger.info(f"Got response from AI model")
-        return CreateSynonymSchema.model_validate_json(
-            response.choices[0].message.content
+        result = chat_json(
+            CreateSynonymSchema,
+            messages,
+            temperature=temperature,
+            defaults={"word": synonym},
+            tier=tier,
+            on_partial=on_partial,
         )
+        logger.info(f"Got response from AI model ({tier})")
+        return result
     except Exception as e:
         logger.error(f"Failed to get response from AI model: {e}")
         return None
 
 
-def create_and_validate_synonym(synonym: str) -> CreateSynonymSchema:
+def create_draft_synonym(
+    synonym: str,
+    on_partial: PartialCallback | None = None,
+    cancelled: threading.Event | None = None,
+) -> CreateSynonymSchema | None:
+    """
+    Fast, ungrounded answer from the model's own knowledge.
+    Shown to the user while the search-grounded answer is being generated;
+    `cancelled` is set once that answer is ready and the draft is moot.
+    """
+    messages = [
+        {
+            "role": "system",
+            "content": f"""Du är en AI som spelar rollen som språklärare. Din uppgift är att ge synonymer och förklara ord för användaren.
+            Ditt svar MÅSTE vara på SVENSKA, inget annat språk är tillåtet.
+            Svara kort utifrån din egen kunskap. HALLUCINERA INTE. Om du inte känner till ordet, ange det tydligt.
+            
+            Svaret MÅSTE vara i detta format:
+            {{
+                "word": "{synonym}",
+                "synonyms": ["synonym1", "synonym2", "etc"],
+                "explanation": "En tydlig förklaring av ordets betydelse"
+            }}""",
+        },
+        {
+            "role": "user",
+            "content": f"Vad har '{synonym}' för synonymer och vad betyder det?",
+        },
+    ]
+
+    try:
+        return chat_json(
+            CreateSynonymSchema,
+            messages,
+            temperature=0,
+            defaults={"word": synonym},
+            tier="small",
+            on_partial=on_partial,
+            cancelled=cancelled,
+        )
+    except GenerationCancelled:
+        logger.info(f"Stopped the draft for {synonym}, the grounded answer is ready")
+        return None
+    except Exception as e:
+        logger.error(f"Failed to create draft for {synonym}: {e}")
+        return None
+
+
+def rank_with_llm(
+    synonym: str, candidates: List[CreateSynonymSchema]
+) -> CreateSynonymSchema:
     """
-    Creates multiple synonym explanations in parallel, ranks them, and selects the best one.
+    Let the AI pick the best of a few candidates. Falls back to the first
+    one, the best by local ranking, when the answer names no candidate.
     """
-    logger.info(f"Generating multiple synonym results for: {synonym}")
-
-    # Get search results once
-    search_info = get_search_results(synonym)
-
-    # Generate results in parallel
-    results = generate_results_parallel(synonym, search_info, 1)
-    return results[0]
-
-    # if not results:
-    #     logger.error("Failed to generate any valid synonym results")
-    #     raise Exception("Failed to generate synonym results")
-
-    # if len(results) == 1:
-    #     logger.info("Only one result generated, returning without ranking")
-    #     return results[0]
-
-    # # Create a ranking prompt for the AI
-    # ranking_messages = [
-    #     {
-    #         "role": "system",
-    #         "content": """Du är en språkexpert som ska ranka olika synonymförklaringar. 
-    #         Bedöm varje förklaring baserat på följande kriterier:
-    #         1. Precision och korrekthet i synonymerna
-    #         2. Tydlighet och användbarhet i förklaringen
-    #         3. Omfattning och fullständighet
+    ranking_messages = [
+        {
+            "role": "system",
+            "content": """Du är en språkexpert som ska ranka olika synonymförklaringar. 
+            Bedöm varje förklaring baserat på följande kriterier:
+            1. Precision och korrekthet i synonymerna
+            2. Tydlighet och användbarhet i förklaringen
+            3. Omfattning och fullständighet
             
-    #         VIKTIGT! Du MÅSTE svara i detta JSON-format:
-    #         {
-    #             "rankings": [
-    #                 {"index": "1", "rank": 1, "motivation": "Bäst för att..."},
-    #                 {"index": "2", "rank": 2, "motivation": "Näst bäst för att..."},
-    #                 ...
-    #             ]
-    #         }""",
-    #     },
-    #     {
-    #         "role": "user",
-    #         "content": f"Ranka följande förklaringar för ordet '{synonym}':\n"
-    #         + "\n".join(
-    #             [
-    #                 f"Alternativ {i + 1}:\nSynonymer: {r.synonyms}\nFörklaring: {r.explanation}"
-    #                 for i, r in enumerate(results)
-    #             ]
-    #         ),
-    #     },
-    # ]
-
-    # try:
-    #     ranking_response = openai.beta.chat.completions.parse(
-    #         model=settings.OPENAI_MODEL,
-    #         messages=ranking_messages,
-    #         response_format=RankingSchema,
-    #         temperature=0,
-    #     )
-
-    #     # Parse the ranking response and get the best result
-    #     rankings = RankingSchema.model_validate_json(
-    #         ranking_response.choices[0].message.content
-    #     )
-    #     best_index = min(rankings.rankings, key=lambda x: x.rank).index
-    #     best_result = results[int(best_index) - 1]
-
-    #     logger.info(
-    #         f"Successfully ranked results and selected best option (rank {best_index})"
-    #     )
-    #     return best_result
-
-    # except Exception as e:
-    #     logger.error(f"Failed during ranking process: {e}")
-    #     # Fallback to first result if ranking fails
-    #     logger.info("Falling back to first generated result")
-    #     return results[0]
+            VIKTIGT! Du MÅSTE svara i detta JSON-format:
+            {
+                "rankings": [
+                    {"index": "1", "rank": 1, "motivation": "Bäst för att..."},
+                    {"index": "2", "rank": 2, "motivation": "Näst bäst för att..."},
+                    ...
+                ]
+            }""",
+        },
+        {
+            "role": "user",
+            "content": f"Ranka följande förklaringar för ordet '{synonym}':\n"
+            + "\n".join(
+                [
+                    f"Alternativ {i + 1}:\nSynonymer: {r.synonyms}\nFörklaring: {r.explanation}"
+                    for i, r in enumerate(candidates)
+                ]
+            ),
+        },
+    ]
+
+    try:
+        rankings = chat_json(
+            RankingSchema, ranking_messages, temperature=0, tier="large"
+        )
+        best_index = int(min(rankings.rankings, key=lambda x: x.rank).index)
+        if not 1 <= best_index <= len(candidates):
+            raise ValueError(f"ranking picked option {best_index} of {len(candidates)}")
+        logger.info(f"AI ranking selected option {best_index}")
+        return candidates[best_index - 1]
+    except Exception as e:
+        logger.error(f"Failed during ranking process: {e}")
+        # Fallback to the local ranking's best if ranking fails
+        logger.info("Falling back to the best locally ranked result")
+        return candidates[0]
+
+
+def _synonyms_agree(a: CreateSynonymSchema, b: CreateSynonymSchema) -> bool:
+    first = {s.lower().strip() for s in a.synonyms}
+    second = {s.lower().strip() for s in b.synonyms}
+    if not first and not second:
+        return True
+    return len(first & second) / len(first | second) >= 0.5
+
+
+def validate_or_escalate(
+    synonym: str, candidate: CreateSynonymSchema, score: float, search_info: str
+) -> CreateSynonymSchema:
+    """
+    Decide whether a small-model answer is good enough.
+
+    Candidates that fail the local heuristics go straight to the large model.
+    The rest are reviewed by the small model in validation mode, and only
+    escalated when the review disagrees with the candidate.
+    """
+    if not cascade_enabled():
+        return candidate
+
+    previous = [
+        ExplanationEntry(synonyms=candidate.synonyms, explanation=candidate.explanation)
+    ]
+    if score >= settings.CASCADE_ESCALATION_SCORE:
+        review = create_synonym_ai(
+            synonym,
+            previous_entries=previous,
+            is_validation=True,
+            search_info=search_info,
+            tier="small",
+        )
+        if review and _synonyms_agree(candidate, review):
+            record("accepted_small")
+            return candidate
+
+    logger.info(f"Escalating {synonym} to the large model (score {score:.3f})")
+    record("escalations")
+    escalated = create_synonym_ai(
+        synonym,
+        previous_entries=previous,
+        is_validation=True,
+        search_info=search_info,
+        tier="large",
+    )
+    return escalated or candidate
+
+
+def create_and_validate_synonym(
+    synonym: str,
+    search_info: str | None = None,
+    on_partial: PartialCallback | None = None,
+) -> CreateSynonymSchema:
+    """
+    Creates several synonym explanations, ranks them locally, and selects the best one.
+    The AI ranker is only consulted when the top local scores are too close to call.
+    """
+    logger.info(f"Generating synonym candidates for: {synonym}")
+
+    # Get search results once, unless the caller already has them
+    if search_info is None:
+        search_info = get_search_results(synonym)
+
+    results = dedupe_candidates(
+        generate_candidates(
+            synonym, search_info, settings.SYNONYM_CANDIDATES, on_partial=on_partial
+        )
+    )
+    if not results:
+        logger.error("Failed to generate any valid synonym results")
+        raise Exception("Failed to generate synonym results")
+
+    if len(results) == 1:
+        logger.info("Only one result generated, returning without ranking")
+        best = results[0]
+        return validate_or_escalate(
+            synonym, best, score_candidate(best, synonym, search_info), search_info
+        )
+
+    ranked = rank_candidates(results, synonym, search_info)
+    (best_score, best), (runner_up_score, _) = ranked[0], ranked[1]
+    logger.info(
+        f"Local scores for {synonym}: {[round(score, 3) for score, _ in ranked]}"
+    )
+    if best_score - runner_up_score < settings.RANKING_MARGIN:
+        close = [c for score, c in ranked if best_score - score < settings.RANKING_MARGIN]
+        best = rank_with_llm(synonym, close)
+        best_score = score_candidate(best, synonym, search_info)
+
+    return validate_or_escalate(synonym, best, best_score, search_info)
 
 
 async def analyze_synonym_nuances(word1: str, word2: str) -> SynonymNuance:
@@ -412,13 +778,68 @@ async def analyze_synonym_nuances(word1: str, word2: str) -> SynonymNuance:
     ]
 
     try:
-        response = openai.beta.chat.completions.parse(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-            response_format=SynonymNuance,
+        # Run in a thread: the call may wait for a concurrency slot
+        return await pool("llm").run(
+            chat_json,
+            SynonymNuance,
+            messages,
             temperature=0.7,
+            defaults={"word1": word1, "word2": word2},
+            tier="large",
         )
-        return SynonymNuance.model_validate_json(response.choices[0].message.content)
     except Exception as e:
         logger.error(f"Failed to analyze nuances: {e}")
         raise
+
+
+async def analyze_nuance_batch(pairs: List[tuple[str, str]]) -> List[SynonymNuance]:
+    """
+    Analyze several word pairs in one request. The model may skip or mangle
+    pairs; callers match results back to the pairs they asked for.
+    """
+    logger.info(f"Analyzing nuances for {len(pairs)} pairs in one request")
+
+    pair_lines = "\n".join(f"- '{word1}' och '{word2}'" for word1, word2 in pairs)
+    messages = [
+        {
+            "role": "system",
+            "content": """Du är en expert på svenska språket med djup förståelse för nyanser mellan ord.
+                Din uppgift är att analysera de subtila skillnaderna mellan flera par av synonymer.
+                
+                Ditt svar MÅSTE vara på SVENSKA och i detta format, med ett objekt per ordpar:
+                {
+                    "nuances": [
+                        {
+                            "word1": "första ordet i paret",
+                            "word2": "andra ordet i paret",
+                            "nuance_explanation": "En detaljerad förklaring av nyanserna mellan orden",
+                            "usage_examples": [
+                                "Exempel på när word1 passar bättre",
+                                "Exempel på när word2 passar bättre"
+                            ],
+                            "context_differences": "Förklaring av i vilka sammanhang respektive ord passar bäst",
+                            "formality_level": "word1_more_formal/word2_more_formal/equally_formal",
+                            "emotional_weight": "word1_stronger/word2_stronger/equally_strong"
+                        }
+                    ]
+                }
+                
+                VIKTIGT:
+                - Analysera VARJE ordpar, i den ordning de anges
+                - Skriv word1 och word2 EXAKT som i frågan
+                - Var MYCKET specifik om skillnaderna
+                - Ge konkreta exempel
+                - För formality_level, använd ENDAST "word1_more_formal", "word2_more_formal" eller "equally_formal"
+                - För emotional_weight, använd ENDAST "word1_stronger", "word2_stronger" eller "equally_strong"
+                - ANVÄND BARA DESSA EXAKTA VÄRDEN, INGA ANDRA VARIANTER TILLÅTS""",
+        },
+        {
+            "role": "user",
+            "content": f"Analysera nyanserna mellan följande ordpar:\n{pair_lines}",
+        },
+    ]
+
+    result = await pool("llm").run(
+        chat_json, NuanceBatchSchema, messages, temperature=0.7, tier="large"
+    )
+    return result.nuances
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+from ...config import settings
+from ..metrics import register_collector
+
+if TYPE_CHECKING:
+    import httpx
+    import openai
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+
+
+class Backend:
+    """One OpenAI-compatible inference server and its health/load state."""
+
+    def __init__(self, base_url: str, model_map: Optional[Dict[str, str]] = None):
+        self.base_url = base_url
+        self.model_map = model_map or {}
+        self.outstanding = 0
+        self.latency_ewma: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self._client: Optional["openai.OpenAI"] = None
+
+    @property
+    def client(self) -> "openai.OpenAI":
+        if self._client is None:
+            # openai is slow to import; workers only pay for it on the first LLM call
+            import openai
+
+            self._client = openai.OpenAI(
+                base_url=self.base_url,
+                api_key="sk-no-key-needed",  # Dummy key for local models
+                timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                max_retries=0,  # The pool retries on another backend instead
+            )
+        return self._client
+
+    def model_name(self, model: str) -> str:
+        """Name this backend serves the logical model under."""
+        return self.model_map.get(model, model)
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+    def stats(self, now: float) -> dict:
+        return {
+            "base_url": self.base_url,
+            "healthy": not self.is_ejected(now),
+            "outstanding": self.outstanding,
+            "latency_ewma": self.latency_ewma,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+def is_backend_failure(error: Exception) -> bool:
+    """Errors that say something about the backend's health rather than the request."""
+    import openai
+
+    return isinstance(
+        error,
+        (openai.APIConnectionError, openai.InternalServerError, openai.RateLimitError),
+    )
+
+
+class BackendPool:
+    """
+    Routes LLM calls across several OpenAI-compatible servers.
+
+    Picks the backend with the fewest outstanding requests (or the lowest
+    expected wait in "latency" mode), ejects backends after repeated failures
+    and re-admits them once the ejection period passes or a health check
+    succeeds.
+    """
+
+    def __init__(self, backends: List[Backend], strategy: str = "least_outstanding"):
+        if not backends:
+            raise ValueError("BackendPool needs at least one backend")
+        self.backends = backends
+        self.strategy = strategy
+        self._lock = threading.Lock()
+
+    def _cost(self, backend: Backend) -> tuple:
+        latency = backend.latency_ewma or 0.0
+        if self.strategy == "latency":
+            return ((backend.outstanding + 1) * latency, random.random())
+        return (backend.outstanding, latency, random.random())
+
+    def choose(self, exclude: Optional[set] = None) -> Backend:
+        now = time.monotonic()
+        candidates = [b for b in self.backends if not exclude or b not in exclude]
+        if not candidates:
+            candidates = self.backends
+        available = [b for b in candidates if not b.is_ejected(now)]
+        if not available:
+            # Everything is ejected: try the one that is due back first
+            return min(candidates, key=lambda b: b.ejected_until)
+        return min(available, key=self._cost)
+
+    @contextmanager
+    def acquire(self, exclude: Optional[set] = None) -> Iterator[Backend]:
+        with self._lock:
+            backend = self.choose(exclude)
+            backend.outstanding += 1
+            backend.requests += 1
+
+        started = time.monotonic()
+        try:
+            yield backend
+        except Exception as e:
+            if is_backend_failure(e):
+                self.record_failure(backend)
+            raise
+        else:
+            self.record_success(backend, time.monotonic() - started)
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+
+    def record_success(self, backend: Backend, latency: Optional[float] = None):
+        with self._lock:
+            backend.consecutive_failures = 0
+            backend.ejected_until = 0.0
+            if latency is None:
+                return
+            if backend.latency_ewma is None:
+                backend.latency_ewma = latency
+            else:
+                backend.latency_ewma += LATENCY_EWMA_ALPHA * (
+                    latency - backend.latency_ewma
+                )
+
+    def record_failure(self, backend: Backend):
+        with self._lock:
+            backend.failures += 1
+            backend.consecutive_failures += 1
+            if backend.consecutive_failures < settings.BACKEND_EJECT_AFTER_FAILURES:
+                return
+            backend.ejected_until = time.monotonic() + settings.BACKEND_EJECT_SECONDS
+        logger.warning(
+            f"Ejecting LLM backend {backend.base_url} for {settings.BACKEND_EJECT_SECONDS}s "
+            f"after {backend.consecutive_failures} consecutive failures"
+        )
+
+    async def check_health(self, client: "httpx.AsyncClient"):
+        """Actively probe each backend's model list."""
+        for backend in self.backends:
+            try:
+                response = await client.get(f"{backend.base_url.rstrip('/')}/models")
+                response.raise_for_status()
+            except Exception as e:
+                logger.warning(f"Health check failed for {backend.base_url}: {e}")
+                self.record_failure(backend)
+                continue
+            if backend.consecutive_failures:
+                logger.info(f"LLM backend {backend.base_url} is healthy again")
+            self.record_success(backend)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "strategy": self.strategy,
+                "backends": [backend.stats(now) for backend in self.backends],
+            }
+
+
+def parse_api_bases(value: str) -> List[str]:
+    """OPENAI_API_BASE accepts a comma-separated list of endpoints."""
+    return [base.strip() for base in value.split(",") if base.strip()]
+
+
+_pool: Optional[BackendPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> BackendPool:
+    """The process-wide backend pool, built from settings on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BackendPool(
+                    [
+                        Backend(base, settings.OPENAI_BACKEND_MODELS.get(base))
+                        for base in parse_api_bases(settings.OPENAI_API_BASE)
+                    ],
+                    strategy=settings.BACKEND_STRATEGY,
+                )
+    return _pool
+
+
+def get_stats() -> dict:
+    if _pool is None:
+        return {}
+    return _pool.stats()
+
+
+async def run_health_checks(interval: float):
+    """Probe all backends forever; meant to run as a background task."""
+    import httpx
+
+    async with httpx.AsyncClient(timeout=settings.BACKEND_HEALTH_TIMEOUT_SECONDS) as client:
+        while True:
+            await get_pool().check_health(client)
+            await asyncio.sleep(interval)
+
+
+register_collector("llm_backends", get_stats)
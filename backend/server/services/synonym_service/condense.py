@@ -0,0 +1,187 @@
+import random
+import re
+import threading
+import zlib
+from typing import Iterable, List, Tuple
+
+from pydantic import BaseModel
+
+from ..metrics import register_collector
+
+# MinHash parameters
+NUM_PERMUTATIONS = 64
+SHINGLE_SIZE = 3
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures are comparable across calls
+_rng = random.Random(1337)
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+# Words that signal a dictionary-style snippet
+_DEFINITION_HINTS = {
+    "synonym",
+    "synonymer",
+    "betyder",
+    "betydelse",
+    "definition",
+    "förklaring",
+    "innebär",
+    "ord",
+    "ordet",
+    "motsats",
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class CondenseStats(BaseModel):
+    snippets_in: int = 0
+    snippets_kept: int = 0
+    near_duplicates: int = 0
+    dropped_over_budget: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+
+# Totals across all requests in this worker
+_totals = CondenseStats()
+_totals_lock = threading.Lock()
+_requests = 0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for prompt budgeting (about 4 characters per token).
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
+
+
+def _words(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _shingles(words: List[str]) -> set[int]:
+    if len(words) < SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(words).encode())}
+    return {
+        zlib.crc32(" ".join(words[i : i + SHINGLE_SIZE]).encode())
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(text: str) -> List[int]:
+    """
+    MinHash signature over word shingles of a snippet.
+    """
+    shingles = _shingles(_words(text))
+    return [
+        min(((a * s + b) % _MERSENNE_PRIME) & _MAX_HASH for s in shingles)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(sig1: List[int], sig2: List[int]) -> float:
+    """
+    Estimated Jaccard similarity between two MinHash signatures.
+    """
+    matches = sum(1 for h1, h2 in zip(sig1, sig2) if h1 == h2)
+    return matches / NUM_PERMUTATIONS
+
+
+def relevance_score(snippet: str, word: str) -> float:
+    """
+    Score how useful a snippet is for explaining the target word.
+    Mentions of the word (or its inflections) and definition phrasing count,
+    normalised by length so long, rambling snippets don't win by size alone.
+    """
+    words = _words(snippet)
+    if not words:
+        return 0.0
+
+    target = word.lower().strip()
+    mentions = sum(1 for w in words if w == target or w.startswith(target))
+    hints = sum(1 for w in words if w in _DEFINITION_HINTS)
+    density = (2.0 * mentions + hints) / len(words) ** 0.5
+    return density + (1.0 if mentions else 0.0)
+
+
+def condense_snippets(
+    snippets: Iterable[str],
+    word: str,
+    token_budget: int,
+    duplicate_threshold: float = 0.8,
+) -> Tuple[List[str], CondenseStats]:
+    """
+    Remove near-duplicate snippets, rank the rest by relevance to the word and
+    pack as many as fit into the token budget.
+    """
+    stats = CondenseStats()
+    unique: List[Tuple[str, List[int]]] = []
+
+    for raw in snippets:
+        snippet = (raw or "").strip()
+        if not snippet:
+            continue
+        stats.snippets_in += 1
+        stats.tokens_in += estimate_tokens(snippet)
+
+        signature = minhash_signature(snippet)
+        if any(
+            estimate_similarity(signature, seen) >= duplicate_threshold
+            for _, seen in unique
+        ):
+            stats.near_duplicates += 1
+            continue
+        unique.append((snippet, signature))
+
+    ranked = sorted(
+        (snippet for snippet, _ in unique),
+        key=lambda s: relevance_score(s, word),
+        reverse=True,
+    )
+
+    kept: List[str] = []
+    remaining = token_budget
+    for snippet in ranked:
+        cost = estimate_tokens(snippet)
+        if cost > remaining:
+            stats.dropped_over_budget += 1
+            continue
+        kept.append(snippet)
+        remaining -= cost
+
+    stats.snippets_kept = len(kept)
+    stats.tokens_out = token_budget - remaining
+    _record(stats)
+    return kept, stats
+
+
+def _record(stats: CondenseStats) -> None:
+    global _requests
+    with _totals_lock:
+        _requests += 1
+        for field in CondenseStats.model_fields:
+            setattr(_totals, field, getattr(_totals, field) + getattr(stats, field))
+
+
+def get_stats() -> dict:
+    """Cumulative condensation stats for this worker."""
+    with _totals_lock:
+        return {
+            "requests": _requests,
+            **_totals.model_dump(),
+            "tokens_saved": _totals.tokens_saved,
+        }
+
+
+register_collector("search_condense", get_stats)
@@ -0,0 +1,290 @@
+import asyncio
+import logging
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Literal, Optional, Set
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+from pydantic import BaseModel, Field
+
+from ...config import settings
+from ...models import Explanation, ExplanationEntry
+from .. import events, revisions
+from ..metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Re-reading a little before the last sync catches writes other workers
+# made while it ran
+SYNC_OVERLAP = timedelta(seconds=5)
+
+# "out": synonyms the word lists, "in": stored words listing it, "both": either
+Direction = Literal["out", "in", "both"]
+
+
+class RelatedWord(BaseModel):
+    word: str
+    distance: int
+    id: Optional[PydanticObjectId] = None  # Set when the word has a stored explanation
+    listed_by: int  # How many stored words list this one as a synonym
+
+
+class _GraphProjection(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    word: str
+    synonym_keys: List[str] = []
+
+
+class _IdProjection(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+
+
+def normalize(word: str) -> str:
+    return word.strip().casefold()
+
+
+def synonym_keys(entry: Optional[ExplanationEntry]) -> List[str]:
+    """Normalized synonyms of an entry, in order and without duplicates."""
+    keys: Dict[str, None] = {}
+    for synonym in (entry.synonyms if entry else None) or []:
+        key = normalize(synonym)
+        if key:
+            keys[key] = None
+    return list(keys)
+
+
+class SynonymGraph:
+    """
+    Words and the synonyms their latest entry lists, as a directed graph.
+    Every word gets an integer id on first sight; edges are kept both ways
+    as compact int arrays so reverse lookups are as cheap as forward ones.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._words: List[str] = []
+        self._out: List[array] = []
+        self._in: List[array] = []
+        self._explanations: Dict[int, PydanticObjectId] = {}
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def _node(self, word: str) -> int:
+        key = normalize(word)
+        node = self._ids.get(key)
+        if node is None:
+            node = len(self._words)
+            self._ids[key] = node
+            self._words.append(key)
+            self._out.append(array("i"))
+            self._in.append(array("i"))
+        return node
+
+    def _set_edges(self, node: int, targets: Iterable[int]) -> None:
+        for target in self._out[node]:
+            self._in[target].remove(node)
+        self._out[node] = array("i", sorted(set(targets) - {node}))
+        for target in self._out[node]:
+            self._in[target].append(node)
+
+    def _set_word(self, word: str, id: PydanticObjectId, keys: List[str]) -> None:
+        node = self._node(word)
+        self._words[node] = word
+        self._explanations[node] = id
+        self._set_edges(node, [self._node(key) for key in keys])
+
+    def set_word(self, word: str, id: PydanticObjectId, keys: List[str]) -> None:
+        """Add or replace a stored word and the synonyms its latest entry lists."""
+        with self._lock:
+            self._set_word(word, id, keys)
+
+    def remove_word(self, word: str) -> None:
+        """Drop a stored word's edges; it stays a node while others list it."""
+        with self._lock:
+            node = self._ids.get(normalize(word))
+            if node is None:
+                return
+            self._explanations.pop(node, None)
+            self._set_edges(node, [])
+
+    def retain(self, ids: Set[PydanticObjectId]) -> int:
+        """Drop the edges of stored words whose id isn't in `ids`; returns how many."""
+        with self._lock:
+            gone = [node for node, id in self._explanations.items() if id not in ids]
+            for node in gone:
+                del self._explanations[node]
+                self._set_edges(node, [])
+        return len(gone)
+
+    def stored(self) -> int:
+        return len(self._explanations)
+
+    def build(self, words: List[_GraphProjection]) -> None:
+        with self._lock:
+            self._reset()
+            for word in words:
+                self._set_word(word.word, word.id, word.synonym_keys)
+
+    def _neighbours(self, node: int, direction: Direction) -> Iterable[int]:
+        if direction != "in":
+            yield from self._out[node]
+        if direction != "out":
+            yield from self._in[node]
+
+    def related(
+        self, word: str, hops: int = 1, direction: Direction = "both", limit: int = 20
+    ) -> List[RelatedWord]:
+        """Words within `hops` edges, nearest and most listed first."""
+        with self._lock:
+            start = self._ids.get(normalize(word))
+            if start is None:
+                return []
+            distances = {start: 0}
+            frontier = [start]
+            for distance in range(1, hops + 1):
+                next_frontier = []
+                for node in frontier:
+                    for neighbour in self._neighbours(node, direction):
+                        if neighbour not in distances:
+                            distances[neighbour] = distance
+                            next_frontier.append(neighbour)
+                frontier = next_frontier
+            del distances[start]
+            nearest = sorted(
+                distances,
+                key=lambda node: (distances[node], -len(self._in[node]), self._words[node]),
+            )[:limit]
+            return [
+                RelatedWord(
+                    word=self._words[node],
+                    distance=distances[node],
+                    id=self._explanations.get(node),
+                    listed_by=len(self._in[node]),
+                )
+                for node in nearest
+            ]
+
+    def stats(self) -> dict:
+        return {
+            "words": len(self._words),
+            "stored": len(self._explanations),
+            "edges": sum(len(edges) for edges in self._out),
+        }
+
+
+graph = SynonymGraph()
+
+
+async def backfill_synonym_keys() -> None:
+    """Give explanations saved before synonym keys existed their latest entry's keys."""
+    async for explanation in Explanation.find(
+        {"synonym_keys": {"$exists": False}, "entries.0": {"$exists": True}}
+    ):
+        await Explanation.find_one(Explanation.id == explanation.id).update(
+            {"$set": {"synonym_keys": synonym_keys(explanation.entries[-1])}}
+        )
+
+
+_synced_at: Optional[datetime] = None
+_imports: Optional[int] = None  # Import revision the graph was built at
+
+
+async def build_graph() -> None:
+    """Fill this worker's graph with a projection-only read of words and synonym keys."""
+    global _synced_at, _imports
+    synced_at = datetime.now(timezone.utc)
+    _imports = await revisions.current(revisions.IMPORTS)
+    words = [word async for word in Explanation.find().project(_GraphProjection)]
+    graph.build(words)
+    _synced_at = synced_at
+    logger.info(f"Loaded {len(words)} words into the synonym graph")
+
+
+async def sync_graph() -> None:
+    """
+    Pick up words saved, created and deleted through other workers: words
+    updated or added since the last sync, and a full id check only when the
+    collection has fewer words than the graph has stored.
+    """
+    global _synced_at
+    if _synced_at is None or await revisions.current(revisions.IMPORTS) != _imports:
+        await build_graph()
+        return
+    synced_at = datetime.now(timezone.utc)
+    since = _synced_at - SYNC_OVERLAP
+    query = {
+        "$or": [
+            # updated_at is stored as naive local time
+            {"updated_at": {"$gte": since.astimezone().replace(tzinfo=None)}},
+            {"_id": {"$gte": ObjectId.from_datetime(since)}},
+        ]
+    }
+    async for word in Explanation.find(query).project(_GraphProjection):
+        graph.set_word(word.word, word.id, word.synonym_keys)
+    _synced_at = synced_at
+
+    if await Explanation.find().count() < graph.stored():
+        ids = {word.id async for word in Explanation.find().project(_IdProjection)}
+        dropped = graph.retain(ids)
+        logger.info(f"Dropped {dropped} deleted words from the synonym graph")
+
+
+async def run_graph_sync() -> None:
+    """Keep this worker's graph in step with the others; meant to run as a background task."""
+    while True:
+        await asyncio.sleep(settings.INDEX_SYNC_INTERVAL_SECONDS)
+        try:
+            await sync_graph()
+        except Exception as e:
+            logger.error(f"Synonym graph sync failed: {e}")
+
+
+async def listed_by(word: str, limit: int) -> List[Explanation]:
+    """Stored explanations whose latest entry lists `word`, from the multikey index."""
+    return (
+        await Explanation.find({"synonym_keys": normalize(word), "entries.0": {"$exists": True}})
+        .sort(-Explanation.lookup_count)
+        .limit(limit)
+        .to_list()
+    )
+
+
+async def neighbour_synonyms(word: str) -> List[str]:
+    """
+    A provisional synonym list for a word nothing was generated for yet:
+    the stored words that list it, then the other synonyms they list.
+    """
+    key = normalize(word)
+    neighbours = await listed_by(word, settings.RELATED_PREVIEW_SIZE)
+    candidates: Dict[str, None] = {}
+    for explanation in neighbours:
+        candidates[explanation.word] = None
+    for explanation in neighbours:
+        for synonym in synonym_keys(explanation.entries[-1]):
+            candidates[synonym] = None
+    return [word for word in candidates if normalize(word) != key][: settings.RELATED_PREVIEW_SIZE]
+
+
+def _on_created(explanation: Explanation) -> None:
+    graph.set_word(explanation.word, explanation.id, explanation.synonym_keys)
+
+
+def _on_saved(explanation: Explanation) -> None:
+    graph.set_word(explanation.word, explanation.id, synonym_keys(explanation.entries[-1]))
+
+
+def _on_deleted(explanation: Explanation) -> None:
+    graph.remove_word(explanation.word)
+
+
+events.subscribe("created", _on_created)
+events.subscribe("saved", _on_saved)
+events.subscribe("deleted", _on_deleted)
+register_collector("synonym_graph", graph.stats)
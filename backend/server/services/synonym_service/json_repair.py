@@ -0,0 +1,263 @@
+import json
+import logging
+import re
+import typing
+from typing import Any, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def strip_code_fences(text: str) -> str:
+    """
+    Return the body of the first markdown code fence, or the text unchanged.
+    """
+    match = _FENCE_RE.search(text)
+    if not match:
+        return text
+    return match.group(1)
+
+
+def extract_json(text: str) -> Optional[str]:
+    """
+    Cut out the first JSON object or array in the text, dropping any chatter
+    before and after it. A truncated object is returned up to the end of text.
+    """
+    text = strip_code_fences(text)
+    start = next((i for i, c in enumerate(text) if c in "{["), None)
+    if start is None:
+        return None
+
+    depth = 0
+    quote: Optional[str] = None
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+            continue
+        if char in "\"'":
+            quote = char
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return text[start:]
+
+
+def _normalize_quotes(text: str) -> str:
+    """
+    Rewrite single-quoted strings and Python literals into valid JSON.
+    """
+    out = []
+    quote: Optional[str] = None
+    escaped = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if escaped:
+                # \' is not a valid JSON escape, keep the bare quote
+                if char == "'":
+                    out[-1] = "'"
+                else:
+                    out.append(char)
+                escaped = False
+            elif char == "\\":
+                out.append(char)
+                escaped = True
+            elif char == quote:
+                out.append('"')
+                quote = None
+            elif char == '"' and quote == "'":
+                out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+            else:
+                out.append(char)
+            i += 1
+            continue
+
+        if char in "\"'":
+            quote = char
+            out.append('"')
+            i += 1
+            continue
+
+        literal = next((lit for lit in _LITERALS if text.startswith(lit, i)), None)
+        if literal and not (i > 0 and (text[i - 1].isalnum() or text[i - 1] == "_")):
+            out.append(_LITERALS[literal])
+            i += len(literal)
+            continue
+
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _close_truncated(text: str) -> str:
+    """
+    Close an unterminated string and any open arrays/objects, dropping a
+    dangling key or comma left by a cut-off generation.
+    """
+    stack = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+
+    if not stack and not in_string:
+        return text
+
+    if escaped:
+        text = text[:-1]
+    if in_string:
+        text += '"'
+
+    text = text.rstrip()
+    # A dangling `"key":` or `"key"` inside an object has no value to keep
+    if stack and stack[-1] == "}":
+        text = re.sub(r',?\s*"(?:[^"\\]|\\.)*"\s*:?\s*$', "", text)
+    text = text.rstrip().rstrip(",").rstrip(":")
+    return text + "".join(reversed(stack))
+
+
+def _drop_trailing_commas(text: str) -> str:
+    """
+    Remove commas directly before a closing bracket, leaving strings alone.
+    """
+    out = []
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ",":
+            rest = text[i + 1 :].lstrip()
+            if rest[:1] in ("}", "]"):
+                continue
+        out.append(char)
+    return "".join(out)
+
+
+def repair_json(text: str) -> Optional[str]:
+    """
+    Best-effort conversion of almost-JSON model output into valid JSON.
+    """
+    candidate = extract_json(text)
+    if candidate is None:
+        return None
+    candidate = _normalize_quotes(candidate)
+    candidate = _close_truncated(candidate)
+    return _drop_trailing_commas(candidate)
+
+
+def _unescape(raw: str) -> str:
+    """Decode JSON escapes, keeping the raw text if the model wrote invalid ones."""
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return raw
+
+
+def _string_value(text: str, field: str) -> Optional[str]:
+    match = re.search(rf'"{field}"\s*:\s*"((?:[^"\\]|\\.)*)', text)
+    if not match:
+        return None
+    return _unescape(match.group(1))
+
+
+def _list_value(text: str, field: str) -> Optional[list[str]]:
+    match = re.search(rf'"{field}"\s*:\s*\[(.*?)(?:\]|$)', text, re.DOTALL)
+    if not match:
+        return None
+    return [
+        _unescape(item) for item in re.findall(r'"((?:[^"\\]|\\.)*)"', match.group(1))
+    ]
+
+
+def recover_fields(text: str, schema: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Pull whatever top-level string and string-list fields can be found.
+    """
+    normalized = _normalize_quotes(strip_code_fences(text))
+    recovered: Dict[str, Any] = {}
+    for name, field in schema.model_fields.items():
+        is_list = typing.get_origin(field.annotation) is list
+        value = _list_value(normalized, name) if is_list else _string_value(normalized, name)
+        if value is not None:
+            recovered[name] = value
+    return recovered
+
+
+def parse_model_output(
+    schema: Type[SchemaT],
+    text: Optional[str],
+    defaults: Optional[Dict[str, Any]] = None,
+) -> Optional[SchemaT]:
+    """
+    Parse model output into the schema, repairing it locally if needed.
+
+    Tries strict parsing, then a repaired document, then field-by-field
+    recovery where missing fields are filled from `defaults`. Returns None
+    only when nothing usable could be recovered.
+    """
+    if not text:
+        return None
+
+    try:
+        return schema.model_validate_json(text)
+    except ValidationError:
+        pass
+
+    repaired = repair_json(text)
+    if repaired:
+        try:
+            data = json.loads(repaired)
+            if isinstance(data, dict):
+                return schema.model_validate({**(defaults or {}), **data})
+        except (json.JSONDecodeError, ValidationError) as e:
+            logger.info(f"Repaired JSON still invalid for {schema.__name__}: {e}")
+
+    recovered = recover_fields(text, schema)
+    if not recovered:
+        return None
+    try:
+        result = schema.model_validate({**(defaults or {}), **recovered})
+        logger.info(f"Recovered partial {schema.__name__} fields: {sorted(recovered)}")
+        return result
+    except ValidationError:
+        return None
@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Literal, Optional
+
+from ...config import settings
+from ..metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Latency samples before the no-load latency estimate is refreshed
+LATENCY_WINDOW = 50
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(Exception):
+    """The LLM backend is failing; calls are rejected until it recovers."""
+
+
+class LimiterTimeoutError(Exception):
+    """No concurrency slot became free in time."""
+
+
+class CircuitBreaker:
+    """
+    Opens after a run of consecutive failures so callers fail fast, then lets
+    a limited number of probe calls through once the cooldown has passed.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, half_open_probes: int):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.half_open_probes = half_open_probes
+        self.state: CircuitState = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError("LLM backend unavailable, circuit is open")
+                self.state = "half_open"
+                self.probes_in_flight = 0
+                logger.info("LLM circuit half-open, probing backend")
+
+            if self.state == "half_open":
+                if self.probes_in_flight >= self.half_open_probes:
+                    self.rejected += 1
+                    raise CircuitOpenError("LLM backend recovering, probe in progress")
+                self.probes_in_flight += 1
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info("LLM circuit closed")
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.probes_in_flight = 0
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or (
+                self.consecutive_failures >= self.failure_threshold
+            ):
+                if self.state != "open":
+                    logger.warning(
+                        f"LLM circuit opened after {self.consecutive_failures} failures"
+                    )
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.probes_in_flight = 0
+
+    def on_ignored(self) -> None:
+        """A call finished without telling us anything about backend health."""
+        with self._lock:
+            if self.state == "half_open" and self.probes_in_flight:
+                self.probes_in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "rejected": self.rejected,
+            }
+
+
+class LatencyBaseline:
+    """No-load latency estimate for one kind of call: the lowest recent latency."""
+
+    def __init__(self):
+        self.min_latency: Optional[float] = None
+        self._window_min: Optional[float] = None
+        self._window_samples = 0
+
+    def observe(self, latency: float) -> float:
+        """Record a latency and return the current no-load estimate."""
+        self._window_samples += 1
+        self._window_min = (
+            latency if self._window_min is None else min(self._window_min, latency)
+        )
+        if self.min_latency is None or latency < self.min_latency:
+            self.min_latency = latency
+        if self._window_samples >= LATENCY_WINDOW:
+            # Let the no-load estimate drift up if the backend got slower for good
+            self.min_latency = self._window_min
+            self._window_min = None
+            self._window_samples = 0
+        return self.min_latency
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for LLM calls.
+
+    The limit grows by roughly one per window of fast successes and shrinks
+    multiplicatively when latency rises well above the no-load latency or
+    the backend fails, so in-flight work tracks what the backend can serve.
+    Drafts, validations and nuance batches take very different times, so
+    each kind of call is compared with its own no-load latency.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        latency_tolerance: float,
+        backoff: float = 0.9,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.waiting = 0
+        self.timeouts = 0
+        self._baselines: Dict[str, LatencyBaseline] = {}
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: Optional[float]) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self.waiting += 1
+            try:
+                while self.in_flight >= int(self.limit):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.timeouts += 1
+                        raise LimiterTimeoutError(
+                            f"No LLM slot free within {timeout}s (limit {int(self.limit)})"
+                        )
+                    self._condition.wait(remaining)
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self, latency: Optional[float], overloaded: bool, kind: str = "default") -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.minimum, self.limit * 0.5)
+            elif latency is not None:
+                self._observe(latency, kind)
+            self._condition.notify_all()
+
+    def _observe(self, latency: float, kind: str) -> None:
+        baseline = self._baselines.setdefault(kind, LatencyBaseline())
+        min_latency = baseline.observe(latency)
+        if latency <= min_latency * self.latency_tolerance:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        else:
+            self.limit = max(self.minimum, self.limit * self.backoff)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "timeouts": self.timeouts,
+                "min_latency": {
+                    kind: baseline.min_latency for kind, baseline in self._baselines.items()
+                },
+            }
+
+
+limiter = AdaptiveLimiter(
+    initial=settings.LLM_CONCURRENCY_INITIAL,
+    minimum=settings.LLM_CONCURRENCY_MIN,
+    maximum=settings.LLM_CONCURRENCY_MAX,
+    latency_tolerance=settings.LLM_LATENCY_TOLERANCE,
+)
+breaker = CircuitBreaker(
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_seconds=settings.CIRCUIT_RESET_SECONDS,
+    half_open_probes=settings.CIRCUIT_HALF_OPEN_PROBES,
+)
+
+
+@contextmanager
+def llm_slot(is_failure, kind: str = "default") -> Iterator[None]:
+    """
+    Guard one LLM call with the circuit breaker and the adaptive limit.
+    `is_failure` classifies exceptions that count against the backend;
+    `kind` picks the latency baseline the call is judged against.
+    """
+    breaker.before_call()
+    try:
+        limiter.acquire(settings.LLM_QUEUE_TIMEOUT_SECONDS)
+    except LimiterTimeoutError:
+        breaker.on_ignored()
+        raise
+
+    started = time.monotonic()
+    try:
+        yield
+    except Exception as e:
+        failed = is_failure(e)
+        limiter.release(None, overloaded=failed)
+        if failed:
+            breaker.on_failure()
+        else:
+            breaker.on_ignored()
+        raise
+    else:
+        limiter.release(time.monotonic() - started, overloaded=False, kind=kind)
+        breaker.on_success()
+
+
+def get_stats() -> dict:
+    return {**limiter.stats(), "circuit": breaker.stats()}
+
+
+register_collector("llm_limiter", get_stats)
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+from collections import Counter
+from itertools import combinations
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from beanie import UpdateResponse
+from beanie.operators import In
+from pymongo.errors import DuplicateKeyError
+
+from ...config import settings
+from ...models import SynonymNuance
+from ..lru import LRUCache
+from ..metrics import register_collector
+from .ai import SynonymNuance as NuanceSchema
+from .ai import analyze_nuance_batch, analyze_synonym_nuances
+
+logger = logging.getLogger(__name__)
+
+# Recently read or created nuance documents, keyed by pair_key
+_cache: LRUCache[SynonymNuance] = LRUCache(settings.NUANCE_CACHE_SIZE)
+
+# Analyses currently running, so concurrent requests for a pair share one LLM call
+_in_flight: Dict[str, "asyncio.Future[SynonymNuance]"] = {}
+
+_stats: Counter = Counter()
+
+Pair = Tuple[str, str]
+Result = Union[SynonymNuance, Exception]
+
+
+def pair_key(word1: str, word2: str) -> str:
+    """Order-independent key for a word pair."""
+    first, second = sorted((word1.strip().lower(), word2.strip().lower()))
+    return f"{first}|{second}"
+
+
+async def find_nuance(word1: str, word2: str) -> Optional[SynonymNuance]:
+    """Look up a stored analysis in memory first, then by its unique key."""
+    key = pair_key(word1, word2)
+    cached = _cache.get(key)
+    if cached:
+        return cached
+
+    nuance = await SynonymNuance.find_one(SynonymNuance.pair_key == key)
+    if nuance:
+        _cache.put(key, nuance)
+    return nuance
+
+
+async def find_nuances(pairs: List[Pair]) -> Dict[str, SynonymNuance]:
+    """Stored analyses for several pairs, keyed by pair_key, in one query."""
+    found: Dict[str, SynonymNuance] = {}
+    missing = []
+    for word1, word2 in pairs:
+        key = pair_key(word1, word2)
+        cached = _cache.get(key)
+        if cached:
+            found[key] = cached
+        else:
+            missing.append(key)
+
+    if missing:
+        async for nuance in SynonymNuance.find(In(SynonymNuance.pair_key, missing)):
+            found[nuance.pair_key] = nuance
+            _cache.put(nuance.pair_key, nuance)
+    return found
+
+
+async def _store(word1: str, word2: str, nuance: NuanceSchema) -> SynonymNuance:
+    key = pair_key(word1, word2)
+    document = SynonymNuance(
+        pair_key=key,
+        word1=nuance.word1,
+        word2=nuance.word2,
+        nuance_explanation=nuance.nuance_explanation,
+        usage_examples=nuance.usage_examples,
+        context_differences=nuance.context_differences,
+        formality_level=nuance.formality_level,
+        emotional_weight=nuance.emotional_weight,
+    )
+
+    # Insert unless another worker stored the pair first; either way return what's stored
+    stored = await SynonymNuance.find_one(SynonymNuance.pair_key == key).update(
+        {"$setOnInsert": document.model_dump(exclude={"id", "revision_id"})},
+        upsert=True,
+        response_type=UpdateResponse.NEW_DOCUMENT,
+    )
+    stored = stored or document
+    _cache.put(key, stored)
+    logger.info(f"Saved nuance analysis for {word1} and {word2}")
+    return stored
+
+
+async def _analyze_and_store(word1: str, word2: str) -> SynonymNuance:
+    nuance = await analyze_synonym_nuances(word1, word2)
+    return await _store(word1, word2, nuance)
+
+
+def _claim(key: str) -> "asyncio.Future[SynonymNuance]":
+    future: "asyncio.Future[SynonymNuance]" = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    return future
+
+
+def _settle(key: str, future: "asyncio.Future[SynonymNuance]", result) -> None:
+    if not future.done():
+        if isinstance(result, Exception):
+            future.set_exception(result)
+            # Nobody else may be waiting; don't warn about an unretrieved exception
+            future.exception()
+        else:
+            future.set_result(result)
+    if _in_flight.get(key) is future:
+        del _in_flight[key]
+
+
+async def get_or_create_nuance(word1: str, word2: str) -> SynonymNuance:
+    """
+    Return the stored analysis for a pair, generating it at most once even
+    when several requests for the pair arrive at the same time.
+    """
+    existing = await find_nuance(word1, word2)
+    if existing:
+        return existing
+
+    key = pair_key(word1, word2)
+    pending = _in_flight.get(key)
+    if pending:
+        logger.info(f"Waiting for in-progress nuance analysis of {word1} and {word2}")
+        return await asyncio.shield(pending)
+
+    future = _claim(key)
+    try:
+        result = await _analyze_and_store(word1, word2)
+    except Exception as e:
+        _settle(key, future, e)
+        raise
+    _settle(key, future, result)
+    return result
+
+
+def matrix_pairs(words: List[str]) -> List[Pair]:
+    """Every unordered pair of distinct words, keeping the first spelling of repeats."""
+    unique: Dict[str, str] = {}
+    for word in words:
+        word = word.strip()
+        if word:
+            unique.setdefault(word.lower(), word)
+    return list(combinations(unique.values(), 2))
+
+
+async def _analyze_batch(
+    futures: Dict[Pair, "asyncio.Future[SynonymNuance]"],
+) -> List[Tuple[Pair, Result]]:
+    """
+    Analyze a batch of already claimed pairs in one LLM call. Pairs the
+    model leaves out get a single-pair call of their own; if the batch call
+    fails, every pair in it fails with the same error.
+    """
+    pairs = list(futures)
+    try:
+        analyses = await analyze_nuance_batch(pairs)
+        by_key = {pair_key(n.word1, n.word2): n for n in analyses}
+        _stats["batches"] += 1
+    except Exception as e:
+        logger.error(f"Batched nuance analysis of {len(pairs)} pairs failed: {e}")
+        by_key, batch_error = {}, e
+    else:
+        batch_error = None
+
+    results: List[Tuple[Pair, Result]] = []
+    for pair, future in futures.items():
+        key = pair_key(*pair)
+        try:
+            if batch_error:
+                raise batch_error
+            analysis = by_key.get(key)
+            if analysis:
+                result = await _store(*pair, analysis)
+            else:
+                _stats["batch_misses"] += 1
+                result = await _analyze_and_store(*pair)
+        except Exception as e:
+            result = e
+        _settle(key, future, result)
+        results.append((pair, result))
+    return results
+
+
+async def _await_in_flight(pair: Pair) -> List[Tuple[Pair, Result]]:
+    try:
+        return [(pair, await asyncio.shield(_in_flight[pair_key(*pair)]))]
+    except Exception as e:
+        return [(pair, e)]
+
+
+async def analyze_matrix(pairs: List[Pair]) -> AsyncIterator[Tuple[Pair, Result]]:
+    """
+    Analyze pairs with several pairs per LLM call and a bounded number of
+    calls at once, yielding each pair's analysis (or error) as its batch
+    finishes. Pairs already being analyzed elsewhere are awaited instead.
+    """
+    waiting = [pair for pair in pairs if pair_key(*pair) in _in_flight]
+    todo = [pair for pair in pairs if pair_key(*pair) not in _in_flight]
+    size = max(1, settings.NUANCE_BATCH_SIZE)
+    semaphore = asyncio.Semaphore(max(1, settings.NUANCE_MATRIX_CONCURRENCY))
+
+    # Claim every pair before any batch waits for the semaphore, so other
+    # requests for these pairs wait on the matrix instead of calling the LLM
+    claimed = {pair: _claim(pair_key(*pair)) for pair in todo}
+
+    async def run_batch(batch: List[Pair]) -> List[Tuple[Pair, Result]]:
+        futures = {pair: claimed[pair] for pair in batch}
+        try:
+            async with semaphore:
+                return await _analyze_batch(futures)
+        except BaseException as e:
+            # Cancelled before or during the batch; release its waiters
+            error = e if isinstance(e, Exception) else RuntimeError("Nuance analysis cancelled")
+            for pair, future in futures.items():
+                _settle(pair_key(*pair), future, error)
+            raise
+
+    # Tasks keep running if the client goes away, so the work still gets stored
+    tasks = [asyncio.ensure_future(_await_in_flight(pair)) for pair in waiting]
+    tasks += [
+        asyncio.ensure_future(run_batch(todo[i : i + size]))
+        for i in range(0, len(todo), size)
+    ]
+    for next_done in asyncio.as_completed(tasks):
+        for item in await next_done:
+            yield item
+
+
+async def backfill_pair_keys() -> None:
+    """Give documents saved before pair keys existed a key, dropping duplicates."""
+    async for nuance in SynonymNuance.find(SynonymNuance.pair_key == None):  # noqa: E711
+        key = pair_key(nuance.word1, nuance.word2)
+        if await SynonymNuance.find_one(SynonymNuance.pair_key == key):
+            logger.info(f"Removing duplicate nuance analysis for {key}")
+            await nuance.delete()
+            continue
+        nuance.pair_key = key
+        try:
+            await nuance.save()
+        except DuplicateKeyError:
+            # Another writer stored this pair meanwhile; keep theirs
+            logger.info(f"Removing duplicate nuance analysis for {key}")
+            await nuance.delete()
+
+
+def get_stats() -> dict:
+    return {**_cache.stats(), "in_flight": len(_in_flight), **_stats}
+
+
+register_collector("nuance_cache", get_stats)
@@ -0,0 +1,90 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Literal
+
+from ...config import settings
+from ..metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+PoolName = Literal["search", "llm", "cpu"]
+
+
+class NamedPool:
+    """
+    A long-lived, bounded thread pool with saturation counters.
+
+    Jobs in one pool must never block on jobs in the same pool, or a full
+    pool deadlocks: the pipeline runs its steps in "cpu", which waits on
+    "search" and "llm", which wait on nothing else.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"{name}-pool"
+        )
+        self.submitted = 0
+        self.active = 0
+        self.peak_active = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+
+    def _tracked(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        with self._lock:
+            self.submitted += 1
+        return self.executor.submit(self._tracked, fn, *args, **kwargs)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking function in this pool from async code."""
+        with self._lock:
+            self.submitted += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(self._tracked, fn, *args, **kwargs)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        queued = self.submitted - self.completed - self.active
+        return {
+            "max_workers": self.max_workers,
+            "active": self.active,
+            "queued": queued,
+            "peak_active": self.peak_active,
+            "completed": self.completed,
+            "saturation": round(self.active / self.max_workers, 3),
+        }
+
+
+pools: Dict[str, NamedPool] = {
+    "search": NamedPool("search", settings.SEARCH_POOL_SIZE),
+    "llm": NamedPool("llm", settings.LLM_POOL_SIZE),
+    "cpu": NamedPool("cpu", settings.CPU_POOL_SIZE),
+}
+
+
+def pool(name: PoolName) -> NamedPool:
+    return pools[name]
+
+
+def shutdown() -> None:
+    for named in pools.values():
+        named.executor.shutdown(wait=False, cancel_futures=True)
+
+
+register_collector("pools", lambda: {name: p.stats() for name, p in pools.items()})
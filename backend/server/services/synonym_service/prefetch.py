@@ -0,0 +1,129 @@
+import logging
+from collections import Counter, OrderedDict
+from datetime import date
+from typing import Optional
+
+from ...config import settings
+from ...models import Explanation
+from .. import events
+from ..metrics import register_collector
+from .limiter import limiter
+from .nuance import get_or_create_nuance
+from .scheduler import scheduler
+from .worker import process_explanation
+
+logger = logging.getLogger(__name__)
+
+# Prefetched words remembered for hit-rate accounting
+MAX_TRACKED_WORDS = 5_000
+
+_prefetched: "OrderedDict[str, None]" = OrderedDict()
+_stats: Counter = Counter()
+_budget_day: Optional[date] = None
+_budget_used = 0
+
+
+def _normalize(word: str) -> str:
+    return word.strip().lower()
+
+
+def llm_utilization() -> float:
+    """How busy the LLM side is, from the pipeline scheduler and the LLM limiter."""
+    limit_stats = limiter.stats()
+    llm_busy = limit_stats["in_flight"] / max(1, int(limit_stats["limit"]))
+    return max(scheduler.utilization(), llm_busy)
+
+
+def _take_budget() -> bool:
+    global _budget_day, _budget_used
+    today = date.today()
+    if _budget_day != today:
+        _budget_day = today
+        _budget_used = 0
+    if _budget_used >= settings.PREFETCH_DAILY_BUDGET:
+        return False
+    _budget_used += 1
+    return True
+
+
+def _remember(word: str) -> None:
+    _prefetched[word] = None
+    _prefetched.move_to_end(word)
+    if len(_prefetched) > MAX_TRACKED_WORDS:
+        _prefetched.popitem(last=False)
+
+
+async def _prefetch_word(source: Explanation, synonym: str) -> None:
+    word = synonym.strip()
+    if not word or _normalize(word) == _normalize(source.word):
+        return
+
+    existing = await Explanation.find_one(Explanation.word == word)
+    if existing and existing.entries:
+        return
+
+    if not _take_budget():
+        _stats["skipped_budget"] += 1
+        return
+
+    if existing is None:
+        existing = Explanation(word=word, entries=[])
+        await existing.save()
+        await events.publish("created", existing)
+
+    _remember(_normalize(word))
+    _stats["enqueued"] += 1
+    scheduler.submit("prefetch", process_explanation, existing.id)
+
+    if settings.PREFETCH_NUANCES and _take_budget():
+        scheduler.submit("prefetch", get_or_create_nuance, source.word, word)
+
+
+async def prefetch_synonyms(explanation: Explanation) -> None:
+    """
+    Queue the top synonyms of a fresh explanation at the lowest priority,
+    while the LLM has spare capacity and the daily budget allows.
+    Words that were themselves prefetched don't fan out further until a
+    user actually looks them up. Retries and refreshes don't prefetch.
+    """
+    if not settings.PREFETCH_ENABLED or not explanation.entries:
+        return
+    if _normalize(explanation.word) in _prefetched:
+        return
+
+    synonyms = explanation.entries[-1].synonyms or []
+    for synonym in synonyms[: settings.PREFETCH_TOP_K]:
+        if llm_utilization() >= settings.PREFETCH_MAX_UTILIZATION:
+            _stats["skipped_busy"] += 1
+            return
+        await _prefetch_word(explanation, synonym)
+
+
+async def record_lookup(explanation: Explanation) -> None:
+    """
+    Count a user lookup of an existing word as a prefetch hit if we
+    generated it ahead of time, and continue prefetching from there.
+    Only this worker's prefetches are known, so a lookup served by
+    another worker is not counted.
+    """
+    word = _normalize(explanation.word)
+    if word not in _prefetched:
+        return
+    del _prefetched[word]
+    _stats["hits"] += 1
+    await prefetch_synonyms(explanation)
+
+
+def get_stats() -> dict:
+    enqueued = _stats["enqueued"]
+    return {
+        "enabled": settings.PREFETCH_ENABLED,
+        **_stats,
+        "hit_rate": round(_stats["hits"] / enqueued, 3) if enqueued else None,
+        "budget_used_today": _budget_used,
+        "utilization": round(llm_utilization(), 3),
+    }
+
+
+events.subscribe("generated", prefetch_synonyms)
+register_collector("prefetch", get_stats)
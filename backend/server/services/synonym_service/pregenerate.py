@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ...models import Explanation, ExplanationEntry
+from .. import revisions
+from .ai import create_and_validate_synonym, get_search_results_async
+from .graph import synonym_keys
+from . import snapshot
+from .pools import NamedPool
+from .worker import build_entry
+
+logger = logging.getLogger(__name__)
+
+# Words checked against the database per query
+EXISTING_QUERY_SIZE = 1000
+
+
+def read_words(lines: Iterable[str]) -> List[str]:
+    """
+    Words from a word or frequency list: the first column of each line,
+    skipping blanks, comments and repeats.
+    """
+    words, seen = [], set()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        word = line.split()[0]
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+class Checkpoint:
+    """
+    Append-only record of finished words ("ok<TAB>word" or
+    "failed<TAB>word"), written only after the results are stored.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.done: Set[str] = set()
+        self.failed: Set[str] = set()
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                status, _, word = line.partition("\t")
+                (self.done if status == "ok" else self.failed).add(word)
+
+    def record(self, done: Iterable[str], failed: Iterable[str]) -> None:
+        lines = [f"ok\t{w}\n" for w in done] + [f"failed\t{w}\n" for w in failed]
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            # Recorded progress must survive a crash right after this
+            os.fsync(f.fileno())
+        self.done.update(done)
+        self.failed.update(failed)
+
+
+def _upsert(word: str, entry: ExplanationEntry, now: datetime) -> UpdateOne:
+    return UpdateOne(
+        {"word": word},
+        {
+            "$set": {
+                "entries": [entry.model_dump()],
+                "updated_at": now,
+                "synonym_keys": synonym_keys(entry),
+            },
+            "$setOnInsert": {
+                "word": word,
+                "created_at": now,
+                "refresh_claimed_until": None,
+                "lookup_count": 0,
+            },
+        },
+        upsert=True,
+    )
+
+
+class Pregenerator:
+    """
+    Runs the synonym pipeline over a word list with a fixed number of
+    concurrent words, storing results in bulk and checkpointing progress.
+    The LLM concurrency limiter still decides how many calls actually run.
+    """
+
+    def __init__(self, database, checkpoint: Checkpoint, concurrency: int, batch_size: int):
+        self.database = database
+        self.collection = database[Explanation.Settings.name]
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.stats: Counter = Counter()
+        # Pipeline steps wait on the shared search and llm pools, never on this one
+        self._pipeline = NamedPool("pregenerate", concurrency)
+        self._results: List[UpdateOne] = []
+        self._done: List[str] = []
+        self._failed: List[str] = []
+        self._flush_lock = asyncio.Lock()
+
+    async def existing_words(self, words: List[str]) -> Set[str]:
+        """Words that already have an explanation with entries."""
+        existing: Set[str] = set()
+        for i in range(0, len(words), EXISTING_QUERY_SIZE):
+            chunk = words[i : i + EXISTING_QUERY_SIZE]
+            cursor = self.collection.find(
+                {"word": {"$in": chunk}, "entries.0": {"$exists": True}}, {"word": 1}
+            )
+            existing.update([doc["word"] async for doc in cursor])
+        return existing
+
+    async def _generate(self, word: str) -> None:
+        try:
+            search_info = await get_search_results_async(word)
+            result = await self._pipeline.run(create_and_validate_synonym, word, search_info)
+            self._results.append(_upsert(word, build_entry(result), datetime.now()))
+            self._done.append(word)
+            self.stats["generated"] += 1
+        except Exception as e:
+            logger.error(f"Failed to pre-generate {word}: {e}")
+            self._failed.append(word)
+            self.stats["failed"] += 1
+        if len(self._results) + len(self._failed) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            results, self._results = self._results, []
+            done, self._done = self._done, []
+            failed, self._failed = self._failed, []
+            if results:
+                done = await self._write(results, done)
+            self.checkpoint.record(done, failed)
+            if done:
+                await self._mark_changed(done)
+                # Running servers drop their cached list pages
+                await revisions.bump(self.database)
+
+    async def _mark_changed(self, words: List[str]) -> None:
+        """Stop servers on this host serving snapshot copies of the stored words."""
+        if not snapshot.enabled():
+            return
+        # Covers words that existed without entries as well as new ones
+        cursor = self.collection.find({"word": {"$in": words}}, {"_id": 1})
+        snapshot.mark_ids_dirty([document["_id"] async for document in cursor])
+
+    async def _write(self, results: List[UpdateOne], done: List[str]) -> List[str]:
+        """
+        Store a batch and return the words that made it. Words whose write
+        failed stay out of the checkpoint, so the next run generates them again.
+        """
+        try:
+            await self.collection.bulk_write(results, ordered=False)
+            return done
+        except BulkWriteError as e:
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+        except Exception as e:
+            logger.error(f"Failed to store {len(results)} pre-generated words: {e}")
+            self.stats["unsaved"] += len(results)
+            return []
+        logger.error(f"Failed to store {len(failed)} of {len(results)} pre-generated words")
+        self.stats["unsaved"] += len(failed)
+        return [word for i, word in enumerate(done) if i not in failed]
+
+    async def run(self, words: List[str], report_every: float = 30) -> Counter:
+        queue: asyncio.Queue[str] = asyncio.Queue()
+        for word in words:
+            queue.put_nowait(word)
+        started = time.monotonic()
+
+        async def work():
+            while not queue.empty():
+                await self._generate(queue.get_nowait())
+
+        async def report():
+            while True:
+                await asyncio.sleep(report_every)
+                logger.info(progress(self.stats, len(words), time.monotonic() - started))
+
+        reporter = asyncio.create_task(report())
+        try:
+            await asyncio.gather(*(work() for _ in range(self.concurrency)))
+        finally:
+            reporter.cancel()
+            await self.flush()
+            self._pipeline.executor.shutdown(wait=False, cancel_futures=True)
+        logger.info(progress(self.stats, len(words), time.monotonic() - started))
+        return self.stats
+
+
+def progress(stats: Counter, total: int, elapsed: float) -> str:
+    finished = stats["generated"] + stats["failed"]
+    rate = finished / elapsed if elapsed > 0 else 0.0
+    eta: Optional[float] = (total - finished) / rate if rate else None
+    eta_text = f"{eta / 60:.1f} min" if eta is not None else "unknown"
+    return (
+        f"Pre-generated {finished}/{total} words ({stats['failed']} failed), "
+        f"{rate * 60:.1f} words/min, ETA {eta_text}"
+    )
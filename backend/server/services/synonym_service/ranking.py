@@ -0,0 +1,86 @@
+import re
+from typing import List, Protocol, Sequence, Tuple
+
+# Explanation length (characters) that reads as a complete, focused answer
+MIN_EXPLANATION_LENGTH = 40
+MAX_EXPLANATION_LENGTH = 400
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SynonymCandidate(Protocol):
+    word: str
+    synonyms: list[str]
+    explanation: str
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def score_candidate(candidate: SynonymCandidate, word: str, search_info: str = "") -> float:
+    """
+    Cheap local quality score for a generated explanation, roughly in [0, 1].
+    Rewards synonyms backed by the search snippets and a reasonably sized
+    explanation; penalises duplicated synonyms and echoing the word itself.
+    """
+    target = _normalize(word)
+    synonyms = [_normalize(s) for s in candidate.synonyms if s.strip()]
+    unique = set(synonyms)
+    context = f" {_normalize(search_info)} "
+
+    # Share of synonyms that the search snippets actually mention
+    if unique and context.strip():
+        grounding = sum(1 for s in unique if f" {s} " in context) / len(unique)
+    else:
+        grounding = 0.0
+
+    # Prefer a handful of distinct synonyms over none or a padded list
+    coverage = min(len(unique), 5) / 5
+
+    length = len(candidate.explanation.strip())
+    if length < MIN_EXPLANATION_LENGTH:
+        length_score = length / MIN_EXPLANATION_LENGTH
+    elif length > MAX_EXPLANATION_LENGTH:
+        length_score = MAX_EXPLANATION_LENGTH / length
+    else:
+        length_score = 1.0
+
+    penalty = 0.0
+    if synonyms:
+        penalty += 0.5 * (len(synonyms) - len(unique)) / len(synonyms)
+    if target in unique:
+        penalty += 0.2
+    if _normalize(candidate.explanation) == target:
+        penalty += 0.5
+
+    score = 0.45 * grounding + 0.25 * coverage + 0.3 * length_score - penalty
+    return max(0.0, min(1.0, score))
+
+
+def dedupe_candidates(candidates: Sequence[SynonymCandidate]) -> List[SynonymCandidate]:
+    """
+    Drop candidates with the same synonyms and explanation as an earlier one.
+    """
+    seen = set()
+    unique = []
+    for candidate in candidates:
+        key = (
+            frozenset(_normalize(s) for s in candidate.synonyms),
+            _normalize(candidate.explanation),
+        )
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(candidate)
+    return unique
+
+
+def rank_candidates(
+    candidates: Sequence[SynonymCandidate], word: str, search_info: str = ""
+) -> List[Tuple[float, SynonymCandidate]]:
+    """
+    Score candidates and return them best first.
+    """
+    scored = [(score_candidate(c, word, search_info), c) for c in candidates]
+    return sorted(scored, key=lambda item: item[0], reverse=True)
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, time, timedelta
+from typing import List, Tuple
+
+from ...config import settings
+from ...models import Explanation
+from ..metrics import register_collector
+from .ai import PROMPT_VERSION
+from .prefetch import llm_utilization
+from .scheduler import scheduler
+from .worker import process_explanation
+
+logger = logging.getLogger(__name__)
+
+_stats: Counter = Counter()
+
+
+def parse_windows(value: str) -> List[Tuple[time, time]]:
+    """Parse "01:00-06:00,22:30-23:30" into (start, end) pairs."""
+    windows = []
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        start, end = part.split("-")
+        windows.append((time.fromisoformat(start.strip()), time.fromisoformat(end.strip())))
+    return windows
+
+
+def in_off_peak_window(now: datetime, windows: List[Tuple[time, time]]) -> bool:
+    current = now.time()
+    for start, end in windows:
+        if start <= end and start <= current < end:
+            return True
+        # Windows may wrap past midnight
+        if start > end and (current >= start or current < end):
+            return True
+    return False
+
+
+def _latest_entry_differs(field: str, current) -> dict:
+    """
+    The latest entry was tagged with another value of `field`. Untagged
+    entries from before the tags existed count as current, so an upgrade
+    doesn't queue the whole dictionary.
+    """
+    return {
+        "$expr": {
+            "$let": {
+                "vars": {"latest": {"$arrayElemAt": ["$entries", -1]}},
+                "in": {"$ne": [{"$ifNull": [f"$$latest.{field}", current]}, current]},
+            }
+        }
+    }
+
+
+def stale_filter(now: datetime) -> dict:
+    """Entries older than the max age or whose latest entry came from an older prompt/model."""
+    cutoff = now - timedelta(days=settings.REFRESH_MAX_AGE_DAYS)
+    conditions = [
+        {"updated_at": {"$lt": cutoff}},
+        # Entries saved before updated_at existed only have created_at
+        {"updated_at": None, "created_at": {"$lt": cutoff}},
+        _latest_entry_differs("prompt_version", PROMPT_VERSION),
+    ]
+    if settings.REFRESH_ON_MODEL_CHANGE:
+        conditions.append(_latest_entry_differs("model", settings.OPENAI_MODEL))
+    return {
+        "entries.0": {"$exists": True},
+        "$or": conditions,
+        "$and": [
+            {
+                "$or": [
+                    {"refresh_claimed_until": None},
+                    {"refresh_claimed_until": {"$lt": now}},
+                ]
+            }
+        ],
+    }
+
+
+async def _claim(explanation: Explanation, now: datetime) -> bool:
+    """Atomically lease an entry so other workers don't refresh it too."""
+    result = await Explanation.find_one(
+        {
+            "_id": explanation.id,
+            "$or": [
+                {"refresh_claimed_until": None},
+                {"refresh_claimed_until": {"$lt": now}},
+            ],
+        }
+    ).update(
+        {
+            "$set": {
+                "refresh_claimed_until": now
+                + timedelta(seconds=settings.REFRESH_CLAIM_SECONDS)
+            }
+        }
+    )
+    return result is not None and result.modified_count == 1
+
+
+def should_refresh_now(now: datetime) -> bool:
+    if in_off_peak_window(now, parse_windows(settings.REFRESH_WINDOWS)):
+        return True
+    return llm_utilization() < settings.REFRESH_IDLE_UTILIZATION
+
+
+async def refresh_batch(now: datetime) -> int:
+    """Claim and schedule one batch of stale entries; returns how many were queued."""
+    candidates = (
+        await Explanation.find(stale_filter(now))
+        .sort("updated_at")
+        .limit(settings.REFRESH_BATCH_SIZE)
+        .to_list()
+    )
+    queued = 0
+    for explanation in candidates:
+        if not await _claim(explanation, now):
+            continue
+        scheduler.submit("refresh", process_explanation, explanation.id, True, True)
+        queued += 1
+    _stats["queued"] += queued
+    return queued
+
+
+async def run_refresh_scheduler():
+    """Periodically refresh stale entries off-peak or when the LLM is idle."""
+    while True:
+        await asyncio.sleep(settings.REFRESH_CHECK_INTERVAL_SECONDS)
+        now = datetime.now()
+        # One batch at a time keeps refresh work rate-limited
+        if scheduler.pending("refresh") or scheduler.running["refresh"]:
+            continue
+        try:
+            if not should_refresh_now(now):
+                _stats["skipped_busy"] += 1
+                continue
+            queued = await refresh_batch(now)
+            if queued:
+                logger.info(f"Queued {queued} stale explanations for refresh")
+        except Exception as e:
+            logger.error(f"Refresh scheduler failed: {e}")
+
+
+def get_stats() -> dict:
+    return {
+        "enabled": settings.REFRESH_ENABLED,
+        "prompt_version": PROMPT_VERSION,
+        **_stats,
+    }
+
+
+register_collector("refresh", get_stats)
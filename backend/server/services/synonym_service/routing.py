@@ -0,0 +1,44 @@
+import threading
+from collections import Counter
+from typing import Literal
+
+from ...config import settings
+from ..metrics import register_collector
+
+# "small" handles cheap calls and first drafts, "large" is used where quality matters
+Tier = Literal["small", "large"]
+
+_calls: Counter = Counter()
+_lock = threading.Lock()
+
+
+def cascade_enabled() -> bool:
+    """The cascade is on when a distinct small model is configured."""
+    return bool(settings.OPENAI_SMALL_MODEL) and (
+        settings.OPENAI_SMALL_MODEL != settings.OPENAI_MODEL
+    )
+
+
+def model_for_tier(tier: Tier) -> str:
+    """Model name to use for a call site's tier."""
+    if tier == "small" and cascade_enabled():
+        return settings.OPENAI_SMALL_MODEL
+    return settings.OPENAI_MODEL
+
+
+def record(event: str) -> None:
+    with _lock:
+        _calls[event] += 1
+
+
+def get_stats() -> dict:
+    with _lock:
+        return {
+            "enabled": cascade_enabled(),
+            "small_model": model_for_tier("small"),
+            "large_model": model_for_tier("large"),
+            **_calls,
+        }
+
+
+register_collector("model_cascade", get_stats)
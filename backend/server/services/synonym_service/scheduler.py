@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Literal, Tuple
+
+from ...config import settings
+from ..metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+Priority = Literal["interactive", "retry", "prefetch", "refresh"]
+PRIORITIES: Tuple[Priority, ...] = ("interactive", "retry", "prefetch", "refresh")
+
+# Recent queue waits kept per class for latency stats
+WAIT_SAMPLES = 200
+
+Job = Tuple[float, Callable[..., Awaitable[Any]], tuple]
+
+
+class PriorityScheduler:
+    """
+    Weighted fair scheduler for synonym pipeline jobs.
+
+    Each priority class has its own FIFO queue, a weight and a concurrency
+    cap. Free slots go to the eligible class with the lowest virtual time
+    (stride scheduling), so interactive lookups get most of the capacity
+    without starving retries and background work.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        weights: Dict[str, int],
+        limits: Dict[str, int],
+    ):
+        self.concurrency = concurrency
+        self.weights = {p: max(1, weights.get(p, 1)) for p in PRIORITIES}
+        self.limits = {p: limits.get(p, concurrency) for p in PRIORITIES}
+        self.queues: Dict[str, Deque[Job]] = {p: deque() for p in PRIORITIES}
+        self.running: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self.completed: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self.waits: Dict[str, Deque[float]] = {
+            p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITIES
+        }
+        self._pass: Dict[str, float] = {p: 0.0 for p in PRIORITIES}
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, priority: Priority, fn: Callable[..., Awaitable[Any]], *args) -> None:
+        """Queue a coroutine function to run when its class gets a slot."""
+        queue = self.queues[priority]
+        if not queue and not self.running[priority]:
+            # A class returning from idle doesn't get credit for the time it was away
+            active = [self._pass[p] for p in PRIORITIES if self.queues[p] or self.running[p]]
+            if active:
+                self._pass[priority] = max(self._pass[priority], min(active))
+        queue.append((time.monotonic(), fn, args))
+        self._dispatch()
+
+    def pending(self, priority: Priority | None = None) -> int:
+        if priority:
+            return len(self.queues[priority])
+        return sum(len(q) for q in self.queues.values())
+
+    def in_flight(self) -> int:
+        return sum(self.running.values())
+
+    def utilization(self) -> float:
+        return self.in_flight() / self.concurrency if self.concurrency else 1.0
+
+    def _next_class(self) -> Priority | None:
+        eligible = [
+            p for p in PRIORITIES if self.queues[p] and self.running[p] < self.limits[p]
+        ]
+        if not eligible:
+            return None
+        # Ties go to the more important class
+        return min(eligible, key=lambda p: (self._pass[p], PRIORITIES.index(p)))
+
+    def _dispatch(self) -> None:
+        while self.in_flight() < self.concurrency:
+            priority = self._next_class()
+            if priority is None:
+                return
+            enqueued_at, fn, args = self.queues[priority].popleft()
+            self._pass[priority] += 1 / self.weights[priority]
+            self.running[priority] += 1
+            self.waits[priority].append(time.monotonic() - enqueued_at)
+            task = asyncio.create_task(self._run(priority, fn, args))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, priority: Priority, fn: Callable[..., Awaitable[Any]], args: tuple):
+        try:
+            await fn(*args)
+        except Exception as e:
+            logger.error(f"Scheduled {priority} job {fn.__name__} failed: {e}")
+        finally:
+            self.running[priority] -= 1
+            self.completed[priority] += 1
+            self._dispatch()
+
+    async def shutdown(self) -> None:
+        for queue in self.queues.values():
+            queue.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        classes = {}
+        for p in PRIORITIES:
+            waits = sorted(self.waits[p])
+            classes[p] = {
+                "queued": len(self.queues[p]),
+                "running": self.running[p],
+                "completed": self.completed[p],
+                "wait_p95": waits[int(0.95 * (len(waits) - 1))] if waits else None,
+            }
+        return {
+            "concurrency": self.concurrency,
+            "utilization": round(self.utilization(), 3),
+            "classes": classes,
+        }
+
+
+scheduler = PriorityScheduler(
+    concurrency=settings.PIPELINE_CONCURRENCY,
+    weights=settings.SCHEDULER_WEIGHTS,
+    limits=settings.SCHEDULER_CLASS_LIMITS,
+)
+
+register_collector("scheduler", scheduler.stats)
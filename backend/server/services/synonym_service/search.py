@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from ...config import settings
+from .. import bing_search
+from ..metrics import register_collector
+from .pools import pool
+
+if TYPE_CHECKING:
+    from duckduckgo_search import DDGS
+
+logger = logging.getLogger(__name__)
+
+# Recent latencies kept per provider for the hedging delay
+LATENCY_SAMPLES = 100
+# Samples needed before the measured percentile replaces the default delay
+MIN_LATENCY_SAMPLES = 10
+
+Results = List[Dict[str, Any]]
+SearchFn = Callable[[str, int], Awaitable[Results]]
+
+# One DDGS session per search thread, reused across queries
+_ddgs_sessions = threading.local()
+
+
+def ddgs_session() -> "DDGS":
+    ddgs = getattr(_ddgs_sessions, "ddgs", None)
+    if ddgs is None:
+        from duckduckgo_search import DDGS
+
+        ddgs = DDGS()
+        _ddgs_sessions.ddgs = ddgs
+    return ddgs
+
+
+def reset_ddgs_session() -> None:
+    """Start over with a fresh session in case this thread's one is broken."""
+    _ddgs_sessions.ddgs = None
+
+
+def _ddgs_text(query: str, max_results: int) -> Results:
+    try:
+        return list(ddgs_session().text(query, max_results=max_results))
+    except Exception:
+        reset_ddgs_session()
+        raise
+
+
+async def search_duckduckgo(query: str, max_results: int) -> Results:
+    # DDGS has no async API; run it on the shared search threads
+    return await pool("search").run(_ddgs_text, query, max_results)
+
+
+class Provider:
+    """A named search backend with latency and outcome counters."""
+
+    def __init__(self, name: str, search: SearchFn):
+        self.name = name
+        self.search = search
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.counts: Counter = Counter()
+
+    def hedge_delay(self) -> float:
+        """How long to wait for this provider before asking another one."""
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return settings.SEARCH_HEDGE_DEFAULT_SECONDS
+        latencies = sorted(self.latencies)
+        return latencies[int(settings.SEARCH_HEDGE_PERCENTILE * (len(latencies) - 1))]
+
+    async def run(self, query: str, max_results: int) -> Results:
+        start = time.monotonic()
+        self.counts["calls"] += 1
+        try:
+            results = await asyncio.wait_for(
+                self.search(query, max_results), settings.SEARCH_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            self.counts["failures"] += 1
+            logger.error(f"{self.name} search failed for query '{query}': {e}")
+            return []
+        self.latencies.append(time.monotonic() - start)
+        if not results:
+            self.counts["empty"] += 1
+        return results
+
+    def stats(self) -> dict:
+        return {**self.counts, "hedge_delay": round(self.hedge_delay(), 3)}
+
+
+PROVIDERS: Dict[str, Provider] = {
+    "duckduckgo": Provider("duckduckgo", search_duckduckgo),
+    "bing": Provider("bing", bing_search.search_bing),
+}
+
+
+def _configured() -> List[Provider]:
+    return [PROVIDERS[name] for name in settings.SEARCH_PROVIDERS if name in PROVIDERS]
+
+
+async def hedged_search(
+    query: str, max_results: int = 3, providers: Optional[List[Provider]] = None
+) -> Results:
+    """
+    Ask the primary provider; if it hasn't answered within its usual
+    (p90) latency, ask the next one too and take the first non-empty answer.
+    A provider that fails or comes back empty hands over immediately.
+    """
+    providers = providers if providers is not None else _configured()
+    if not providers:
+        return []
+
+    tasks: Dict[asyncio.Task, Provider] = {}
+    remaining = list(providers)
+
+    def launch() -> Provider:
+        provider = remaining.pop(0)
+        tasks[asyncio.create_task(provider.run(query, max_results))] = provider
+        return provider
+
+    latest = launch()
+    try:
+        while tasks:
+            hedge = settings.SEARCH_HEDGE_ENABLED and remaining
+            timeout = latest.hedge_delay() if hedge else None
+            done, _ = await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                logger.info(f"Hedging search for '{query}' with {remaining[0].name}")
+                latest = launch()
+                latest.counts["hedges"] += 1
+                continue
+            for task in done:
+                provider = tasks.pop(task)
+                results = task.result()
+                if results:
+                    provider.counts["wins"] += 1
+                    return results
+            if not tasks and remaining:
+                latest = launch()
+        return []
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def search_all(queries: List[str], max_results: int = 3) -> Results:
+    """Run a hedged search for every query at once."""
+    batches = await asyncio.gather(*(hedged_search(q, max_results) for q in queries))
+    return [result for batch in batches for result in batch]
+
+
+register_collector(
+    "search", lambda: {name: provider.stats() for name, provider in PROVIDERS.items()}
+)
@@ -0,0 +1,325 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel, Field
+
+from ...config import settings
+from ...models import Explanation, ExplanationEmbedding
+from .. import events, migrations
+from ..lru import LRUCache
+from ..metrics import register_collector
+from .backends import get_pool
+from .pools import pool
+
+logger = logging.getLogger(__name__)
+
+# Smallest number of rows the index matrix grows by
+MIN_CAPACITY = 1024
+
+
+class _IdProjection(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+
+
+class VectorIndex:
+    """
+    Unit-length vectors in one growable float32 matrix. Search is a single
+    matrix product over all rows followed by a partial sort, which is a few
+    milliseconds for 100k vectors.
+    """
+
+    def __init__(self):
+        self.keys: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def clear(self) -> None:
+        with self._lock:
+            self.keys, self._rows, self._matrix = [], {}, None
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        if self._matrix is None or self._matrix.shape[1] != dim:
+            if self._matrix is not None:
+                logger.warning(f"Embedding size changed to {dim}, dropping the index")
+            self.keys, self._rows = [], {}
+            self._matrix = np.zeros((max(MIN_CAPACITY, rows), dim), dtype=np.float32)
+        elif rows > len(self._matrix):
+            grown = np.zeros((max(rows, 2 * len(self._matrix)), dim), dtype=np.float32)
+            grown[: len(self.keys)] = self._matrix[: len(self.keys)]
+            self._matrix = grown
+
+    def upsert_many(self, keys: List[Hashable], vectors: np.ndarray) -> None:
+        vectors = normalize(np.asarray(vectors, dtype=np.float32))
+        with self._lock:
+            self._reserve(len(self.keys) + len(keys), vectors.shape[1])
+            for key, vector in zip(keys, vectors):
+                row = self._rows.get(key)
+                if row is None:
+                    row = len(self.keys)
+                    self.keys.append(key)
+                    self._rows[key] = row
+                self._matrix[row] = vector
+
+    def upsert(self, key: Hashable, vector: np.ndarray) -> None:
+        self.upsert_many([key], np.asarray(vector).reshape(1, -1))
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is None:
+                return
+            # Move the last row into the gap so live rows stay contiguous
+            last = len(self.keys) - 1
+            if row != last:
+                moved = self.keys[last]
+                self.keys[row] = moved
+                self._rows[moved] = row
+                self._matrix[row] = self._matrix[last]
+            self.keys.pop()
+
+    def search_many(self, queries: np.ndarray, k: int) -> List[List[Tuple[Hashable, float]]]:
+        """Top-k keys by cosine similarity for each query row."""
+        queries = normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        with self._lock:
+            size = len(self.keys)
+            if not size or k <= 0 or queries.shape[1] != self.dim:
+                return [[] for _ in queries]
+            scores = self._matrix[:size] @ queries.T
+            keys = list(self.keys)
+
+        k = min(k, size)
+        results = []
+        for column in scores.T:
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top])]
+            results.append([(keys[i], float(column[i])) for i in top])
+        return results
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[Hashable, float]]:
+        return self.search_many(np.asarray(query).reshape(1, -1), k)[0]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+index = VectorIndex()
+_query_cache: LRUCache[np.ndarray] = LRUCache(settings.SEMANTIC_QUERY_CACHE_SIZE)
+_stats: Counter = Counter()
+_tasks: set[asyncio.Task] = set()
+# Newest embedding update loaded so far; later syncs only read what came after
+_synced_until: Optional[datetime] = None
+
+
+def enabled() -> bool:
+    return bool(settings.EMBEDDING_MODEL)
+
+
+def embedding_text(explanation: Explanation) -> str:
+    """What gets embedded: the word, its latest explanation and synonyms."""
+    entry = explanation.entries[-1]
+    synonyms = ", ".join(entry.synonyms or [])
+    return f"{explanation.word}: {entry.explanation} Synonymer: {synonyms}"
+
+
+def embed(texts: List[str]) -> np.ndarray:
+    """Embed texts through the OpenAI-compatible embeddings endpoint."""
+    with get_pool().acquire() as backend:
+        response = backend.client.embeddings.create(
+            model=backend.model_name(settings.EMBEDDING_MODEL), input=texts
+        )
+    _stats["embedded"] += len(texts)
+    return np.array([item.embedding for item in response.data], dtype=np.float32)
+
+
+def _to_document(explanation_id: PydanticObjectId, vector: np.ndarray) -> dict:
+    dtype = settings.EMBEDDING_STORE_DTYPE
+    return {
+        "explanation_id": explanation_id,
+        "model": settings.EMBEDDING_MODEL,
+        "dtype": dtype,
+        "vector": vector.astype(dtype).tobytes(),
+        "updated_at": datetime.now(),
+    }
+
+
+def _from_document(document: ExplanationEmbedding) -> np.ndarray:
+    return np.frombuffer(document.vector, dtype=document.dtype).astype(np.float32)
+
+
+async def _store(explanations: List[Explanation]) -> None:
+    vectors = await pool("llm").run(embed, [embedding_text(e) for e in explanations])
+    for explanation, vector in zip(explanations, vectors):
+        await ExplanationEmbedding.find_one(
+            ExplanationEmbedding.explanation_id == explanation.id
+        ).update({"$set": _to_document(explanation.id, vector)}, upsert=True)
+    index.upsert_many([e.id for e in explanations], vectors)
+
+
+async def _index_saved(explanation: Explanation) -> None:
+    try:
+        await _store([explanation])
+    except Exception as e:
+        _stats["failures"] += 1
+        logger.error(f"Failed to embed {explanation.word}: {e}")
+
+
+def on_saved(explanation: Explanation) -> None:
+    """Embed new entries in the background so the pipeline isn't held up."""
+    if not enabled() or not explanation.entries:
+        return
+    task = asyncio.create_task(_index_saved(explanation))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def on_deleted(explanation: Explanation) -> None:
+    if not enabled():
+        return
+    index.remove(explanation.id)
+    await ExplanationEmbedding.find(
+        ExplanationEmbedding.explanation_id == explanation.id
+    ).delete()
+
+
+async def load_index() -> int:
+    """
+    Load stored embeddings of the current model into this worker's index:
+    everything on the first call, then only those updated since, which
+    picks up embeddings stored by other workers.
+    """
+    global _synced_until
+    query = {"model": settings.EMBEDDING_MODEL}
+    if _synced_until is not None:
+        # >= so an update sharing the last timestamp isn't missed
+        query["updated_at"] = {"$gte": _synced_until}
+    keys, vectors = [], []
+    async for document in ExplanationEmbedding.find(query):
+        keys.append(document.explanation_id)
+        vectors.append(_from_document(document))
+        if document.updated_at and (_synced_until is None or document.updated_at > _synced_until):
+            _synced_until = document.updated_at
+    if vectors:
+        index.upsert_many(keys, np.stack(vectors))
+    return len(keys)
+
+
+async def backfill_embeddings() -> int:
+    """
+    Embed explanations that have entries but no embedding for the current
+    model: words saved before semantic search was on, imported or
+    pre-generated, or whose background embedding failed.
+    """
+    missing = [
+        explanation.id
+        async for explanation in Explanation.find({"entries.0": {"$exists": True}}).project(
+            _IdProjection
+        )
+        if explanation.id not in index
+    ]
+    for i in range(0, len(missing), settings.EMBEDDING_BATCH_SIZE):
+        ids = missing[i : i + settings.EMBEDDING_BATCH_SIZE]
+        await _store(await Explanation.find(In(Explanation.id, ids)).to_list())
+    return len(missing)
+
+
+async def sweep_missing(db) -> int:
+    """Run the backfill if no other worker has within the sweep interval."""
+    interval = settings.EMBEDDING_SWEEP_INTERVAL_SECONDS
+    if not await migrations.claim_lease(db, f"embedding_sweep:{settings.EMBEDDING_MODEL}", interval):
+        return 0
+    # Embeddings other workers stored since the last sync aren't missing
+    await load_index()
+    embedded = await backfill_embeddings()
+    if embedded:
+        logger.info(f"Embedded {embedded} explanations that had no embedding")
+    return embedded
+
+
+async def run_semantic_index(db) -> None:
+    """
+    Load the index, then keep syncing embeddings stored elsewhere and
+    periodically embed whatever is missing (one worker at a time); meant to
+    run as a background task.
+    """
+    try:
+        logger.info(f"Loaded {await load_index()} embeddings into the semantic index")
+    except Exception as e:
+        logger.error(f"Semantic index load failed: {e}")
+
+    last_sweep: Optional[float] = None
+    while True:
+        now = time.monotonic()
+        if last_sweep is None or now - last_sweep >= settings.EMBEDDING_SWEEP_INTERVAL_SECONDS:
+            last_sweep = now
+            try:
+                await sweep_missing(db)
+            except Exception as e:
+                logger.error(f"Embedding sweep failed: {e}")
+        await asyncio.sleep(settings.INDEX_SYNC_INTERVAL_SECONDS)
+        try:
+            await load_index()
+        except Exception as e:
+            logger.error(f"Semantic index sync failed: {e}")
+
+
+async def semantic_search(query: str, limit: int) -> List[Tuple[Explanation, float]]:
+    """Stored explanations closest in meaning to the query, best first."""
+    _stats["queries"] += 1
+    cache_key = query.strip().lower()
+    vector = _query_cache.get(cache_key)
+    if vector is None:
+        vector = (await pool("llm").run(embed, [query]))[0]
+        _query_cache.put(cache_key, vector)
+
+    matches = [
+        (key, score)
+        for key, score in index.search(vector, limit)
+        if score >= settings.SEMANTIC_MIN_SCORE
+    ]
+    if not matches:
+        return []
+    found = {
+        e.id: e
+        for e in await Explanation.find(In(Explanation.id, [key for key, _ in matches])).to_list()
+    }
+    for key, _ in matches:
+        # Deleted through another worker; its embedding went with it
+        if key not in found:
+            index.remove(key)
+    return [(found[key], score) for key, score in matches if key in found]
+
+
+def get_stats() -> dict:
+    return {
+        "enabled": enabled(),
+        "size": len(index),
+        "dim": index.dim,
+        "query_cache": _query_cache.stats(),
+        **_stats,
+    }
+
+
+events.subscribe("saved", on_saved)
+events.subscribe("deleted", on_deleted)
+register_collector("semantic", get_stats)
@@ -0,0 +1,398 @@
+import asyncio
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from beanie import PydanticObjectId
+
+from ...config import settings
+from ...models import Explanation
+from .. import events
+from ..metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# File layout, all little-endian:
+#   header:  magic, count, created_at, records/word order/data section offsets
+#   records: one per explanation, sorted by id: id, JSON offset+length, word offset+length
+#   words:   row numbers sorted by word, for binary search by word
+#   data:    pre-serialized JSON documents and UTF-8 words
+MAGIC = b"EXPSNAP1"
+HEADER = struct.Struct("<8sIxxxxdQQQ")
+RECORD = struct.Struct("<12sQIQI")
+ROW = struct.Struct("<I")
+
+Row = Tuple[bytes, str, bytes]  # (object id, word, JSON document)
+
+
+def write_snapshot(path: Path, rows: Iterable[Row], created_at: float) -> int:
+    """Write rows into a new snapshot file, atomically replacing `path`. Returns the count."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entries: List[Tuple[bytes, int, int, bytes]] = []
+    with tempfile.TemporaryFile() as data:
+        for object_id, word, document in rows:
+            entries.append((object_id, data.tell(), len(document), word.encode()))
+            data.write(document)
+        entries.sort(key=lambda entry: entry[0])
+
+        records_offset = HEADER.size
+        words_offset = records_offset + RECORD.size * len(entries)
+        data_offset = words_offset + ROW.size * len(entries)
+        word_start = data_offset + data.tell()
+
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, len(entries), created_at, records_offset, words_offset, data_offset))
+            word_offset = word_start
+            for object_id, offset, length, word in entries:
+                out.write(RECORD.pack(object_id, data_offset + offset, length, word_offset, len(word)))
+                word_offset += len(word)
+            by_word = sorted(range(len(entries)), key=lambda row: entries[row][3])
+            out.write(b"".join(ROW.pack(row) for row in by_word))
+            data.seek(0)
+            _copy(data, out)
+            out.write(b"".join(entry[3] for entry in entries))
+        os.replace(tmp_path, path)
+    return len(entries)
+
+
+def _copy(source: BinaryIO, target: BinaryIO, chunk: int = 1 << 20) -> None:
+    while block := source.read(chunk):
+        target.write(block)
+
+
+class Snapshot:
+    """
+    A read-only, memory-mapped snapshot. The mapping is shared by every
+    worker that opens the same file, and lookups are binary searches over
+    the mapped tables with no parsing of the documents themselves.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.created_at, self._records, self._words, _ = HEADER.unpack_from(
+            self._map, 0
+        )
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not an explanation snapshot")
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _record(self, row: int) -> Tuple[bytes, int, int, int, int]:
+        return RECORD.unpack_from(self._map, self._records + row * RECORD.size)
+
+    def _document(self, row: int) -> bytes:
+        _, offset, length, _, _ = self._record(row)
+        return self._map[offset : offset + length]
+
+    def _word(self, row: int) -> bytes:
+        _, _, _, offset, length = self._record(row)
+        return self._map[offset : offset + length]
+
+    def get(self, object_id: bytes) -> Optional[bytes]:
+        """The JSON document with this 12-byte id, if it's in the snapshot."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            start = self._records + middle * RECORD.size
+            if self._map[start : start + 12] < object_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._record(low)[0] == object_id:
+            return self._document(low)
+        return None
+
+    def get_by_word(self, word: str) -> Optional[bytes]:
+        target = word.encode()
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            row = ROW.unpack_from(self._map, self._words + middle * ROW.size)[0]
+            if self._word(row) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            row = ROW.unpack_from(self._map, self._words + low * ROW.size)[0]
+            if self._word(row) == target:
+                return self._document(row)
+        return None
+
+    def page(self, skip: int, limit: int) -> List[bytes]:
+        """Documents in id (insertion) order."""
+        return [self._document(row) for row in range(skip, min(self.count, skip + limit))]
+
+
+# This worker's mapped snapshot and the ids changed since it was built
+_current: Optional[Snapshot] = None
+_dirty: Dict[str, float] = {}
+# Offset read so far in each change log generation this worker knows of
+_dirty_log_positions: Dict[int, int] = {}
+_stats: Counter = Counter()
+
+
+def enabled() -> bool:
+    return settings.SNAPSHOT_ENABLED
+
+
+def _dirty_log_path(generation: int) -> Path:
+    """
+    Changes are logged in numbered generations; each snapshot build starts
+    the next one. Names are never reused, so a reader can't mistake a new
+    log for one it has already read.
+    """
+    return settings.SNAPSHOT_PATH.with_suffix(
+        f"{settings.SNAPSHOT_PATH.suffix}.dirty.{generation}"
+    )
+
+
+def _dirty_log_generations() -> List[int]:
+    prefix = f"{settings.SNAPSHOT_PATH.name}.dirty."
+    generations = []
+    try:
+        names = os.listdir(settings.SNAPSHOT_PATH.parent)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        if name.startswith(prefix) and name[len(prefix) :].isdigit():
+            generations.append(int(name[len(prefix) :]))
+    return sorted(generations)
+
+
+def mark_ids_dirty(explanation_ids: Iterable) -> None:
+    """
+    Record changes so every worker stops serving the snapshot's copies.
+    All lines go out in one write, which O_APPEND keeps whole across processes.
+    """
+    if not enabled():
+        return
+    now = time.time()
+    lines = []
+    for explanation_id in explanation_ids:
+        _dirty[str(explanation_id)] = now
+        lines.append(f"{now} {explanation_id}\n")
+    if not lines:
+        return
+    generations = _dirty_log_generations()
+    path = _dirty_log_path(generations[-1] if generations else 0)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, "".join(lines).encode())
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.error(f"Could not record snapshot change: {e}")
+
+
+def _mark_dirty(explanation: Explanation) -> None:
+    mark_ids_dirty([explanation.id])
+
+
+def _read_dirty_log() -> None:
+    """
+    Pick up changes other workers recorded since the last read. Older
+    generations are still drained, since a writer may have appended to one
+    just as a build started the next.
+    """
+    if not _dirty_log_positions:
+        for generation in _dirty_log_generations():
+            _dirty_log_positions[generation] = 0
+    else:
+        newest = max(_dirty_log_positions)
+        while _dirty_log_path(newest + 1).exists():
+            newest += 1
+            _dirty_log_positions[newest] = 0
+
+    for generation, offset in sorted(_dirty_log_positions.items()):
+        path = _dirty_log_path(generation)
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            # Pruned; everything in it is older than the current snapshot
+            del _dirty_log_positions[generation]
+            continue
+        if size <= offset:
+            continue
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        # Leave a partially written last line for next time
+        complete = data[: data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            changed_at, _, explanation_id = line.decode().partition(" ")
+            _dirty[explanation_id] = max(float(changed_at), _dirty.get(explanation_id, 0))
+        _dirty_log_positions[generation] = offset + len(complete)
+
+
+def _usable() -> Optional[Snapshot]:
+    if _current is None:
+        return None
+    _read_dirty_log()
+    return _current
+
+
+def _is_dirty(explanation_id: str, snapshot: Snapshot) -> bool:
+    return _dirty.get(explanation_id, 0) >= snapshot.created_at
+
+
+def read_explanation(explanation_id: PydanticObjectId) -> Optional[bytes]:
+    """The explanation's JSON from the snapshot, or None if Mongo must be asked."""
+    snapshot = _usable()
+    if snapshot is None or _is_dirty(str(explanation_id), snapshot):
+        _stats["misses"] += 1
+        return None
+    document = snapshot.get(explanation_id.binary)
+    _stats["hits" if document is not None else "misses"] += 1
+    return document
+
+
+def find_word(word: str) -> Optional[Explanation]:
+    snapshot = _usable()
+    document = snapshot.get_by_word(word) if snapshot else None
+    if document is None:
+        _stats["misses"] += 1
+        return None
+    explanation = Explanation.model_validate_json(document)
+    if _is_dirty(str(explanation.id), snapshot):
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    return explanation
+
+
+def read_page(skip: int, limit: int) -> Optional[bytes]:
+    """
+    An unfiltered list page as JSON, while nothing has changed since the
+    snapshot was built; totals and ordering would be off otherwise.
+    """
+    snapshot = _usable()
+    if snapshot is None or any(t >= snapshot.created_at for t in _dirty.values()):
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    items = b",".join(snapshot.page(skip, limit))
+    return (
+        b'{"items":[' + items + b'],"total":%d,"skip":%d,"limit":%d}'
+        % (snapshot.count, skip, limit)
+    )
+
+
+def _load() -> None:
+    """Map the snapshot file if it is newer than the one this worker has."""
+    global _current
+    try:
+        inode = os.stat(settings.SNAPSHOT_PATH).st_ino
+    except FileNotFoundError:
+        return
+    if _current is not None and _current.inode == inode:
+        return
+    previous, _current = _current, Snapshot(settings.SNAPSHOT_PATH)
+    # Changes from before the new snapshot are part of it
+    for explanation_id, changed_at in list(_dirty.items()):
+        if changed_at < _current.created_at:
+            del _dirty[explanation_id]
+    if previous:
+        previous.close()
+    logger.info(f"Mapped explanation snapshot with {_current.count} entries")
+
+
+def _rotate_dirty_log() -> float:
+    """
+    Start the next change log generation and prune the ones before the
+    previous generation. Those only hold changes older than the snapshot
+    every worker has mapped by now; the previous generation is kept so
+    lines written to it just before the rotation still get read.
+    """
+    settings.SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    generations = _dirty_log_generations()
+    created_at = time.time()
+    generation = generations[-1] + 1 if generations else 0
+    os.close(os.open(_dirty_log_path(generation), os.O_WRONLY | os.O_CREAT, 0o644))
+    for old in generations[:-1]:
+        try:
+            os.remove(_dirty_log_path(old))
+        except FileNotFoundError:
+            pass
+    return created_at
+
+
+async def build_snapshot() -> int:
+    """Write every explanation into a fresh snapshot file."""
+    # Start a new change log first; changes from here on are newer than the snapshot
+    created_at = _rotate_dirty_log()
+
+    # Only the serialized documents are kept while reading, not the models
+    rows: List[Row] = []
+    async for explanation in Explanation.find():
+        rows.append(
+            (
+                explanation.id.binary,
+                explanation.word,
+                explanation.model_dump_json(by_alias=True).encode(),
+            )
+        )
+    count = await asyncio.to_thread(write_snapshot, settings.SNAPSHOT_PATH, rows, created_at)
+    _stats["builds"] += 1
+    logger.info(f"Wrote explanation snapshot with {count} entries")
+    return count
+
+
+def _try_lead() -> Optional[int]:
+    """One worker per host builds snapshots; the rest only map them."""
+    settings.SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = settings.SNAPSHOT_PATH.with_suffix(settings.SNAPSHOT_PATH.suffix + ".lock")
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+async def run_snapshots() -> None:
+    """Build (if this worker leads) and map snapshots forever; meant to run as a background task."""
+    lock = None
+    while True:
+        try:
+            _load()
+            if lock is None:
+                lock = _try_lead()
+            if lock is not None:
+                age = time.time() - (_current.created_at if _current else 0)
+                if age >= settings.SNAPSHOT_INTERVAL_SECONDS:
+                    await build_snapshot()
+                    _load()
+        except Exception as e:
+            logger.error(f"Explanation snapshot failed: {e}")
+        await asyncio.sleep(settings.SNAPSHOT_CHECK_SECONDS)
+
+
+def get_stats() -> dict:
+    return {
+        "enabled": enabled(),
+        "entries": _current.count if _current else None,
+        "age_seconds": round(time.time() - _current.created_at) if _current else None,
+        "dirty": len(_dirty),
+        **_stats,
+    }
+
+
+events.subscribe("created", _mark_dirty)
+events.subscribe("saved", _mark_dirty)
+events.subscribe("deleted", _mark_dirty)
+register_collector("snapshot", get_stats)
@@ -0,0 +1,61 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from .json_repair import recover_fields
+
+PartialCallback = Callable[[Dict[str, Any]], None]
+
+
+class GenerationCancelled(Exception):
+    """The caller no longer wants the output of a generation."""
+
+
+def collect_stream(
+    response, on_text: Callable[[str], None], cancelled: Optional[threading.Event] = None
+) -> List[str]:
+    """
+    Read a streamed chat completion into one string per choice, calling
+    `on_text` with the text of the first choice so far after every delta.
+    Setting `cancelled` closes the stream and raises GenerationCancelled.
+    """
+    contents: Dict[int, str] = {}
+    for chunk in response:
+        if cancelled is not None and cancelled.is_set():
+            # Frees the backend connection instead of reading to the end
+            response.close()
+            raise GenerationCancelled()
+        for choice in chunk.choices:
+            delta = choice.delta.content if choice.delta else None
+            if not delta:
+                continue
+            contents[choice.index] = contents.get(choice.index, "") + delta
+            if choice.index == 0:
+                on_text(contents[0])
+    return [contents[i] for i in sorted(contents)]
+
+
+def partial_parser(
+    schema: Type[BaseModel], on_partial: PartialCallback, interval: float
+) -> Callable[[str], None]:
+    """
+    Turn a growing JSON buffer into calls of `on_partial` with the fields
+    recovered so far, at most once per `interval` and only when they change.
+    """
+    last_sent = 0.0
+    last_fields: Dict[str, Any] = {}
+
+    def feed(text: str) -> None:
+        nonlocal last_sent, last_fields
+        now = time.monotonic()
+        if now - last_sent < interval:
+            return
+        fields = recover_fields(text, schema)
+        if not fields or fields == last_fields:
+            return
+        last_sent, last_fields = now, fields
+        on_partial(fields)
+
+    return feed
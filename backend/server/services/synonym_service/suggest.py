@@ -0,0 +1,202 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+from pydantic import BaseModel, Field
+
+from ...config import settings
+from ...models import Explanation
+from .. import events, revisions
+from ..lru import LRUCache
+from ..metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+# Ids embed their creation second; re-reading a little before the last
+# sync catches words other workers created in the same second
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class Suggestion(BaseModel):
+    id: PydanticObjectId
+    word: str
+    lookup_count: int
+
+
+class _WordProjection(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    word: str
+    lookup_count: int = 0
+
+
+class _IdProjection(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+
+
+def normalize(word: str) -> str:
+    return word.strip().casefold()
+
+
+class PrefixIndex:
+    """
+    Words kept sorted by their normalized form, so every word with a given
+    prefix is one contiguous slice found by binary search. The top results
+    per prefix are cached until a word with that prefix changes.
+    """
+
+    def __init__(self, max_limit: int, cache_size: int = 2048):
+        self.max_limit = max_limit
+        self._keys: List[Tuple[str, str]] = []  # (normalized, id) in sorted order
+        self._entries: Dict[str, Suggestion] = {}
+        self._cache: LRUCache[List[Suggestion]] = LRUCache(cache_size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def build(self, suggestions: List[Suggestion]) -> None:
+        with self._lock:
+            self._entries = {str(s.id): s for s in suggestions}
+            self._keys = sorted((normalize(s.word), str(s.id)) for s in suggestions)
+            self._cache.clear()
+
+    def add(self, suggestion: Suggestion) -> None:
+        with self._lock:
+            key = str(suggestion.id)
+            if key in self._entries:
+                return
+            self._entries[key] = suggestion
+            bisect.insort(self._keys, (normalize(suggestion.word), key))
+            self._invalidate(suggestion.word)
+
+    def remove(self, id: PydanticObjectId) -> None:
+        with self._lock:
+            suggestion = self._entries.pop(str(id), None)
+            if suggestion is None:
+                return
+            item = (normalize(suggestion.word), str(id))
+            position = bisect.bisect_left(self._keys, item)
+            if position < len(self._keys) and self._keys[position] == item:
+                del self._keys[position]
+            self._invalidate(suggestion.word)
+
+    def retain(self, ids: Set[str]) -> int:
+        """Drop words whose id isn't in `ids`; returns how many were dropped."""
+        gone = [PydanticObjectId(key) for key in self._entries if key not in ids]
+        for id in gone:
+            self.remove(id)
+        return len(gone)
+
+    def bump(self, id: PydanticObjectId) -> None:
+        """Count a lookup; popularity only changes the order within a prefix."""
+        with self._lock:
+            suggestion = self._entries.get(str(id))
+            if suggestion is None:
+                return
+            suggestion.lookup_count += 1
+            self._invalidate(suggestion.word)
+
+    def _invalidate(self, word: str) -> None:
+        word = normalize(word)
+        for end in range(1, len(word) + 1):
+            self._cache.pop(word[:end])
+
+    def suggest(self, prefix: str, limit: int) -> List[Suggestion]:
+        """The most looked-up words starting with the prefix."""
+        prefix = normalize(prefix)
+        limit = min(limit, self.max_limit)
+        cached = self._cache.get(prefix)
+        if cached is not None:
+            return cached[:limit]
+
+        with self._lock:
+            start = bisect.bisect_left(self._keys, (prefix, ""))
+            # Every key with the prefix sorts before prefix + the highest code point
+            end = bisect.bisect_left(self._keys, (prefix + "\U0010ffff", ""), lo=start)
+            matches = (self._entries[key] for _, key in self._keys[start:end])
+            top = heapq.nsmallest(
+                self.max_limit, matches, key=lambda s: (-s.lookup_count, normalize(s.word))
+            )
+            self._cache.put(prefix, top)
+        return top[:limit]
+
+    def stats(self) -> dict:
+        return {"words": len(self._keys), "cache": self._cache.stats()}
+
+
+index = PrefixIndex(settings.SUGGEST_MAX_LIMIT, settings.SUGGEST_CACHE_SIZE)
+
+
+_synced_at: Optional[datetime] = None
+_imports: Optional[int] = None  # Import revision the index was built at
+
+
+async def build_index() -> None:
+    """Fill this worker's index with a projection-only read of all words."""
+    global _synced_at, _imports
+    synced_at = datetime.now(timezone.utc)
+    _imports = await revisions.current(revisions.IMPORTS)
+    suggestions = [
+        Suggestion(**word.model_dump())
+        async for word in Explanation.find().project(_WordProjection)
+    ]
+    index.build(suggestions)
+    _synced_at = synced_at
+    logger.info(f"Loaded {len(suggestions)} words into the suggest index")
+
+
+async def sync_index() -> None:
+    """
+    Pick up words created and deleted through other workers: new ids since
+    the last sync, and a full id check only when the collection has fewer
+    words than the index.
+    """
+    global _synced_at
+    if _synced_at is None or await revisions.current(revisions.IMPORTS) != _imports:
+        await build_index()
+        return
+    synced_at = datetime.now(timezone.utc)
+    since = ObjectId.from_datetime(_synced_at - SYNC_OVERLAP)
+    async for word in Explanation.find({"_id": {"$gte": since}}).project(_WordProjection):
+        index.add(Suggestion(**word.model_dump()))
+    _synced_at = synced_at
+
+    if await Explanation.find().count() < len(index):
+        ids = {str(word.id) async for word in Explanation.find().project(_IdProjection)}
+        dropped = index.retain(ids)
+        logger.info(f"Dropped {dropped} deleted words from the suggest index")
+
+
+async def run_suggest_sync() -> None:
+    """Keep this worker's index in step with the others; meant to run as a background task."""
+    while True:
+        await asyncio.sleep(settings.INDEX_SYNC_INTERVAL_SECONDS)
+        try:
+            await sync_index()
+        except Exception as e:
+            logger.error(f"Suggest index sync failed: {e}")
+
+
+def _on_created(explanation: Explanation) -> None:
+    index.add(
+        Suggestion(
+            id=explanation.id,
+            word=explanation.word,
+            lookup_count=explanation.lookup_count,
+        )
+    )
+
+
+def _on_deleted(explanation: Explanation) -> None:
+    index.remove(explanation.id)
+
+
+events.subscribe("created", _on_created)
+events.subscribe("deleted", _on_deleted)
+register_collector("suggest", index.stats)
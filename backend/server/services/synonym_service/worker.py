@@ -5,10 +5,21 @@ import json
 from typing import Optional
 from beanie import PydanticObjectId
 import asyncio
+import threading
 
 from ...models import Explanation, ExplanationEntry
-from .ai import create_and_validate_synonym
+from .ai import (
+    PROMPT_VERSION,
+    create_and_validate_synonym,
+    create_draft_synonym,
+    get_search_results_async,
+)
+from .graph import neighbour_synonyms, synonym_keys
+from .pools import pool
+from .streaming import PartialCallback
+from ...config import settings
 from ...services.websocket_service import ConnectionManager
+from ...services import events
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +27,102 @@ logger = logging.getLogger(__name__)
 _processing_set = set()
 _last_processed = {}
 
-async def process_explanation(explanation_id: PydanticObjectId, is_retry: bool = False):
-    """Process a single explanation"""
+def build_entry(result) -> ExplanationEntry:
+    """A stored entry for a pipeline result, tagged with the prompt and model that made it"""
+    return ExplanationEntry(
+        synonyms=result.synonyms,
+        explanation=result.explanation,
+        prompt_version=PROMPT_VERSION,
+        model=settings.OPENAI_MODEL,
+    )
+
+
+def _partial_sender(
+    explanation_id: PydanticObjectId, word: str, cancelled: Optional[threading.Event] = None
+) -> Optional[PartialCallback]:
+    """Callback for generation threads that pushes partial results to clients until cancelled"""
+    if not settings.STREAM_PARTIALS_ENABLED:
+        return None
+    loop = asyncio.get_running_loop()
+
+    def send(fields: dict):
+        if cancelled is not None and cancelled.is_set():
+            return
+        message = {
+            "type": "explanation_partial",
+            "id": str(explanation_id),
+            "word": word,
+            "synonyms": fields.get("synonyms", []),
+            "explanation": fields.get("explanation", ""),
+        }
+        asyncio.run_coroutine_threadsafe(ConnectionManager.send_message(message), loop)
+
+    return send
+
+
+async def _publish_neighbour_preview(explanation_id: PydanticObjectId, word: str):
+    """Show the synonyms of stored words that list this one while generation is pending"""
+    try:
+        synonyms = await neighbour_synonyms(word)
+    except Exception as e:
+        logger.warning(f"Could not look up neighbours of {word}: {e}")
+        return
+    if not synonyms:
+        return
+
+    await ConnectionManager.send_message(
+        {
+            "type": "explanation_related",
+            "id": str(explanation_id),
+            "word": word,
+            "synonyms": synonyms,
+            "explanation": "",
+        }
+    )
+
+
+async def _publish_draft(explanation_id: PydanticObjectId, word: str, cancelled: threading.Event):
+    """Generate an ungrounded draft and push it to clients as a provisional entry"""
+    draft = await pool("llm").run(
+        create_draft_synonym, word, _partial_sender(explanation_id, word, cancelled), cancelled
+    )
+    if not draft or cancelled.is_set():
+        return
+
+    logger.info(f"Publishing draft for: {word}")
+    await ConnectionManager.send_message(
+        {
+            "type": "explanation_draft",
+            "id": str(explanation_id),
+            "word": word,
+            "synonyms": draft.synonyms,
+            "explanation": draft.explanation,
+        }
+    )
+
+
+async def _generate_with_draft(explanation_id: PydanticObjectId, word: str):
+    """Search and generate the grounded result while a draft is produced alongside"""
+    # Cancelling the task alone would leave the draft running in its thread
+    cancelled = threading.Event()
+    draft_task = asyncio.create_task(_publish_draft(explanation_id, word, cancelled))
+    try:
+        search_info = await get_search_results_async(word)
+        return await pool("cpu").run(create_and_validate_synonym, word, search_info)
+    finally:
+        # The grounded result supersedes a draft that hasn't been published yet
+        cancelled.set()
+        if not draft_task.done():
+            draft_task.cancel()
+
+
+async def process_explanation(
+    explanation_id: PydanticObjectId, is_retry: bool = False, replace_latest: bool = False
+):
+    """
+    Process a single explanation. Retries add an entry; with `replace_latest`
+    (refreshes) the new entry takes the latest one's place instead.
+    """
     explanation_id_str = str(explanation_id)
     
     # Skip if already being processed
@@ -47,36 +152,61 @@ async def process_explanation(explanation_id: PydanticObjectId, is_retry: bool =
 
         # Generate explanation in a separate task to avoid blocking
         logger.info(f"Generating explanation for: {explanation.word}")
+        if settings.RELATED_PREVIEW_ENABLED and not explanation.entries:
+            await _publish_neighbour_preview(explanation_id, explanation.word)
         try:
-            # Use asyncio.get_event_loop().run_in_executor for CPU-bound tasks
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, create_and_validate_synonym, explanation.word)
+            # New words get a quick draft while the grounded result is generated
+            if settings.DRAFT_FIRST_ENABLED and not explanation.entries:
+                result = await _generate_with_draft(explanation_id, explanation.word)
+            else:
+                # Stream partial output only while there is nothing else to show
+                on_partial = (
+                    None if explanation.entries else _partial_sender(explanation_id, explanation.word)
+                )
+                search_info = await get_search_results_async(explanation.word)
+                result = await pool("cpu").run(
+                    create_and_validate_synonym, explanation.word, search_info, on_partial
+                )
             
             if not result:
                 raise Exception("Failed to generate explanation")
 
-            # Update entries
-            entries = (
-                explanation.entries
-                + [
-                    ExplanationEntry(
-                        synonyms=result.synonyms, explanation=result.explanation
-                    )
-                ]
-                if is_retry
-                else [
-                    ExplanationEntry(
-                        synonyms=result.synonyms, explanation=result.explanation
-                    )
-                ]
-            )
+            entry = build_entry(result)
+            updated_at = datetime.now()
 
-            # Save to database
-            explanation.entries = entries
-            explanation.updated_at = datetime.now()
-            await explanation.save()
+            # Save to database atomically so concurrent writers can't drop entries
+            if is_retry and replace_latest and explanation.entries:
+                latest = len(explanation.entries) - 1
+                update = {
+                    "$set": {
+                        f"entries.{latest}": entry.model_dump(),
+                        "updated_at": updated_at,
+                        "synonym_keys": synonym_keys(entry),
+                    }
+                }
+                explanation.entries = explanation.entries[:latest] + [entry]
+            elif is_retry:
+                update = {
+                    "$push": {"entries": entry.model_dump()},
+                    "$set": {"updated_at": updated_at, "synonym_keys": synonym_keys(entry)},
+                }
+                explanation.entries = explanation.entries + [entry]
+            else:
+                update = {
+                    "$set": {
+                        "entries": [entry.model_dump()],
+                        "updated_at": updated_at,
+                        "synonym_keys": synonym_keys(entry),
+                    }
+                }
+                explanation.entries = [entry]
+            await Explanation.find_one(Explanation.id == explanation.id).update(update)
+            explanation.updated_at = updated_at
             
             logger.info(f"Successfully processed: {explanation.word}")
+            await events.publish("saved", explanation)
+            if not is_retry:
+                await events.publish("generated", explanation)
 
             # After successful processing, notify clients
             await ConnectionManager.send_message(
@@ -0,0 +1,146 @@
+import logging
+import zlib
+from collections import Counter
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Literal
+
+from bson import json_util
+from bson.json_util import RELAXED_JSON_OPTIONS
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from ..config import settings
+from ..models import Explanation, SynonymNuance
+from . import revisions
+from .synonym_service import snapshot
+
+logger = logging.getLogger(__name__)
+
+# Export kinds and the collections they live in
+COLLECTIONS: Dict[str, str] = {
+    "explanations": Explanation.Settings.name,
+    "nuances": SynonymNuance.Settings.name,
+}
+
+ImportMode = Literal["upsert", "insert"]
+
+# Compressed output is flushed in chunks of about this size
+GZIP_CHUNK_BYTES = 64 * 1024
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+async def export_lines(database, kinds: Iterable[str] = COLLECTIONS) -> AsyncIterator[bytes]:
+    """
+    Stream every document as one NDJSON line, straight off the cursor.
+    Lines are extended JSON ({"kind": ..., "doc": ...}) so ids and dates
+    survive the round trip.
+    """
+    for kind in kinds:
+        cursor = database[COLLECTIONS[kind]].find({}, batch_size=settings.TRANSFER_BATCH_SIZE)
+        async for document in cursor:
+            line = json_util.dumps({"kind": kind, "doc": document}, json_options=RELAXED_JSON_OPTIONS)
+            yield line.encode() + b"\n"
+
+
+async def gzip_chunks(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    pending: List[bytes] = []
+    size = 0
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            pending.append(compressed)
+            size += len(compressed)
+        if size >= GZIP_CHUNK_BYTES:
+            yield b"".join(pending)
+            pending, size = [], 0
+    pending.append(compressor.flush())
+    yield b"".join(pending)
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines, gunzipping it first if it is gzip."""
+    decompressor = None
+    buffer = b""
+    async for chunk in chunks:
+        if decompressor is None:
+            gzipped = (buffer + chunk)[:2] == GZIP_MAGIC
+            decompressor = zlib.decompressobj(wbits=47) if gzipped else False
+        if decompressor:
+            chunk = decompressor.decompress(chunk)
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if decompressor:
+        buffer += decompressor.flush()
+    for line in buffer.split(b"\n"):
+        if line.strip():
+            yield line
+
+
+async def _write_batch(collection, documents: List[dict], mode: ImportMode, stats: Counter) -> None:
+    try:
+        if mode == "insert":
+            result = await collection.insert_many(documents, ordered=False)
+            stats["inserted"] += len(result.inserted_ids)
+        else:
+            result = await collection.bulk_write(
+                [ReplaceOne({"_id": d["_id"]}, d, upsert=True) for d in documents],
+                ordered=False,
+            )
+            stats["inserted"] += result.upserted_count
+            stats["updated"] += result.matched_count
+    except BulkWriteError as e:
+        # Unordered writes carry on past bad documents; count what went through
+        details = e.details
+        stats["inserted"] += details.get("nInserted", 0) + details.get("nUpserted", 0)
+        stats["updated"] += details.get("nMatched", 0)
+        duplicates = sum(1 for error in details["writeErrors"] if error["code"] == 11000)
+        stats["skipped_duplicates"] += duplicates
+        stats["errors"] += len(details["writeErrors"]) - duplicates
+
+
+def _mark_changed(kind: str, batch: List[dict]) -> None:
+    """Stop every worker on this host serving snapshot copies of imported explanations."""
+    if kind == "explanations":
+        snapshot.mark_ids_dirty(doc["_id"] for doc in batch if "_id" in doc)
+
+
+async def import_lines(
+    database, lines: AsyncIterable[bytes], mode: ImportMode = "upsert"
+) -> Dict[str, int]:
+    """
+    Import NDJSON lines made by export_lines, in unordered batches per
+    collection so memory stays flat. "insert" keeps existing documents,
+    "upsert" replaces them.
+    """
+    stats: Counter = Counter()
+    batches: Dict[str, List[dict]] = {kind: [] for kind in COLLECTIONS}
+    async for line in lines:
+        try:
+            record = json_util.loads(line)
+            batch = batches[record["kind"]]
+            batch.append(record["doc"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Skipping unreadable import line: {e}")
+            stats["invalid"] += 1
+            continue
+        if len(batch) >= settings.TRANSFER_BATCH_SIZE:
+            await _write_batch(database[COLLECTIONS[record["kind"]]], batch, mode, stats)
+            _mark_changed(record["kind"], batch)
+            batch.clear()
+
+    for kind, batch in batches.items():
+        if batch:
+            await _write_batch(database[COLLECTIONS[kind]], batch, mode, stats)
+            _mark_changed(kind, batch)
+    if stats["inserted"] or stats["updated"]:
+        # Cached list pages in every worker key on this revision
+        await revisions.bump(database)
+        # Imported documents keep their ids and updated_at, so the workers'
+        # in-memory indexes rebuild in full rather than sync incrementally
+        await revisions.bump(database, revisions.IMPORTS)
+    logger.info(f"Import finished: {dict(stats)}")
+    return dict(stats)
@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from server.services import admission
+from server.services.admission import TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    admission._buckets.clear()
+    admission._pending.clear()
+    yield
+    admission._buckets.clear()
+    admission._pending.clear()
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(rate_per_second=1, burst=2)
+    now = bucket.updated
+    assert bucket.try_take(now) == 0
+    assert bucket.try_take(now) == 0
+    assert bucket.try_take(now) == pytest.approx(1)
+    assert bucket.try_take(now + 1) == 0
+
+
+def test_rate_limited_client_gets_retry_after():
+    with patch.object(admission.settings, "ADMISSION_BURST", 1), patch.object(
+        admission.settings, "ADMISSION_RATE_PER_MINUTE", 6
+    ):
+        admission.admit("a")
+        with pytest.raises(HTTPException) as error:
+            admission.admit("a")
+
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "10"
+    # Another client is unaffected
+    admission.admit("b")
+
+
+def test_one_client_cannot_fill_the_queue():
+    with patch.object(admission.settings, "ADMISSION_MAX_PENDING_PER_CLIENT", 2):
+        admission.admit("batch")
+        admission.admit("batch")
+        with pytest.raises(HTTPException):
+            admission.admit("batch")
+        admission.admit("interactive")
+
+        admission.release("batch")
+        admission.admit("batch")
+
+
+def test_global_queue_depth_is_enforced():
+    with patch.object(admission.settings, "ADMISSION_MAX_PENDING", 2):
+        admission.admit("a")
+        admission.admit("b")
+        with pytest.raises(HTTPException) as error:
+            admission.admit("c")
+    assert error.value.status_code == 429
+    assert admission.pending_total() == 2
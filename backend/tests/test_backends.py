@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from server.services.synonym_service import ai, backends
+from server.services.synonym_service.backends import Backend, BackendPool
+
+
+def make_fake_server(word: str):
+    """A minimal OpenAI-compatible server that answers every chat completion."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            hits.append(body["model"])
+            content = json.dumps({"word": word, "synonyms": [], "explanation": word})
+            payload = json.dumps(
+                {
+                    "id": "1",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": content},
+                        }
+                    ],
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1/", hits
+
+
+@pytest.fixture
+def fake_servers():
+    servers = [make_fake_server("a"), make_fake_server("b")]
+    yield servers
+    for server, _, _ in servers:
+        server.shutdown()
+
+
+def test_requests_spread_across_backends(fake_servers):
+    (_, url_a, hits_a), (_, url_b, hits_b) = fake_servers
+    pool = BackendPool([Backend(url_a), Backend(url_b, {"gemma2": "gemma2:9b"})])
+
+    with patch.object(backends, "_pool", pool), patch.object(
+        ai.settings, "OPENAI_MODEL", "gemma2"
+    ):
+        for _ in range(6):
+            ai.create_completion("large", messages=[{"role": "user", "content": "hej"}])
+
+    assert len(hits_a) > 0 and len(hits_b) > 0
+    assert set(hits_b) == {"gemma2:9b"}
+
+
+def test_dead_backend_is_ejected_and_calls_fail_over(fake_servers):
+    (_, url_a, hits_a), _ = fake_servers
+    dead = Backend("http://127.0.0.1:1/v1/")
+    pool = BackendPool([dead, Backend(url_a)])
+
+    with patch.object(backends, "_pool", pool), patch.object(
+        ai.settings, "BACKEND_EJECT_AFTER_FAILURES", 1
+    ):
+        for _ in range(4):
+            ai.create_completion("large", messages=[{"role": "user", "content": "hej"}])
+
+    assert len(hits_a) == 4
+    assert dead.failures == 1
+    assert dead.is_ejected(time.monotonic())
+
+
+def test_failed_backend_is_readmitted_after_success():
+    backend = Backend("http://example/v1/")
+    pool = BackendPool([backend])
+    with patch.object(ai.settings, "BACKEND_EJECT_AFTER_FAILURES", 1):
+        pool.record_failure(backend)
+    assert pool.stats()["backends"][0]["healthy"] is False
+
+    pool.record_success(backend)
+    assert pool.stats()["backends"][0]["healthy"] is True
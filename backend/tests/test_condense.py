@@ -0,0 +1,43 @@
+from server.services.synonym_service.condense import (
+    condense_snippets,
+    estimate_similarity,
+    estimate_tokens,
+    minhash_signature,
+    relevance_score,
+)
+
+
+def test_minhash_detects_near_duplicates():
+    a = "Glad betyder att känna glädje och vara på gott humör, synonymer är lycklig och munter."
+    b = "Glad betyder att känna glädje och vara på gott humör, synonymer är lycklig och munter!"
+    c = "Bilen stod parkerad utanför huset hela natten i regnet."
+
+    assert estimate_similarity(minhash_signature(a), minhash_signature(b)) > 0.9
+    assert estimate_similarity(minhash_signature(a), minhash_signature(c)) < 0.2
+
+
+def test_relevance_prefers_snippets_about_the_word():
+    on_topic = "Synonymer till glad: lycklig, munter. Ordet glad betyder nöjd."
+    off_topic = "Vädret i Stockholm blir soligt i helgen enligt SMHI."
+
+    assert relevance_score(on_topic, "glad") > relevance_score(off_topic, "glad")
+
+
+def test_condense_removes_duplicates_and_respects_budget():
+    snippets = [
+        "Vädret i Stockholm blir soligt i helgen enligt SMHI och prognosen.",
+        "Synonymer till glad: lycklig, munter, nöjd.",
+        "Synonymer till glad: lycklig, munter, nöjd.",
+        "Glad betyder att vara på gott humör.",
+        "",
+    ]
+
+    kept, stats = condense_snippets(snippets, "glad", token_budget=22)
+
+    assert stats.snippets_in == 4
+    assert stats.near_duplicates == 1
+    assert kept[0].startswith("Synonymer till glad")
+    assert "Vädret" not in " ".join(kept)
+    assert stats.tokens_out <= 22
+    assert stats.tokens_saved == stats.tokens_in - stats.tokens_out
+    assert stats.tokens_out == sum(estimate_tokens(s) for s in kept)
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from beanie import PydanticObjectId
+
+from server.models import ExplanationEntry
+from server.services.synonym_service import graph as graph_module
+from server.services.synonym_service.graph import SynonymGraph, synonym_keys
+
+
+def _graph():
+    graph = SynonymGraph()
+    ids = {word: PydanticObjectId() for word in ("glad", "lycklig", "nöjd")}
+    graph.set_word("glad", ids["glad"], ["lycklig", "munter"])
+    graph.set_word("lycklig", ids["lycklig"], ["glad", "salig"])
+    graph.set_word("nöjd", ids["nöjd"], ["belåten", "glad"])
+    return graph, ids
+
+
+def test_synonym_keys_are_normalized_and_deduplicated():
+    entry = ExplanationEntry(explanation="", synonyms=[" Glad", "glad", "", "Munter"])
+    assert synonym_keys(entry) == ["glad", "munter"]
+    assert synonym_keys(ExplanationEntry(explanation="", synonyms=None)) == []
+
+
+def test_reverse_lookup_lists_stored_words_giving_a_synonym():
+    graph, ids = _graph()
+    listed = graph.related("Glad", hops=1, direction="in")
+    assert [(r.word, r.id) for r in listed] == [("lycklig", ids["lycklig"]), ("nöjd", ids["nöjd"])]
+    assert graph.related("munter", direction="in")[0].word == "glad"
+    assert graph.related("okänd") == []
+
+
+def test_k_hop_traversal_orders_by_distance():
+    graph, _ = _graph()
+    one_hop = {r.word for r in graph.related("munter", hops=1)}
+    assert one_hop == {"glad"}
+    two_hops = graph.related("munter", hops=2)
+    assert [r.distance for r in two_hops] == sorted(r.distance for r in two_hops)
+    assert {r.word for r in two_hops if r.distance == 2} == {"lycklig", "nöjd"}
+    # Words without a stored explanation have no id
+    assert next(r for r in graph.related("glad") if r.word == "munter").id is None
+
+
+def test_saving_replaces_edges_and_delete_drops_them():
+    graph, ids = _graph()
+    graph.set_word("glad", ids["glad"], ["förnöjd"])
+    assert {r.word for r in graph.related("glad", direction="out")} == {"förnöjd"}
+    assert graph.related("munter", direction="in") == []
+
+    graph.remove_word("nöjd")
+    assert [r.word for r in graph.related("glad", direction="in")] == ["lycklig"]
+    assert graph.stats()["stored"] == 2
+
+
+class _Query:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def project(self, projection):
+        return self
+
+    async def count(self):
+        return len(self.documents)
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+
+        return iterate()
+
+
+def test_sync_picks_up_words_saved_and_deleted_elsewhere():
+    ids = {word: PydanticObjectId() for word in ("glad", "gammal", "lycklig")}
+    saved = SimpleNamespace(id=ids["glad"], word="glad", synonym_keys=["munter", "lycklig"])
+    added = SimpleNamespace(id=ids["lycklig"], word="lycklig", synonym_keys=["glad"])
+    queries = []
+
+    def find(query=None):
+        queries.append(query)
+        return _Query([saved, added])
+
+    with patch.object(graph_module, "graph", SynonymGraph()), patch.object(
+        graph_module, "_synced_at", datetime.now(timezone.utc)
+    ), patch.object(graph_module, "_imports", 0), patch.object(
+        graph_module.revisions, "current", AsyncMock(return_value=0)
+    ), patch.object(graph_module, "Explanation") as model:
+        graph_module.graph.set_word("glad", ids["glad"], ["munter"])
+        graph_module.graph.set_word("gammal", ids["gammal"], ["åldrig"])
+        model.find.side_effect = find
+        asyncio.run(graph_module.sync_graph())
+
+        assert {r.word for r in graph_module.graph.related("glad", direction="out")} == {
+            "munter",
+            "lycklig",
+        }
+        assert graph_module.graph.related("åldrig", direction="in") == []
+        assert graph_module.graph.stored() == 2
+    assert {"updated_at", "_id"} == {key for clause in queries[0]["$or"] for key in clause}
@@ -0,0 +1,77 @@
+from server.services.synonym_service.ai import CreateSynonymSchema, SynonymNuance
+from server.services.synonym_service.json_repair import (
+    extract_json,
+    parse_model_output,
+    repair_json,
+)
+
+
+def test_parses_valid_json_unchanged():
+    text = '{"word": "glad", "synonyms": ["lycklig"], "explanation": "Nöjd."}'
+    result = parse_model_output(CreateSynonymSchema, text)
+    assert result.synonyms == ["lycklig"]
+
+
+def test_strips_code_fences_and_trailing_text():
+    text = 'Här är svaret:\n```json\n{"word": "glad", "synonyms": ["munter",], "explanation": "Nöjd."}\n```\nHoppas det hjälper!'
+    result = parse_model_output(CreateSynonymSchema, text)
+    assert result.synonyms == ["munter"]
+    assert result.explanation == "Nöjd."
+
+
+def test_converts_single_quotes():
+    text = "{'word': 'glad', 'synonyms': ['lycklig', 'munter'], 'explanation': 'Han sa \"hej\".'}"
+    result = parse_model_output(CreateSynonymSchema, text)
+    assert result.synonyms == ["lycklig", "munter"]
+    assert result.explanation == 'Han sa "hej".'
+
+
+def test_closes_truncated_arrays():
+    text = '{"word": "glad", "explanation": "Nöjd.", "synonyms": ["lycklig", "munter", "nö'
+    result = parse_model_output(CreateSynonymSchema, text)
+    assert result.synonyms[:2] == ["lycklig", "munter"]
+
+
+def test_drops_dangling_key():
+    repaired = repair_json('{"word": "glad", "synonyms": ["a"], "explan')
+    assert repaired == '{"word": "glad", "synonyms": ["a"]}'
+
+
+def test_fills_missing_fields_from_defaults():
+    text = '{"synonyms": ["lycklig"], "explanation": "Nöjd."'
+    result = parse_model_output(CreateSynonymSchema, text, defaults={"word": "glad"})
+    assert result.word == "glad"
+
+
+def test_recovers_fields_from_broken_document():
+    text = '"nuance_explanation": "Skiljer sig i ton", "usage_examples": ["a", "b"] trasig'
+    result = parse_model_output(
+        SynonymNuance,
+        text,
+        defaults={
+            "word1": "glad",
+            "word2": "lycklig",
+            "context_differences": "",
+            "formality_level": "equally_formal",
+            "emotional_weight": "equally_strong",
+        },
+    )
+    assert result.nuance_explanation == "Skiljer sig i ton"
+    assert result.usage_examples == ["a", "b"]
+
+
+def test_returns_none_when_nothing_is_recoverable():
+    assert parse_model_output(CreateSynonymSchema, "Jag vet inte.") is None
+    assert extract_json("inget json här") is None
+
+
+def test_keeps_commas_inside_strings():
+    repaired = repair_json('{"word": "glad", "synonyms": ["a, ]", "b",], "explanation": "x,}"}')
+    assert repaired == '{"word": "glad", "synonyms": ["a, ]", "b"], "explanation": "x,}"}'
+
+
+def test_invalid_escapes_fall_back_to_raw_text():
+    text = '{"word": "glad", "synonyms": ["lyck\\lig", "munter"], "explanation": "Nöjd \\q." trasig'
+    result = parse_model_output(CreateSynonymSchema, text)
+    assert result.synonyms == ["lyck\\lig", "munter"]
+    assert result.explanation == "Nöjd \\q."
@@ -0,0 +1,95 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from server.services.synonym_service import limiter as limiter_module
+from server.services.synonym_service.limiter import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    LimiterTimeoutError,
+    llm_slot,
+)
+
+
+def test_limit_grows_on_fast_calls_and_halves_on_overload():
+    limiter = AdaptiveLimiter(initial=2, minimum=1, maximum=10, latency_tolerance=2.0)
+    for _ in range(20):
+        limiter.acquire(timeout=1)
+        limiter.release(0.1, overloaded=False)
+    grown = limiter.limit
+    assert grown > 2
+
+    limiter.acquire(timeout=1)
+    limiter.release(None, overloaded=True)
+    assert limiter.limit == pytest.approx(max(1, grown * 0.5))
+
+
+def test_slow_calls_shrink_the_limit():
+    limiter = AdaptiveLimiter(initial=8, minimum=1, maximum=10, latency_tolerance=2.0)
+    limiter.acquire(timeout=1)
+    limiter.release(0.1, overloaded=False)
+    before = limiter.limit
+    limiter.acquire(timeout=1)
+    limiter.release(1.0, overloaded=False)
+    assert limiter.limit < before
+
+
+def test_acquire_times_out_when_saturated():
+    limiter = AdaptiveLimiter(initial=1, minimum=1, maximum=1, latency_tolerance=2.0)
+    limiter.acquire(timeout=1)
+    with pytest.raises(LimiterTimeoutError):
+        limiter.acquire(timeout=0.05)
+
+    released = threading.Timer(0.05, limiter.release, args=(0.1, False))
+    released.start()
+    limiter.acquire(timeout=1)
+    assert limiter.in_flight == 1
+
+
+def test_breaker_opens_fails_fast_and_recovers_through_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05, half_open_probes=1)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.on_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only one probe at a time
+
+    breaker.on_success()
+    assert breaker.state == "closed"
+
+
+def test_llm_slot_records_failures():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60, half_open_probes=1)
+    limiter = AdaptiveLimiter(initial=2, minimum=1, maximum=4, latency_tolerance=2.0)
+    with patch.object(limiter_module, "breaker", breaker), patch.object(
+        limiter_module, "limiter", limiter
+    ):
+        with pytest.raises(ConnectionError):
+            with llm_slot(lambda e: isinstance(e, ConnectionError)):
+                raise ConnectionError()
+        with pytest.raises(CircuitOpenError):
+            with llm_slot(lambda e: True):
+                pass
+    assert limiter.in_flight == 0
+
+
+def test_limit_grows_under_mixed_latency_traffic():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=32, latency_tolerance=2.0)
+    kinds = {"small:Draft": 1.5, "large:Synonym": 10.0, "large:NuanceBatch": 25.0}
+    for i in range(60):
+        for kind, latency in kinds.items():
+            limiter.acquire(timeout=1)
+            # Ordinary jitter, well within the tolerance
+            limiter.release(latency * (1 + (i % 3) / 10), overloaded=False, kind=kind)
+    assert limiter.limit > 10
+    assert limiter.stats()["min_latency"]["small:Draft"] == 1.5
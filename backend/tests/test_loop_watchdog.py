@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import time
+
+from server.services.loop_watchdog import LagHistogram, LoopWatchdog
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = LagHistogram(buckets=(0.01, 0.1))
+    for lag in (0.001, 0.05, 0.05, 2.0):
+        histogram.observe(lag)
+    stats = histogram.stats()
+    assert stats["buckets"] == {"0.01": 1, "0.1": 3, "+Inf": 4}
+    assert stats["count"] == 4
+    assert stats["max"] == 2.0
+
+
+def _blocking_handler():
+    time.sleep(0.4)
+
+
+def test_watchdog_logs_stack_of_blocking_call(caplog):
+    watchdog = LoopWatchdog(interval=0.02, threshold=0.1, log_interval=60)
+
+    async def main():
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        _blocking_handler()
+        await asyncio.sleep(0.05)
+        await watchdog.stop()
+
+    with caplog.at_level(logging.WARNING, logger="server.services.loop_watchdog"):
+        asyncio.run(main())
+
+    assert watchdog.stalls == 1
+    assert watchdog.histogram.max >= 0.3
+    assert any("_blocking_handler" in record.getMessage() for record in caplog.records)
+
+
+def test_repeated_stalls_are_rate_limited(caplog):
+    watchdog = LoopWatchdog(interval=0.02, threshold=0.05, log_interval=60)
+
+    async def main():
+        watchdog.start()
+        for _ in range(3):
+            await asyncio.sleep(0.05)
+            time.sleep(0.2)
+        await asyncio.sleep(0.05)
+        await watchdog.stop()
+
+    with caplog.at_level(logging.WARNING, logger="server.services.loop_watchdog"):
+        asyncio.run(main())
+
+    assert watchdog.stalls == 3
+    assert watchdog.suppressed == 2
+    assert len(caplog.records) == 1
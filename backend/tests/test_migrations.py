@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from server.services import migrations
+
+
+class FakeMigrations:
+    """Just enough of a Motor collection for run_once."""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def find_one_and_update(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc is None or doc["done"] or doc["started_at"] >= query["started_at"]["$lt"]:
+            return None
+        doc.update(update["$set"])
+        return doc
+
+    async def update_one(self, query, update):
+        self.docs[query["_id"]].update(update["$set"])
+
+    async def delete_one(self, query):
+        self.docs.pop(query["_id"], None)
+
+
+def test_only_the_first_worker_runs_a_migration():
+    db = SimpleNamespace(migrations=FakeMigrations())
+    calls = []
+
+    async def migration():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def workers():
+        return await asyncio.gather(
+            *(migrations.run_once(db, "backfill", migration) for _ in range(4))
+        )
+
+    assert sorted(asyncio.run(workers())) == [False, False, False, True]
+    assert calls == [1]
+    assert db.migrations.docs["backfill"]["done"] is True
+    assert asyncio.run(migrations.run_once(db, "backfill", migration)) is False
+
+
+def test_failed_or_abandoned_migration_runs_again():
+    db = SimpleNamespace(migrations=FakeMigrations())
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(migrations.run_once(db, "backfill", failing))
+    assert "backfill" not in db.migrations.docs
+
+    db.migrations.docs["backfill"] = {
+        "_id": "backfill",
+        "done": False,
+        "started_at": datetime.now() - migrations.CLAIM_TIMEOUT - timedelta(minutes=1),
+    }
+
+    async def noop():
+        pass
+
+    assert asyncio.run(migrations.run_once(db, "backfill", noop)) is True
+
+
+class FakeLeases:
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert):
+        doc = self.docs.get(query["_id"])
+        if doc is not None and doc["until"] >= query["until"]["$lt"]:
+            raise DuplicateKeyError("duplicate")
+        self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+
+
+def test_lease_is_held_until_it_runs_out():
+    db = SimpleNamespace(leases=FakeLeases())
+    assert asyncio.run(migrations.claim_lease(db, "sweep", 60)) is True
+    assert asyncio.run(migrations.claim_lease(db, "sweep", 60)) is False
+    assert asyncio.run(migrations.claim_lease(db, "other", 60)) is True
+
+    db.leases.docs["sweep"]["until"] = datetime.now() - timedelta(seconds=1)
+    assert asyncio.run(migrations.claim_lease(db, "sweep", 60)) is True
@@ -0,0 +1,158 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from pymongo.errors import DuplicateKeyError
+
+from server.services.lru import LRUCache
+from server.services.synonym_service import nuance
+
+
+def test_pair_key_ignores_order_and_case():
+    assert nuance.pair_key("Glad", "lycklig ") == nuance.pair_key("lycklig", "glad")
+    assert nuance.pair_key("glad", "lycklig") == "glad|lycklig"
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_concurrent_requests_share_one_analysis():
+    stored = SimpleNamespace(word1="glad", word2="lycklig")
+
+    async def slow_analysis(word1, word2):
+        await asyncio.sleep(0.01)
+        return stored
+
+    async def run():
+        return await asyncio.gather(
+            nuance.get_or_create_nuance("glad", "lycklig"),
+            nuance.get_or_create_nuance("Lycklig", "glad"),
+        )
+
+    with patch.object(nuance, "find_nuance", AsyncMock(return_value=None)), patch.object(
+        nuance, "_analyze_and_store", side_effect=slow_analysis
+    ) as analyze:
+        results = asyncio.run(run())
+
+    assert results == [stored, stored]
+    assert analyze.call_count == 1
+    assert not nuance._in_flight
+
+
+def test_matrix_pairs_skips_repeats_and_blanks():
+    pairs = nuance.matrix_pairs(["glad", "Glad", " lycklig", "", "munter"])
+    assert pairs == [("glad", "lycklig"), ("glad", "munter"), ("lycklig", "munter")]
+
+
+def test_matrix_packs_pairs_into_few_calls():
+    words = ["glad", "lycklig", "munter", "nöjd", "belåten", "förnöjd"]
+    pairs = nuance.matrix_pairs(words)
+    calls = []
+
+    async def batch(batch_pairs):
+        calls.append(batch_pairs)
+        # The model leaves out the last pair of every batch
+        return [SimpleNamespace(word1=a, word2=b) for a, b in batch_pairs[:-1]]
+
+    async def store(word1, word2, analysis):
+        return f"{word1}|{word2}"
+
+    async def single(word1, word2):
+        return f"single {word1}|{word2}"
+
+    async def run():
+        return [item async for item in nuance.analyze_matrix(pairs)]
+
+    with patch.object(nuance.settings, "NUANCE_BATCH_SIZE", 5), patch.object(
+        nuance, "analyze_nuance_batch", side_effect=batch
+    ), patch.object(nuance, "_store", side_effect=store), patch.object(
+        nuance, "_analyze_and_store", side_effect=single
+    ):
+        results = dict(asyncio.run(run()))
+
+    assert len(pairs) == 15
+    assert len(calls) == 3
+    assert len(results) == 15
+    assert results[calls[0][-1]].startswith("single")
+    assert not nuance._in_flight
+
+
+def test_failed_batch_fails_its_pairs():
+    pairs = [("glad", "lycklig"), ("glad", "munter")]
+
+    async def run():
+        return [item async for item in nuance.analyze_matrix(pairs)]
+
+    with patch.object(
+        nuance, "analyze_nuance_batch", AsyncMock(side_effect=RuntimeError("down"))
+    ):
+        results = asyncio.run(run())
+
+    assert [str(result) for _, result in results] == ["down", "down"]
+    assert not nuance._in_flight
+
+
+def test_request_for_a_queued_matrix_pair_waits_for_the_matrix():
+    pairs = [("a", "b"), ("a", "c")]
+
+    async def slow_batch(batch_pairs):
+        await asyncio.sleep(0.02)
+        return [SimpleNamespace(word1=x, word2=y) for x, y in batch_pairs]
+
+    async def store(word1, word2, analysis):
+        return f"{word1}|{word2}"
+
+    async def run():
+        matrix = [item async for item in nuance.analyze_matrix(pairs)]
+        return matrix
+
+    async def both():
+        matrix = asyncio.ensure_future(run())
+        await asyncio.sleep(0)
+        # ("a", "c") is still queued behind the semaphore at this point
+        single = await nuance.get_or_create_nuance("a", "c")
+        return await matrix, single
+
+    with patch.object(nuance.settings, "NUANCE_BATCH_SIZE", 1), patch.object(
+        nuance.settings, "NUANCE_MATRIX_CONCURRENCY", 1
+    ), patch.object(nuance, "find_nuance", AsyncMock(return_value=None)), patch.object(
+        nuance, "analyze_nuance_batch", side_effect=slow_batch
+    ), patch.object(nuance, "_store", side_effect=store), patch.object(
+        nuance, "_analyze_and_store", AsyncMock()
+    ) as single_call:
+        matrix, single = asyncio.run(both())
+
+    assert single == "a|c"
+    assert dict(matrix) == {("a", "b"): "a|b", ("a", "c"): "a|c"}
+    single_call.assert_not_called()
+    assert not nuance._in_flight
+
+
+def test_backfill_drops_the_loser_of_a_pair_key_race():
+    loser = SimpleNamespace(word1="Glad", word2="lycklig", pair_key=None)
+    loser.save = AsyncMock(side_effect=DuplicateKeyError("duplicate"))
+    loser.delete = AsyncMock()
+
+    class Query:
+        def __aiter__(self):
+            async def documents():
+                yield loser
+
+            return documents()
+
+    with patch.object(nuance, "SynonymNuance") as model:
+        model.find.return_value = Query()
+        model.find_one = AsyncMock(return_value=None)
+        asyncio.run(nuance.backfill_pair_keys())
+
+    loser.delete.assert_awaited_once()
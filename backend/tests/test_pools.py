@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+from server.services.synonym_service.pools import NamedPool
+
+
+def test_pool_tracks_active_and_completed_jobs():
+    named = NamedPool("test", 2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return 42
+
+    future = named.submit(blocking)
+    started.wait(5)
+    assert named.stats()["active"] == 1
+    assert named.stats()["saturation"] == 0.5
+
+    release.set()
+    assert future.result(5) == 42
+    stats = named.stats()
+    assert stats["active"] == 0
+    assert stats["completed"] == 1
+    assert stats["peak_active"] == 1
+
+
+def test_pool_runs_blocking_calls_from_async_code():
+    named = NamedPool("test", 1)
+
+    async def run():
+        return await asyncio.gather(named.run(sum, [1, 2]), named.run(max, 3, 4))
+
+    assert asyncio.run(run()) == [3, 4]
+    assert named.stats()["queued"] == 0
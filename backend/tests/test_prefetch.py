@@ -0,0 +1,41 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from server.services.synonym_service import prefetch
+
+
+def test_daily_budget_is_enforced():
+    with patch.object(prefetch.settings, "PREFETCH_DAILY_BUDGET", 2), patch.object(
+        prefetch, "_budget_day", None
+    ):
+        assert prefetch._take_budget()
+        assert prefetch._take_budget()
+        assert not prefetch._take_budget()
+
+
+def test_lookup_of_prefetched_word_counts_as_hit():
+    explanation = SimpleNamespace(word="Munter", entries=[])
+    prefetch._remember("munter")
+    hits = prefetch._stats["hits"]
+
+    asyncio.run(prefetch.record_lookup(explanation))
+    asyncio.run(prefetch.record_lookup(explanation))
+
+    assert prefetch._stats["hits"] == hits + 1
+
+
+def test_no_prefetch_while_llm_is_busy():
+    explanation = SimpleNamespace(
+        word="glad", entries=[SimpleNamespace(synonyms=["lycklig", "munter"])]
+    )
+    with patch.object(prefetch, "llm_utilization", return_value=0.9), patch.object(
+        prefetch, "_prefetch_word"
+    ) as prefetch_word:
+        asyncio.run(prefetch.prefetch_synonyms(explanation))
+    prefetch_word.assert_not_called()
+
+
+def test_only_first_generations_fan_out():
+    assert prefetch.prefetch_synonyms in prefetch.events._listeners["generated"]
+    assert prefetch.prefetch_synonyms not in prefetch.events._listeners["saved"]
@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from pymongo.errors import BulkWriteError
+
+from server.services.synonym_service import pregenerate
+from server.services.synonym_service.pregenerate import Checkpoint, Pregenerator, read_words
+
+
+class FakeCollection:
+    def __init__(self):
+        self.writes = []
+
+    async def bulk_write(self, requests, ordered):
+        self.writes.append(requests)
+
+    async def update_one(self, query, update, upsert):
+        self.writes.append([update])
+
+    def find(self, query, projection):
+        async def documents():
+            for word in query["word"]["$in"]:
+                yield {"_id": f"id-{word}"}
+
+        return documents()
+
+
+def test_read_words_takes_first_column_once():
+    lines = ["# svensk frekvenslista", "och 1000", "", "att\t900", "och 10", "glad"]
+    assert read_words(lines) == ["och", "att", "glad"]
+
+
+def test_run_stores_in_batches_and_checkpoints(tmp_path):
+    collection = FakeCollection()
+    checkpoint = Checkpoint(tmp_path / "words.checkpoint")
+    revisions = FakeCollection()
+    database = {"synonyms": collection, "revisions": revisions}
+    pregenerator = Pregenerator(database, checkpoint, concurrency=2, batch_size=2)
+
+    async def search(word):
+        return "Sökresultat:\n"
+
+    def generate(word, search_info):
+        if word == "trasig":
+            raise RuntimeError("LLM down")
+        return SimpleNamespace(synonyms=[word], explanation=f"Om {word}.")
+
+    with patch.object(pregenerate, "get_search_results_async", side_effect=search), patch.object(
+        pregenerate, "create_and_validate_synonym", side_effect=generate
+    ):
+        stats = asyncio.run(pregenerator.run(["glad", "trött", "trasig", "arg", "munter"]))
+
+    assert stats == {"generated": 4, "failed": 1}
+    assert sum(len(batch) for batch in collection.writes) == 4
+    assert all(len(batch) <= 2 for batch in collection.writes)
+    assert revisions.writes
+
+    resumed = Checkpoint(tmp_path / "words.checkpoint")
+    assert resumed.done == {"glad", "trött", "arg", "munter"}
+    assert resumed.failed == {"trasig"}
+
+
+def test_progress_reports_rate_and_eta():
+    text = pregenerate.progress({"generated": 9, "failed": 1}, total=40, elapsed=60)
+    assert "10/40" in text
+    assert "10.0 words/min" in text
+    assert "ETA 3.0 min" in text
+
+
+def test_failed_writes_are_left_out_of_the_checkpoint(tmp_path):
+    class FlakyCollection(FakeCollection):
+        async def bulk_write(self, requests, ordered):
+            self.writes.append(requests)
+            if len(self.writes) == 1:
+                raise ConnectionError("network down")
+            words = [request._filter["word"] for request in requests]
+            if "arg" in words:
+                raise BulkWriteError({"writeErrors": [{"index": words.index("arg")}]})
+
+    collection = FlakyCollection()
+    checkpoint = Checkpoint(tmp_path / "words.checkpoint")
+    database = {"synonyms": collection, "revisions": FakeCollection()}
+    pregenerator = Pregenerator(database, checkpoint, concurrency=1, batch_size=2)
+
+    async def search(word):
+        return ""
+
+    def generate(word, search_info):
+        return SimpleNamespace(synonyms=[word], explanation=f"Om {word}.")
+
+    with patch.object(pregenerate, "get_search_results_async", side_effect=search), patch.object(
+        pregenerate, "create_and_validate_synonym", side_effect=generate
+    ):
+        stats = asyncio.run(pregenerator.run(["glad", "trött", "arg", "munter", "lugn"]))
+
+    assert stats["generated"] == 5
+    assert stats["unsaved"] == 3
+    assert Checkpoint(tmp_path / "words.checkpoint").done == {"munter", "lugn"}
+
+
+def test_stored_words_are_marked_changed_in_the_snapshot(tmp_path, monkeypatch):
+    marked = []
+    monkeypatch.setattr(pregenerate.snapshot.settings, "SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(pregenerate.snapshot, "mark_ids_dirty", lambda ids: marked.extend(ids))
+    database = {"synonyms": FakeCollection(), "revisions": FakeCollection()}
+    checkpoint = Checkpoint(tmp_path / "words.checkpoint")
+    pregenerator = Pregenerator(database, checkpoint, concurrency=1, batch_size=2)
+
+    async def search(word):
+        return ""
+
+    def generate(word, search_info):
+        return SimpleNamespace(synonyms=[word], explanation=f"Om {word}.")
+
+    with patch.object(pregenerate, "get_search_results_async", side_effect=search), patch.object(
+        pregenerate, "create_and_validate_synonym", side_effect=generate
+    ):
+        asyncio.run(pregenerator.run(["glad", "trött", "arg"]))
+
+    assert sorted(marked) == ["id-arg", "id-glad", "id-trött"]
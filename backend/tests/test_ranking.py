@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+from server.services.synonym_service import ai
+from server.services.synonym_service.ai import CreateSynonymSchema, RankingEntry, RankingSchema
+from server.services.synonym_service.ranking import (
+    dedupe_candidates,
+    rank_candidates,
+    score_candidate,
+)
+
+SEARCH_INFO = "Sökresultat:\n- Synonymer till glad: lycklig, munter, nöjd, belåten.\n"
+
+
+def make(synonyms, explanation):
+    return CreateSynonymSchema(word="glad", synonyms=synonyms, explanation=explanation)
+
+
+def test_grounded_candidate_scores_higher():
+    grounded = make(
+        ["lycklig", "munter", "nöjd"],
+        "Att känna eller uttrycka glädje. Beskriver ett positivt sinnestillstånd.",
+    )
+    ungrounded = make(
+        ["sprallig", "yr", "uppspelt"],
+        "Att känna eller uttrycka glädje. Beskriver ett positivt sinnestillstånd.",
+    )
+    assert score_candidate(grounded, "glad", SEARCH_INFO) > score_candidate(
+        ungrounded, "glad", SEARCH_INFO
+    )
+
+
+def test_duplicates_and_echoing_the_word_are_penalised():
+    clean = make(["lycklig", "munter"], "Att känna glädje och vara på gott humör i stunden.")
+    padded = make(
+        ["lycklig", "lycklig", "glad", "munter"],
+        "Att känna glädje och vara på gott humör i stunden.",
+    )
+    assert score_candidate(clean, "glad", SEARCH_INFO) > score_candidate(
+        padded, "glad", SEARCH_INFO
+    )
+
+
+def test_rank_and_dedupe():
+    best = make(["lycklig", "munter", "nöjd"], "Att känna glädje och vara på gott humör.")
+    worse = make([], "Glad.")
+    candidates = dedupe_candidates([worse, best, make(["Munter", "nöjd", "lycklig"], best.explanation)])
+
+    ranked = rank_candidates(candidates, "glad", SEARCH_INFO)
+
+    assert len(candidates) == 2
+    assert ranked[0][1] is best
+
+
+def test_llm_ranking_outside_the_candidates_keeps_the_local_best():
+    candidates = [make(["lycklig"], "Bäst lokalt."), make(["munter"], "Tvåa.")]
+    for index in ("0", "3", "2"):
+        rankings = RankingSchema(rankings=[RankingEntry(index=index, rank=1, motivation="")])
+        with patch.object(ai, "chat_json", return_value=rankings):
+            best = ai.rank_with_llm("glad", candidates)
+        assert best is (candidates[1] if index == "2" else candidates[0])
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from server.models import ExplanationEntry
+from server.services.synonym_service import refresh, worker
+from server.services.synonym_service.refresh import in_off_peak_window, parse_windows
+
+
+def test_off_peak_windows_including_past_midnight():
+    windows = parse_windows("01:00-06:00, 22:30-00:30")
+
+    assert in_off_peak_window(datetime(2026, 1, 1, 3, 0), windows)
+    assert in_off_peak_window(datetime(2026, 1, 1, 23, 0), windows)
+    assert in_off_peak_window(datetime(2026, 1, 1, 0, 15), windows)
+    assert not in_off_peak_window(datetime(2026, 1, 1, 12, 0), windows)
+    assert not in_off_peak_window(datetime(2026, 1, 1, 6, 0), windows)
+
+
+def test_refreshes_outside_window_only_when_idle():
+    noon = datetime(2026, 1, 1, 12, 0)
+    with patch.object(refresh.settings, "REFRESH_WINDOWS", "01:00-06:00"):
+        with patch.object(refresh, "llm_utilization", return_value=0.9):
+            assert not refresh.should_refresh_now(noon)
+            assert refresh.should_refresh_now(datetime(2026, 1, 1, 2, 0))
+        with patch.object(refresh, "llm_utilization", return_value=0.0):
+            assert refresh.should_refresh_now(noon)
+
+
+def test_stale_filter_targets_old_prompt_versions():
+    query = refresh.stale_filter(datetime(2026, 1, 1))
+    assert refresh._latest_entry_differs("prompt_version", refresh.PROMPT_VERSION) in query["$or"]
+
+
+def test_untagged_legacy_entries_count_as_current():
+    condition = refresh._latest_entry_differs("prompt_version", 3)["$expr"]["$let"]
+    assert condition["vars"] == {"latest": {"$arrayElemAt": ["$entries", -1]}}
+    # A missing tag falls back to the current value, which never differs
+    assert condition["in"] == {"$ne": [{"$ifNull": ["$$latest.prompt_version", 3]}, 3]}
+    query = refresh.stale_filter(datetime(2026, 1, 1))
+    assert {"updated_at": None} not in query["$or"]
+
+
+def test_malformed_windows_do_not_end_the_scheduler():
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) > 2:
+            raise asyncio.CancelledError
+
+    with patch.object(refresh.settings, "REFRESH_WINDOWS", "01:00-oops"):
+        with patch.object(refresh.asyncio, "sleep", fake_sleep):
+            with pytest.raises(asyncio.CancelledError):
+                asyncio.run(refresh.run_refresh_scheduler())
+    assert len(sleeps) == 3
+
+
+def test_refresh_replaces_the_latest_entry():
+    older = ExplanationEntry(explanation="Äldst.", synonyms=["glad"])
+    latest = ExplanationEntry(explanation="Gammal.", synonyms=["munter"])
+    explanation = SimpleNamespace(id="glad-id", word="glad", entries=[older, latest])
+    result = SimpleNamespace(synonyms=["lycklig"], explanation="Ny.")
+    cpu = SimpleNamespace(run=AsyncMock(return_value=result))
+
+    with patch.object(worker, "Explanation") as model, patch.object(
+        worker, "get_search_results_async", AsyncMock(return_value="")
+    ), patch.object(worker, "pool", return_value=cpu), patch.object(
+        worker.events, "publish", AsyncMock()
+    ) as publish, patch.object(worker.ConnectionManager, "send_message", AsyncMock()), patch.object(
+        worker, "_last_processed", {}
+    ):
+        model.get = AsyncMock(return_value=explanation)
+        update = model.find_one.return_value.update = AsyncMock()
+        asyncio.run(worker.process_explanation("glad-id", True, True))
+
+    (changes,), _ = update.call_args
+    assert "$push" not in changes
+    assert changes["$set"]["entries.1"]["explanation"] == "Ny."
+    assert [e.explanation for e in explanation.entries] == ["Äldst.", "Ny."]
+    # A refresh is no first generation, so it doesn't trigger prefetching
+    assert [call.args[0] for call in publish.await_args_list] == ["saved"]
@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from beanie import PydanticObjectId
+
+from server.models import Explanation, ExplanationEntry
+from server.routes import explanations
+from server.services import events, response_cache
+
+
+def _request(if_none_match=None):
+    headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return SimpleNamespace(headers=headers)
+
+
+def test_respond_sends_strong_etag_and_304_on_match():
+    response_cache.clear()
+    cached = response_cache.prepare(b'{"word": "glad"}')
+    assert cached.etag == response_cache.etag_for(b'{"word": "glad"}')
+    assert not cached.etag.startswith("W/")
+
+    full = response_cache.respond(_request(), cached)
+    assert full.status_code == 200
+    assert full.body == b'{"word": "glad"}'
+    assert full.headers["etag"] == cached.etag
+
+    for header in (cached.etag, f'"other", W/{cached.etag}', "*"):
+        not_modified = response_cache.respond(_request(header), cached)
+        assert not_modified.status_code == 304
+        assert not_modified.body == b""
+    assert response_cache.respond(_request('"other"'), cached).status_code == 200
+
+
+def test_local_changes_move_the_revision_at_once():
+    explanation_id = PydanticObjectId()
+    item, page = response_cache.item_key(explanation_id), response_cache.list_key(0, 10, "")
+    with patch.object(response_cache.revisions, "bump", AsyncMock()) as bump:
+        for event in ("created", "saved", "deleted"):
+            asyncio.run(events.publish(event, SimpleNamespace(id=PydanticObjectId())))
+    assert bump.await_count == 3
+    assert response_cache.item_key(explanation_id) != item
+    assert response_cache.list_key(0, 10, "") != page
+
+
+def test_other_workers_changes_arrive_with_the_shared_revision():
+    page = response_cache.list_key(0, 10, "")
+    shared = response_cache.revision()[0]
+    with patch.object(response_cache.revisions, "current", AsyncMock(return_value=shared + 1)):
+        asyncio.run(response_cache.sync_revision())
+    assert response_cache.list_key(0, 10, "") != page
+
+
+def test_cached_reads_skip_mongo_and_leave_out_volatile_fields():
+    response_cache.clear()
+    explanation_id = PydanticObjectId()
+    pending = Explanation.model_construct(
+        id=explanation_id, word="glad", entries=[], lookup_count=3, refresh_claimed_until=None
+    )
+    ready = pending.model_copy(update={"entries": [ExplanationEntry(explanation="", synonyms=[])]})
+
+    def read(document):
+        with patch.object(explanations.snapshot, "enabled", return_value=False), patch.object(
+            explanations.Explanation, "get", AsyncMock(return_value=document)
+        ) as get:
+            response = asyncio.run(explanations.get_synonym(explanation_id, _request()))
+        return response, get.await_count
+
+    response, reads = read(pending)
+    assert reads == 1 and response_cache.lookup(response_cache.item_key(explanation_id)) is None
+    response, reads = read(ready)
+    assert b"lookup_count" not in response.body
+    assert b"refresh_claimed_until" not in response.body
+    cached, reads = read(ready)
+    assert reads == 0
+    assert cached.body == response.body
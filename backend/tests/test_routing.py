@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+from server.services.synonym_service import ai
+from server.services.synonym_service.ai import CreateSynonymSchema, validate_or_escalate
+from server.services.synonym_service.routing import model_for_tier
+
+CANDIDATE = CreateSynonymSchema(
+    word="glad", synonyms=["lycklig", "munter"], explanation="Att känna glädje."
+)
+
+
+def test_small_tier_falls_back_to_main_model_when_cascade_is_off():
+    with patch.object(ai.settings, "OPENAI_SMALL_MODEL", ""):
+        assert model_for_tier("small") == ai.settings.OPENAI_MODEL
+    with patch.object(ai.settings, "OPENAI_SMALL_MODEL", "gemma2:2b"):
+        assert model_for_tier("small") == "gemma2:2b"
+        assert model_for_tier("large") == ai.settings.OPENAI_MODEL
+
+
+def test_accepts_small_answer_when_review_agrees():
+    with patch.object(ai.settings, "OPENAI_SMALL_MODEL", "gemma2:2b"), patch.object(
+        ai, "create_synonym_ai", return_value=CANDIDATE
+    ) as create:
+        assert validate_or_escalate("glad", CANDIDATE, 0.9, "") is CANDIDATE
+        assert create.call_count == 1
+        assert create.call_args.kwargs["tier"] == "small"
+
+
+def test_low_score_escalates_to_large_model():
+    improved = CreateSynonymSchema(word="glad", synonyms=["nöjd"], explanation="Bättre.")
+    with patch.object(ai.settings, "OPENAI_SMALL_MODEL", "gemma2:2b"), patch.object(
+        ai, "create_synonym_ai", return_value=improved
+    ) as create:
+        assert validate_or_escalate("glad", CANDIDATE, 0.1, "") is improved
+        assert create.call_count == 1
+        assert create.call_args.kwargs["tier"] == "large"
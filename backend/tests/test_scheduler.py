@@ -0,0 +1,79 @@
+import asyncio
+
+from server.services.synonym_service.scheduler import PriorityScheduler
+
+
+def run_jobs(scheduler: PriorityScheduler, jobs):
+    """Submit (priority, name) jobs while the scheduler is busy and return run order."""
+    order = []
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+
+        async def job(name):
+            order.append(name)
+            await asyncio.sleep(0)
+
+        for _ in range(scheduler.concurrency):
+            scheduler.submit("interactive", blocker)
+        for priority, name in jobs:
+            scheduler.submit(priority, job, name)
+        gate.set()
+        while scheduler.in_flight() or scheduler.pending():
+            await asyncio.sleep(0.001)
+
+    asyncio.run(main())
+    return order
+
+
+def test_interactive_jobs_overtake_queued_background_work():
+    scheduler = PriorityScheduler(
+        concurrency=1,
+        weights={"interactive": 8, "retry": 1, "prefetch": 1, "refresh": 1},
+        limits={},
+    )
+    jobs = [("retry", f"r{i}") for i in range(4)] + [("interactive", "i0"), ("interactive", "i1")]
+
+    order = run_jobs(scheduler, jobs)
+
+    assert order.index("i0") < 2 and order.index("i1") < 3
+    assert sorted(order) == sorted(name for _, name in jobs)
+
+
+def test_weighted_share_does_not_starve_low_priority():
+    scheduler = PriorityScheduler(
+        concurrency=1,
+        weights={"interactive": 3, "retry": 1, "prefetch": 1, "refresh": 1},
+        limits={},
+    )
+    jobs = [("interactive", f"i{i}") for i in range(9)] + [("refresh", f"f{i}") for i in range(3)]
+
+    order = run_jobs(scheduler, jobs)
+
+    # Refresh work gets roughly one slot in four rather than waiting for all interactive jobs
+    assert order.index("f0") < 5
+
+
+def test_class_limit_caps_concurrency():
+    scheduler = PriorityScheduler(concurrency=4, weights={}, limits={"prefetch": 1})
+    peak = 0
+
+    async def main():
+        nonlocal peak
+
+        async def job():
+            nonlocal peak
+            peak = max(peak, scheduler.running["prefetch"])
+            await asyncio.sleep(0.005)
+
+        for _ in range(5):
+            scheduler.submit("prefetch", job)
+        while scheduler.in_flight() or scheduler.pending():
+            await asyncio.sleep(0.001)
+
+    asyncio.run(main())
+    assert peak == 1
+    assert scheduler.completed["prefetch"] == 5
@@ -0,0 +1,73 @@
+import asyncio
+from unittest.mock import patch
+
+from server.services.bing_search import extract_results
+from server.services.synonym_service import search
+
+BING_PAGE = """
+<html><body><ol id="b_results">
+<li class="b_algo" data-id=""><h2><a href="https://sv.wiktionary.org/wiki/glad?a=1&amp;b=2">glad &ndash; Wiktionary</a></h2>
+<div class="b_caption"><p>Adjektiv. <strong>glad</strong> betyder  lycklig, munter.</p></div></li>
+<li class="b_ad"><p>Annons</p></li>
+<li class="b_algo"><h2><a href="https://www.synonymer.se/sv-syn/glad">Synonymer till glad</a></h2>
+<div class="b_caption"><p>nöjd, belåten, förnöjd</p></div></li>
+</ol></body></html>
+"""
+
+
+def test_extracts_bing_results():
+    results = extract_results(BING_PAGE, max_results=5)
+
+    assert [r["title"] for r in results] == ["glad – Wiktionary", "Synonymer till glad"]
+    assert results[0]["href"] == "https://sv.wiktionary.org/wiki/glad?a=1&b=2"
+    assert results[0]["body"] == "Adjektiv. glad betyder lycklig, munter."
+    assert len(extract_results(BING_PAGE, max_results=1)) == 1
+
+
+def _provider(name, delay, results):
+    async def fake_search(query, max_results):
+        await asyncio.sleep(delay)
+        return results
+
+    return search.Provider(name, fake_search)
+
+
+def test_fast_primary_is_not_hedged():
+    primary = _provider("primary", 0, [{"body": "a"}])
+    secondary = _provider("secondary", 0, [{"body": "b"}])
+
+    with patch.object(search.settings, "SEARCH_HEDGE_DEFAULT_SECONDS", 1):
+        results = asyncio.run(search.hedged_search("glad", providers=[primary, secondary]))
+
+    assert results == [{"body": "a"}]
+    assert secondary.counts["calls"] == 0
+
+
+def test_slow_primary_is_hedged():
+    primary = _provider("primary", 1, [{"body": "a"}])
+    secondary = _provider("secondary", 0, [{"body": "b"}])
+
+    with patch.object(search.settings, "SEARCH_HEDGE_DEFAULT_SECONDS", 0.01):
+        results = asyncio.run(search.hedged_search("glad", providers=[primary, secondary]))
+
+    assert results == [{"body": "b"}]
+    assert secondary.counts["hedges"] == 1
+    assert secondary.counts["wins"] == 1
+
+
+def test_empty_primary_hands_over():
+    primary = _provider("primary", 0, [])
+    secondary = _provider("secondary", 0, [{"body": "b"}])
+
+    with patch.object(search.settings, "SEARCH_HEDGE_DEFAULT_SECONDS", 1):
+        results = asyncio.run(search.hedged_search("glad", providers=[primary, secondary]))
+
+    assert results == [{"body": "b"}]
+    assert primary.counts["empty"] == 1
+
+
+def test_hedge_delay_uses_observed_latency():
+    provider = _provider("primary", 0, [])
+    provider.latencies.extend([0.1] * 9 + [5.0])
+
+    assert provider.hedge_delay() == 0.1
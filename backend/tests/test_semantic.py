@@ -0,0 +1,123 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+from beanie import PydanticObjectId
+
+from server.services.synonym_service import semantic
+from server.services.synonym_service.semantic import VectorIndex
+
+
+def test_search_returns_nearest_by_cosine():
+    index = VectorIndex()
+    index.upsert_many(["trött", "glad", "sömnig"], np.array([[1, 0, 0], [0, 1, 0], [0.9, 0, 0.1]]))
+
+    results = index.search(np.array([2, 0, 0]), k=2)
+
+    assert [key for key, _ in results] == ["trött", "sömnig"]
+    assert results[0][1] == 1.0
+
+
+def test_upsert_replaces_and_remove_keeps_rows_contiguous():
+    index = VectorIndex()
+    index.upsert_many(["a", "b", "c"], np.eye(3))
+    index.upsert("a", np.array([0, 0, 1]))
+    index.remove("b")
+
+    assert len(index) == 2
+    assert "b" not in index
+    assert {key for key, _ in index.search(np.array([0, 0, 1]), k=2)} == {"a", "c"}
+    assert index.search(np.array([0, 1, 0]), k=1)[0][1] == 0.0
+
+
+def test_index_grows_past_initial_capacity():
+    index = VectorIndex()
+    vectors = np.random.default_rng(0).normal(size=(3000, 8))
+    for start in range(0, 3000, 1000):
+        index.upsert_many(list(range(start, start + 1000)), vectors[start : start + 1000])
+
+    assert len(index) == 3000
+    assert index.search(vectors[2500], k=1)[0][0] == 2500
+
+
+def test_batched_search_is_fast_for_100k_vectors():
+    rng = np.random.default_rng(0)
+    index = VectorIndex()
+    index.upsert_many(list(range(100_000)), rng.normal(size=(100_000, 384)))
+
+    start = time.perf_counter()
+    results = index.search_many(rng.normal(size=(4, 384)), k=10)
+    elapsed = time.perf_counter() - start
+
+    assert [len(r) for r in results] == [10, 10, 10, 10]
+    assert elapsed < 0.5
+
+
+def test_load_index_picks_up_embeddings_stored_by_other_workers():
+    now = datetime(2026, 1, 1, 12, 0)
+    documents = []
+
+    def stored(key, vector, at):
+        vector = np.asarray(vector, dtype=np.float16)
+        return SimpleNamespace(
+            explanation_id=key, vector=vector.tobytes(), dtype="float16", updated_at=at
+        )
+
+    class Query:
+        def __init__(self, query):
+            since = query.get("updated_at", {}).get("$gte", datetime.min)
+            self.documents = [d for d in documents if d.updated_at >= since]
+
+        def __aiter__(self):
+            async def iterate():
+                for document in self.documents:
+                    yield document
+
+            return iterate()
+
+    documents.append(stored("glad", [1, 0], now))
+    with patch.object(semantic, "index", VectorIndex()), patch.object(
+        semantic, "_synced_until", None
+    ), patch.object(semantic, "ExplanationEmbedding") as model:
+        model.find.side_effect = Query
+        assert asyncio.run(semantic.load_index()) == 1
+
+        documents.append(stored("trött", [0, 1], now + timedelta(seconds=5)))
+        asyncio.run(semantic.load_index())
+        assert model.find.call_args.args[0]["updated_at"] == {"$gte": now}
+        assert "trött" in semantic.index
+        assert len(semantic.index) == 2
+
+
+def test_backfill_embeds_only_explanations_missing_from_the_index():
+    embedded, missing = PydanticObjectId(), PydanticObjectId()
+    stored = []
+
+    class Query:
+        def project(self, projection):
+            return self
+
+        def __aiter__(self):
+            async def iterate():
+                for key in (embedded, missing):
+                    yield SimpleNamespace(id=key)
+
+            return iterate()
+
+    async def store(explanations):
+        stored.extend(explanations)
+
+    index = VectorIndex()
+    index.upsert_many([embedded], np.array([[1.0, 0.0]]))
+    with patch.object(semantic, "index", index), patch.object(
+        semantic, "Explanation"
+    ) as model, patch.object(semantic, "_store", side_effect=store), patch.object(
+        semantic, "In", lambda field, ids: ids
+    ):
+        model.find.side_effect = [Query(), SimpleNamespace(to_list=AsyncMock(return_value=["doc"]))]
+        assert asyncio.run(semantic.backfill_embeddings()) == 1
+    assert model.find.call_args.args[0] == [missing]
+    assert stored == ["doc"]
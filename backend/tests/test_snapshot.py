@@ -0,0 +1,98 @@
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from beanie import PydanticObjectId
+
+from server.services.synonym_service import snapshot
+from server.services.synonym_service.snapshot import Snapshot, write_snapshot
+
+
+def _rows(words):
+    rows = []
+    for word in words:
+        object_id = PydanticObjectId()
+        document = json.dumps({"_id": str(object_id), "word": word, "entries": []})
+        rows.append((object_id.binary, word, document.encode()))
+    return rows
+
+
+def test_snapshot_lookups_by_id_and_word(tmp_path):
+    rows = _rows(["glad", "trött", "ärlig", "arg"])
+    path = tmp_path / "explanations.snap"
+    assert write_snapshot(path, reversed(rows), created_at=123.0) == 4
+
+    mapped = Snapshot(path)
+    assert mapped.count == 4
+    assert mapped.created_at == 123.0
+    for object_id, word, document in rows:
+        assert mapped.get(object_id) == document
+        assert mapped.get_by_word(word) == document
+    assert mapped.get(PydanticObjectId().binary) is None
+    assert mapped.get_by_word("gla") is None
+    # Pages are in id order, which is insertion order
+    assert [json.loads(d)["word"] for d in mapped.page(1, 2)] == ["trött", "ärlig"]
+    mapped.close()
+
+
+def test_changed_entries_fall_back_to_mongo(tmp_path):
+    rows = _rows(["glad", "trött"])
+    path = tmp_path / "explanations.snap"
+    write_snapshot(path, rows, created_at=time.time() - 10)
+    glad_id = PydanticObjectId(rows[0][0])
+
+    with patch.object(snapshot.settings, "SNAPSHOT_ENABLED", True), patch.object(
+        snapshot.settings, "SNAPSHOT_PATH", path
+    ), patch.object(snapshot, "_current", None), patch.object(snapshot, "_dirty", {}), patch.object(
+        snapshot, "_dirty_log_positions", {}
+    ):
+        snapshot._load()
+        assert snapshot.read_explanation(glad_id) == rows[0][2]
+        assert snapshot.read_page(0, 10) is not None
+
+        # Another worker records a change in the shared log
+        snapshot._mark_dirty(SimpleNamespace(id=glad_id))
+        snapshot._dirty.clear()
+
+        assert snapshot.read_explanation(glad_id) is None
+        assert snapshot.read_explanation(PydanticObjectId(rows[1][0])) == rows[1][2]
+        assert snapshot.read_page(0, 10) is None
+        snapshot._current.close()
+
+
+def test_changes_survive_change_log_rotation(tmp_path):
+    rows = _rows(["glad", "trött", "arg"])
+    path = tmp_path / "explanations.snap"
+    write_snapshot(path, rows, created_at=time.time() - 10)
+    ids = [PydanticObjectId(row[0]) for row in rows]
+
+    def other_worker_marks(explanation_id):
+        snapshot._mark_dirty(SimpleNamespace(id=explanation_id))
+        snapshot._dirty.pop(str(explanation_id))
+
+    with patch.object(snapshot.settings, "SNAPSHOT_ENABLED", True), patch.object(
+        snapshot.settings, "SNAPSHOT_PATH", path
+    ), patch.object(snapshot, "_current", None), patch.object(snapshot, "_dirty", {}), patch.object(
+        snapshot, "_dirty_log_positions", {}
+    ):
+        snapshot._rotate_dirty_log()
+        snapshot._load()
+        other_worker_marks(ids[0])
+        assert snapshot.read_explanation(ids[0]) is None
+
+        # A writer that looked up the generation just before the rotation
+        stale_log = snapshot._dirty_log_path(snapshot._dirty_log_generations()[-1])
+        snapshot._rotate_dirty_log()
+        with open(stale_log, "a") as f:
+            f.write(f"{time.time()} {ids[1]}\n")
+        # A change logged to the new generation, same size as the old log's first line
+        other_worker_marks(ids[2])
+
+        assert snapshot.read_explanation(ids[1]) is None
+        assert snapshot.read_explanation(ids[2]) is None
+
+        # Only the two newest generations are kept
+        snapshot._rotate_dirty_log()
+        assert len(snapshot._dirty_log_generations()) == 2
+        snapshot._current.close()
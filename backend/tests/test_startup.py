@@ -0,0 +1,42 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Generous enough for a cold CI box; the eager imports used to cost ~1.7s alone
+IMPORT_BUDGET_SECONDS = 1.5
+
+# Only needed once a request actually reaches the LLM or a search provider
+LAZY_MODULES = ("openai", "duckduckgo_search", "requests", "httpx")
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time in seconds per top-level module, via `-X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            times[match.group(3)] = int(match.group(1)) / 1_000_000
+    return times
+
+
+def test_server_import_skips_heavy_clients():
+    times = import_times("server.server")
+    assert [name for name in LAZY_MODULES if name in times] == []
+
+
+def test_server_import_stays_within_budget():
+    # Best of three keeps a noisy neighbour from failing the test
+    best = min(import_times("server.server")["server.server"] for _ in range(3))
+    assert best < IMPORT_BUDGET_SECONDS, f"importing server.server took {best:.2f}s"
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from server.services.synonym_service import worker
+from server.services.synonym_service.ai import CreateSynonymSchema
+from server.services.synonym_service.streaming import (
+    GenerationCancelled,
+    collect_stream,
+    partial_parser,
+)
+
+
+def _chunk(index, text):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(index=index, delta=SimpleNamespace(content=text))]
+    )
+
+
+def test_collect_stream_joins_deltas_per_choice():
+    seen = []
+    response = [_chunk(0, '{"word": '), _chunk(1, "{}"), _chunk(0, '"glad"}'), _chunk(0, None)]
+
+    contents = collect_stream(response, seen.append)
+
+    assert contents == ['{"word": "glad"}', "{}"]
+    assert seen == ['{"word": ', '{"word": "glad"}']
+
+
+def test_partial_parser_reports_fields_from_unfinished_json():
+    partials = []
+    feed = partial_parser(CreateSynonymSchema, partials.append, interval=0)
+
+    feed('{"word": "glad", "synonyms": ["lycklig", "mun')
+    feed('{"word": "glad", "synonyms": ["lycklig", "munter"], "explanation": "Att kän')
+
+    assert partials[0]["synonyms"] == ["lycklig"]
+    assert partials[1]["synonyms"] == ["lycklig", "munter"]
+    assert partials[1]["explanation"] == "Att kän"
+
+
+def test_partial_parser_is_throttled():
+    partials = []
+    feed = partial_parser(CreateSynonymSchema, partials.append, interval=60)
+
+    feed('{"word": "glad", "explanation": "A')
+    feed('{"word": "glad", "explanation": "Att')
+
+    assert len(partials) == 1
+
+
+def test_cancelled_stream_is_closed_early():
+    cancelled = threading.Event()
+    seen = []
+
+    class Response:
+        closed = False
+
+        def __iter__(self):
+            yield _chunk(0, '{"word": ')
+            cancelled.set()
+            yield _chunk(0, '"glad"}')
+
+        def close(self):
+            self.closed = True
+
+    response = Response()
+    with pytest.raises(GenerationCancelled):
+        collect_stream(response, seen.append, cancelled)
+    assert response.closed
+    assert seen == ['{"word": ']
+
+
+def test_partial_sender_stops_once_cancelled():
+    cancelled = threading.Event()
+
+    async def run():
+        send = worker._partial_sender("glad-id", "glad", cancelled)
+        send({"synonyms": ["munter"]})
+        cancelled.set()
+        send({"synonyms": ["munter", "lycklig"]})
+        await asyncio.sleep(0.01)
+
+    with patch.object(worker.settings, "STREAM_PARTIALS_ENABLED", True), patch.object(
+        worker.ConnectionManager, "send_message", AsyncMock()
+    ) as send_message:
+        asyncio.run(run())
+    assert send_message.await_count == 1
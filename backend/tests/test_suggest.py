@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+from beanie import PydanticObjectId
+
+from server.services.synonym_service import suggest
+from server.services.synonym_service.suggest import PrefixIndex, Suggestion
+
+
+def _suggestion(word, lookups=0):
+    return Suggestion(id=PydanticObjectId(), word=word, lookup_count=lookups)
+
+
+def _words(results):
+    return [s.word for s in results]
+
+
+def test_suggest_ranks_prefix_matches_by_popularity():
+    index = PrefixIndex(max_limit=10)
+    index.build(
+        [
+            _suggestion("glad", 5),
+            _suggestion("Glädje", 9),
+            _suggestion("glans", 1),
+            _suggestion("gla", 0),
+            _suggestion("trött", 50),
+        ]
+    )
+
+    assert _words(index.suggest("GLA", 10)) == ["glad", "glans", "gla"]
+    assert _words(index.suggest("gl", 2)) == ["Glädje", "glad"]
+    assert index.suggest("x", 10) == []
+
+
+def test_changes_invalidate_cached_prefixes():
+    index = PrefixIndex(max_limit=10)
+    glad = _suggestion("glad", 1)
+    glans = _suggestion("glans", 1)
+    index.build([glad, glans])
+    assert _words(index.suggest("gla", 10)) == ["glad", "glans"]
+
+    index.bump(glans.id)
+    assert _words(index.suggest("gla", 10)) == ["glans", "glad"]
+
+    index.add(_suggestion("glass", 10))
+    assert _words(index.suggest("gla", 1)) == ["glass"]
+
+    index.remove(glans.id)
+    assert _words(index.suggest("gla", 10)) == ["glass", "glad"]
+    assert len(index) == 2
+
+
+class _Query:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def project(self, projection):
+        return self
+
+    async def count(self):
+        return len(self.documents)
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+
+        return iterate()
+
+
+def test_sync_picks_up_words_created_and_deleted_elsewhere():
+    kept, deleted, created = _suggestion("glad"), _suggestion("gammal"), _suggestion("glans")
+    stored = [kept, created]
+    queries = []
+
+    def find(query=None):
+        queries.append(query)
+        if query:
+            return _Query([created])
+        return _Query(stored)
+
+    with patch.object(suggest, "index", PrefixIndex(max_limit=10)), patch.object(
+        suggest, "_synced_at", datetime.now(timezone.utc)
+    ), patch.object(suggest, "_imports", 0), patch.object(
+        suggest.revisions, "current", AsyncMock(return_value=0)
+    ), patch.object(suggest, "Explanation") as model:
+        suggest.index.build([kept, deleted])
+        model.find.side_effect = find
+        asyncio.run(suggest.sync_index())
+
+        assert sorted(_words(suggest.index.suggest("g", 10))) == ["glad", "glans"]
+    assert "$gte" in queries[0]["_id"]
+
+
+def test_sync_rebuilds_after_an_import():
+    # Imported words keep their old ids, so no incremental query finds them
+    imported = _suggestion("gammal")
+    imported.id = PydanticObjectId("5f0000000000000000000000")
+
+    with patch.object(suggest, "index", PrefixIndex(max_limit=10)), patch.object(
+        suggest, "_synced_at", datetime.now(timezone.utc)
+    ), patch.object(suggest, "_imports", 0), patch.object(
+        suggest.revisions, "current", AsyncMock(return_value=1)
+    ), patch.object(suggest, "Explanation") as model:
+        model.find.return_value = _Query([imported])
+        asyncio.run(suggest.sync_index())
+
+        assert _words(suggest.index.suggest("g", 10)) == ["gammal"]
+        assert suggest._imports == 1
+    model.find.assert_called_once_with()
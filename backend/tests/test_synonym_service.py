@@ -13,11 +13,12 @@ from server.services.synonym_service.ai import (
 
 @pytest.fixture
 def mock_ddgs():
-    with patch("server.services.synonym_service.ai.DDGS") as mock:
+    # Search threads keep their session, so patch the session lookup itself
+    with patch("server.services.synonym_service.ai._ddgs_session") as mock:
         ddgs_instance = MagicMock()
         # Make sure text method returns iterator
         ddgs_instance.text = MagicMock(return_value=iter([]))
-        mock.return_value.__enter__.return_value = ddgs_instance
+        mock.return_value = ddgs_instance
         yield ddgs_instance
 
 
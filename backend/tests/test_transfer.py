@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+
+from server.services import transfer
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class FakeCollection:
+    def __init__(self, documents=None):
+        self.documents = list(documents or [])
+        self.written = []
+
+    def find(self, query, batch_size):
+        return FakeCursor(self.documents)
+
+    async def insert_many(self, documents, ordered):
+        assert not ordered
+        self.written.append(list(documents))
+        return type("Result", (), {"inserted_ids": [d["_id"] for d in documents]})()
+
+    async def update_one(self, query, update, upsert):
+        self.written.append((query, update))
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+async def _chunked(data, size):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def test_export_import_round_trip_through_gzip(monkeypatch):
+    monkeypatch.setattr(transfer.settings, "TRANSFER_BATCH_SIZE", 2)
+    explanations = [
+        {"_id": ObjectId(), "word": f"ord{i}", "entries": [], "created_at": datetime(2024, 1, i + 1)}
+        for i in range(5)
+    ]
+    nuances = [{"_id": ObjectId(), "word1": "glad", "word2": "lycklig"}]
+    source = FakeDatabase(synonyms=FakeCollection(explanations), nuances=FakeCollection(nuances))
+
+    exported = b"".join(
+        asyncio.run(_collect(transfer.gzip_chunks(transfer.export_lines(source))))
+    )
+    assert exported[:2] == transfer.GZIP_MAGIC
+
+    target = FakeDatabase()
+    lines = transfer.iter_lines(_chunked(exported, 7))
+    stats = asyncio.run(transfer.import_lines(target, lines, mode="insert"))
+
+    assert stats == {"inserted": 6}
+    assert [len(batch) for batch in target["synonyms"].written] == [2, 2, 1]
+    imported = [d for batch in target["synonyms"].written for d in batch]
+    assert imported == explanations
+    assert target["nuances"].written == [nuances]
+    assert [query["_id"] for query, _ in target["revisions"].written] == ["explanations", "imports"]
+
+
+def test_import_skips_unreadable_lines():
+    async def lines():
+        yield b'{"kind": "unknown", "doc": {}}'
+        yield b"not json"
+
+    stats = asyncio.run(transfer.import_lines(FakeDatabase(), lines()))
+    assert stats == {"invalid": 2}
+
+
+def test_iter_lines_handles_plain_text_split_mid_line():
+    data = b'{"a": 1}\n{"b": 2}\n\n{"c": 3}'
+    lines = asyncio.run(_collect(transfer.iter_lines(_chunked(data, 3))))
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+def test_imported_explanations_are_marked_changed_in_the_snapshot(monkeypatch):
+    explanations = [{"_id": ObjectId(), "word": f"ord{i}", "entries": []} for i in range(3)]
+    source = FakeDatabase(synonyms=FakeCollection(explanations))
+    marked = []
+    monkeypatch.setattr(transfer.snapshot, "mark_ids_dirty", lambda ids: marked.extend(ids))
+
+    async def lines():
+        async for line in transfer.export_lines(source, ["explanations", "nuances"]):
+            yield line
+
+    asyncio.run(transfer.import_lines(FakeDatabase(), lines(), mode="insert"))
+    assert marked == [d["_id"] for d in explanations]
@@ -2,6 +2,7 @@ import { useEffect, useRef, useCallback } from 'react';
 import { useAuthCheck } from '@/api/auth';
 import { queryClient } from '@/main';
 import { getExplanationsQueryOptions, getExplanationQueryOptions } from '@/api/queries';
+import type { Explanation } from '@/types/models';
 import { useRouter } from '@tanstack/react-router';
 import { toast } from 'react-hot-toast';
 
@@ -11,6 +12,10 @@ export function useWebSocket() {
   const reconnectTimeout = useRef<NodeJS.Timeout>();
   const maxReconnectDelay = 5000; // Maximum reconnect delay in ms
   const socketRef = useRef<WebSocket | null>(null);
+  // Explanations currently showing a provisional entry that later messages may replace
+  const provisionalIds = useRef(new Set<string>());
+  // Explanations whose grounded entry is ready; late provisional messages are dropped
+  const readyIds = useRef(new Set<string>());
   
   const connect = useCallback(() => {
     if (socketRef.current?.readyState === WebSocket.OPEN) return;
@@ -29,6 +34,8 @@ export function useWebSocket() {
         const data = JSON.parse(event.data);
         
         if (data.type === 'explanation_ready') {
+          readyIds.current.add(data.id);
+          provisionalIds.current.delete(data.id);
           // Invalidate queries to refetch data
           await queryClient.refetchQueries(getExplanationsQueryOptions());
           await queryClient.refetchQueries(getExplanationQueryOptions(data.id));
@@ -36,7 +43,30 @@ export function useWebSocket() {
             predicate: (query) => query.queryKey[0] === 'explanations',
           });
           await router.invalidate();
+        } else if (
+          data.type === 'explanation_related' ||
+          data.type === 'explanation_draft' ||
+          data.type === 'explanation_partial'
+        ) {
+          if (readyIds.current.has(data.id)) return;
+          // Show the neighbours' synonyms, the draft or the still-generating entry
+          // until the grounded one is ready; each replaces the previous one
+          queryClient.setQueryData<Explanation>(
+            getExplanationQueryOptions(data.id).queryKey,
+            (explanation) => {
+              if (!explanation) return explanation;
+              if (explanation.entries.length && !provisionalIds.current.has(data.id)) {
+                return explanation;
+              }
+              provisionalIds.current.add(data.id);
+              return {
+                ...explanation,
+                entries: [{ explanation: data.explanation, synonyms: data.synonyms }],
+              };
+            }
+          );
         } else if (data.type === 'explanation_error') {
+          provisionalIds.current.delete(data.id);
           console.error('Explanation error:', data.error);
           toast.error('Error generating explanation');
         }